@@ -0,0 +1,38 @@
+"""Which attachments a user may download or reference.
+
+Buyers and admins see every attachment. Vendors see what they uploaded plus
+whatever is attached to the RFx events they are invited to and to their own
+purchase orders; bid documents of other vendors stay private.
+"""
+import uuid
+
+from django.db.models import Q
+
+from procurement.apps.purchase_orders.models import PurchaseOrder
+from procurement.apps.rfx.models import RFxEvent, RFxInvitation
+from procurement.apps.vendors.lookups import vendor_ids_for_user
+from .models import Attachment
+
+
+def _referenced_ids(reference_lists):
+    ids = set()
+    for references in reference_lists:
+        for reference in references or []:
+            try:
+                ids.add(uuid.UUID(str(reference)))
+            except ValueError:
+                continue
+    return ids
+
+
+def visible_attachments(user):
+    """Attachments ``user`` may access"""
+    if user.role != 'vendor':
+        return Attachment.objects.all()
+    vendor_ids = vendor_ids_for_user(user)
+    invited = RFxInvitation.objects.filter(vendor_id__in=vendor_ids).values('rfx_id')
+    shared = _referenced_ids(
+        list(RFxEvent.objects.filter(pk__in=invited).values_list('attachments', flat=True))
+        + list(PurchaseOrder.objects.filter(vendor_id__in=vendor_ids).values_list('attachments', flat=True))
+    )
+    return Attachment.objects.filter(Q(uploaded_by=user) | Q(pk__in=shared))
@@ -0,0 +1,107 @@
+"""Streamed attachment downloads with HTTP Range support.
+
+A whole file goes out as a FileResponse and a single byte range as a 206
+streamed in chunks, so neither is ever held in memory. Requests with several
+ranges get the whole file, which RFC 9110 allows. When ATTACHMENT_SENDFILE_HEADER
+is set (X-Accel-Redirect for nginx, X-Sendfile for Apache) only that header
+is returned and the front-end server streams the blob and handles ranges.
+"""
+import re
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+from rest_framework.negotiation import DefaultContentNegotiation
+
+from .store import CHUNK_SIZE, blob_path, root
+
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class IgnoreAcceptNegotiation(DefaultContentNegotiation):
+    """Always pick the first renderer, so an Accept of the file's own type is not a 406"""
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+class UnsatisfiableRange(Exception):
+    """Raised when a Range header lies entirely outside the file"""
+
+
+def parse_range(header, size):
+    """Inclusive (start, end) of a single-range header, or None to send the whole file"""
+    match = RANGE_PATTERN.match(header.strip()) if header else None
+    if match is None or size == 0:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise UnsatisfiableRange()
+        return max(size - length, 0), size - 1
+    start = int(first)
+    if start >= size:
+        raise UnsatisfiableRange()
+    end = min(int(last), size - 1) if last else size - 1
+    if end < start:
+        return None
+    return start, end
+
+
+def iter_range(path, start, length):
+    with open(path, 'rb') as source:
+        source.seek(start)
+        while length > 0:
+            chunk = source.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def attachment_response(request, attachment):
+    """Download response for ``attachment``, honouring Range, If-Range and If-None-Match"""
+    blob = attachment.blob
+    etag = f'"{blob.sha256}"'
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    path = blob_path(blob.sha256)
+    disposition = content_disposition_header(True, attachment.filename)
+    if settings.ATTACHMENT_SENDFILE_HEADER:
+        response = HttpResponse(content_type=attachment.content_type)
+        if settings.ATTACHMENT_SENDFILE_PREFIX:
+            response[settings.ATTACHMENT_SENDFILE_HEADER] = (
+                settings.ATTACHMENT_SENDFILE_PREFIX + path.relative_to(root()).as_posix()
+            )
+        else:
+            response[settings.ATTACHMENT_SENDFILE_HEADER] = str(path)
+    else:
+        byte_range = None
+        if request.headers.get('If-Range', etag) == etag:
+            try:
+                byte_range = parse_range(request.headers.get('Range'), blob.size)
+            except UnsatisfiableRange:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f'bytes */{blob.size}'
+                return response
+        if byte_range is None:
+            response = FileResponse(open(path, 'rb'), content_type=attachment.content_type)
+        else:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                iter_range(path, start, end - start + 1), status=206, content_type=attachment.content_type
+            )
+            response['Content-Range'] = f'bytes {start}-{end}/{blob.size}'
+            response['Content-Length'] = end - start + 1
+        response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = disposition
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private'
+    return response
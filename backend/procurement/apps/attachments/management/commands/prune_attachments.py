@@ -0,0 +1,20 @@
+"""Remove abandoned uploads and stored files no attachment refers to"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from procurement.apps.attachments import store
+
+
+class Command(BaseCommand):
+    help = 'Delete stale chunked uploads, temporary files and unreferenced blobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=float, default=24, help='Only touch items idle for this long')
+
+    def handle(self, *args, **options):
+        counts = store.prune(timedelta(hours=options['hours']))
+        self.stdout.write(self.style.SUCCESS(
+            f"Removed {counts['uploads']} upload(s), {counts['blobs']} blob(s) "
+            f"and {counts['temporary_files']} temporary file(s)"
+        ))
@@ -0,0 +1,53 @@
+from django.db import models
+import uuid
+from procurement.apps.users.models import User
+
+
+class StoredBlob(models.Model):
+    """File content stored once under its SHA-256, however many attachments share it"""
+    
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    size = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'attachment_blobs'
+    
+    def __str__(self):
+        return f"{self.sha256} ({self.size} bytes)"
+
+
+class Attachment(models.Model):
+    """An uploaded file; JSON ``attachments`` fields reference these by id"""
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4)
+    blob = models.ForeignKey(StoredBlob, on_delete=models.PROTECT, related_name='attachments')
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=255, default='application/octet-stream')
+    uploaded_by = models.ForeignKey(User, on_delete=models.SET_NULL, blank=True, null=True, related_name='attachments')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'attachments'
+    
+    def __str__(self):
+        return self.filename
+
+
+class UploadSession(models.Model):
+    """A chunked upload in progress; chunks are appended in order until ``size`` bytes arrived"""
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4)
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=255, default='application/octet-stream')
+    size = models.BigIntegerField()
+    received = models.BigIntegerField(default=0)
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='attachment_uploads')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'attachment_uploads'
+    
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
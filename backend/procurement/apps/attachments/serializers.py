@@ -0,0 +1,42 @@
+from rest_framework import serializers
+from .access import visible_attachments
+from .models import Attachment, UploadSession
+
+
+class AttachmentSerializer(serializers.ModelSerializer):
+    size = serializers.IntegerField(source='blob.size', read_only=True)
+    sha256 = serializers.CharField(source='blob_id', read_only=True)
+    
+    class Meta:
+        model = Attachment
+        fields = ['id', 'filename', 'content_type', 'size', 'sha256', 'uploaded_by', 'created_at']
+        read_only_fields = fields
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'filename', 'content_type', 'size', 'received', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'received', 'created_at', 'updated_at']
+
+
+class AttachmentReferencesField(serializers.ListField):
+    """JSON ``attachments`` list that only accepts ids of attachments the user may access"""
+    
+    child = serializers.UUIDField()
+    
+    def to_representation(self, data):
+        # Stored as id strings already; entries written before the store existed pass through as-is
+        return list(data or [])
+    
+    def to_internal_value(self, data):
+        ids = list(dict.fromkeys(super().to_internal_value(data)))
+        if not ids:
+            return []
+        request = self.context.get('request')
+        attachments = visible_attachments(request.user) if request else Attachment.objects.all()
+        found = set(attachments.filter(pk__in=ids).values_list('pk', flat=True))
+        missing = [str(attachment_id) for attachment_id in ids if attachment_id not in found]
+        if missing:
+            raise serializers.ValidationError(f"Unknown attachment(s): {', '.join(missing)}")
+        return [str(attachment_id) for attachment_id in ids]
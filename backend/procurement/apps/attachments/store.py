@@ -0,0 +1,208 @@
+"""Content-addressed attachment storage on the local filesystem.
+
+Uploads are streamed to a temporary file in ``CHUNK_SIZE`` pieces while their
+SHA-256 is computed, so memory use does not depend on the file size, and the
+finished file is renamed to ``blobs/ab/cd/<sha256>`` under ATTACHMENT_ROOT.
+Content that is already stored is not written twice: the temporary file is
+dropped and the new attachment points at the existing blob, so a document
+attached to hundreds of responses takes its space once.
+
+Chunked uploads append to ``uploads/<session id>.part`` strictly in order.
+Each chunk truncates the part file back to the session's confirmed offset
+first, so retrying a chunk that failed halfway is safe, and the completed
+file is hashed and committed the same way as a streamed upload.
+
+A blob's row lock orders uploads against ``prune``: an upload locks (or
+creates) the row before it looks for the file and keeps the lock until its
+attachment is saved, and ``prune`` only deletes a blob, row and file, while
+holding the same lock and seeing no attachment.
+"""
+import hashlib
+import os
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Attachment, StoredBlob, UploadSession
+
+CHUNK_SIZE = 64 * 1024
+
+
+class StoreError(Exception):
+    """Raised when an upload cannot be stored"""
+
+
+class UploadTooLarge(StoreError):
+    """Raised when an upload exceeds ATTACHMENT_MAX_SIZE"""
+
+
+class OffsetMismatch(StoreError):
+    """Raised when a chunk does not start where the upload left off"""
+
+    def __init__(self, expected):
+        super().__init__(f'Expected the chunk at offset {expected}')
+        self.expected = expected
+
+
+def root():
+    return Path(settings.ATTACHMENT_ROOT)
+
+
+def blob_path(sha256):
+    return root() / 'blobs' / sha256[:2] / sha256[2:4] / sha256
+
+
+def part_path(session_id):
+    return root() / 'uploads' / f'{session_id}.part'
+
+
+def _directory(name):
+    path = root() / name
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _copy(stream, out, limit, digest=None):
+    """Copy ``stream`` to ``out`` until EOF; raises UploadTooLarge past ``limit`` bytes"""
+    written = 0
+    while True:
+        chunk = stream.read(min(CHUNK_SIZE, limit - written + 1))
+        if not chunk:
+            return written
+        written += len(chunk)
+        if written > limit:
+            raise UploadTooLarge(f'Upload exceeds {limit} bytes')
+        if digest is not None:
+            digest.update(chunk)
+        out.write(chunk)
+
+
+def hash_file(path):
+    """SHA-256 hex digest and size of a file, read in chunks"""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as source:
+        while chunk := source.read(CHUNK_SIZE):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def _commit(temp_path, sha256, size):
+    """Move a fully written file into place as blob ``sha256``, or drop it if already stored.
+
+    Call inside a transaction that also saves the attachment using the blob,
+    so ``prune`` cannot remove it in between.
+    """
+    blob, _ = StoredBlob.objects.select_for_update().get_or_create(sha256=sha256, defaults={'size': size})
+    path = blob_path(sha256)
+    if path.exists():
+        os.unlink(temp_path)
+    else:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(temp_path, path)
+    return blob
+
+
+def save_stream(stream, filename, content_type, user):
+    """Store everything readable from ``stream`` as a new attachment"""
+    digest = hashlib.sha256()
+    out = tempfile.NamedTemporaryFile(dir=_directory('tmp'), delete=False)
+    try:
+        with out:
+            size = _copy(stream, out, settings.ATTACHMENT_MAX_SIZE, digest)
+        with transaction.atomic():
+            blob = _commit(out.name, digest.hexdigest(), size)
+            return Attachment.objects.create(
+                blob=blob, filename=filename, content_type=content_type, uploaded_by=user
+            )
+    except BaseException:
+        if os.path.exists(out.name):
+            os.unlink(out.name)
+        raise
+
+
+def start_upload(filename, content_type, size, user):
+    """Open a chunked upload of ``size`` bytes"""
+    if size <= 0:
+        raise StoreError('size must be positive')
+    if size > settings.ATTACHMENT_MAX_SIZE:
+        raise UploadTooLarge(f'Upload exceeds {settings.ATTACHMENT_MAX_SIZE} bytes')
+    session = UploadSession.objects.create(filename=filename, content_type=content_type, size=size, created_by=user)
+    _directory('uploads')
+    part_path(session.pk).touch()
+    return session
+
+
+def append_chunk(session_id, user, offset, length, stream):
+    """Append ``length`` bytes at ``offset``; returns (session, attachment once the upload is complete)"""
+    with transaction.atomic():
+        # The row lock serialises concurrent chunks of one upload
+        session = UploadSession.objects.select_for_update().get(pk=session_id, created_by=user)
+        if offset != session.received:
+            raise OffsetMismatch(session.received)
+        if offset + length > session.size:
+            raise StoreError('Chunk runs past the declared size')
+        with open(part_path(session.pk), 'r+b') as out:
+            out.seek(offset)
+            out.truncate()
+            written = _copy(stream, out, length)
+        if written != length:
+            raise StoreError(f'Chunk ended after {written} of {length} bytes')
+        session.received = offset + written
+        session.save(update_fields=['received', 'updated_at'])
+        if session.received < session.size:
+            return session, None
+        return session, _finish(session)
+
+
+def _finish(session):
+    path = part_path(session.pk)
+    sha256, size = hash_file(path)
+    blob = _commit(path, sha256, size)
+    attachment = Attachment.objects.create(
+        blob=blob, filename=session.filename, content_type=session.content_type, uploaded_by=session.created_by
+    )
+    session.delete()
+    return attachment
+
+
+def abort_upload(session):
+    path = part_path(session.pk)
+    session.delete()
+    if path.exists():
+        os.unlink(path)
+
+
+def prune(older_than=timedelta(days=1)):
+    """Drop abandoned uploads, stray temporary files and blobs no attachment uses; returns counts"""
+    cutoff = timezone.now() - older_than
+    stale = list(UploadSession.objects.filter(updated_at__lt=cutoff))
+    for session in stale:
+        abort_upload(session)
+
+    orphans = list(
+        StoredBlob.objects.filter(created_at__lt=cutoff, attachments__isnull=True).values_list('sha256', flat=True)
+    )
+    removed = 0
+    for sha256 in orphans:
+        # Re-checked under the row lock so a blob attached since the listing, or being attached now, is kept
+        with transaction.atomic():
+            blob = StoredBlob.objects.select_for_update().filter(sha256=sha256).first()
+            if blob is None or blob.attachments.exists():
+                continue
+            blob.delete()
+            blob_path(sha256).unlink(missing_ok=True)
+            removed += 1
+
+    temporary = 0
+    for path in _directory('tmp').iterdir():
+        if path.stat().st_mtime < time.time() - older_than.total_seconds():
+            path.unlink(missing_ok=True)
+            temporary += 1
+    return {'uploads': len(stale), 'blobs': removed, 'temporary_files': temporary}
@@ -0,0 +1,12 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import AttachmentViewSet, UploadSessionViewSet
+
+router = DefaultRouter()
+# Registered first so 'uploads/' is not taken for an attachment id
+router.register(r'uploads', UploadSessionViewSet, basename='attachment-upload')
+router.register(r'', AttachmentViewSet, basename='attachment')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
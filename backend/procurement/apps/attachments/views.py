@@ -0,0 +1,137 @@
+import os
+import re
+import uuid
+
+from rest_framework import mixins, permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from . import downloads, store
+from .access import visible_attachments
+from .models import UploadSession
+from .serializers import AttachmentSerializer, UploadSessionSerializer
+
+CONTENT_RANGE_PATTERN = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+DISPOSITION_FILENAME_PATTERN = re.compile(r'filename="?([^";]+)"?')
+# Lists of attachments by id are capped like any page
+ID_LIST_LIMIT = 100
+SUGGESTED_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def _clean_filename(filename):
+    return os.path.basename((filename or '').replace('\\', '/')).strip()[:255]
+
+
+def _store_error(exc):
+    code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE if isinstance(exc, store.UploadTooLarge) else status.HTTP_400_BAD_REQUEST
+    return Response({'error': str(exc)}, status=code)
+
+
+class AttachmentViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    serializer_class = AttachmentSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = visible_attachments(self.request.user).select_related('blob')
+        if self.action == 'list':
+            try:
+                ids = [
+                    uuid.UUID(value) for value in self.request.query_params.get('ids', '').split(',') if value
+                ][:ID_LIST_LIMIT]
+            except ValueError:
+                raise ValidationError({'ids': 'ids must be attachment ids'})
+            if ids:
+                queryset = queryset.filter(pk__in=ids)
+            elif self.request.user.role == 'vendor':
+                queryset = queryset.filter(uploaded_by=self.request.user)
+            queryset = queryset.order_by('-created_at')
+        return queryset
+
+    def create(self, request, *args, **kwargs):
+        """Upload a file: the raw request body (named by ?filename= or Content-Disposition) or a multipart 'file'"""
+        if request.content_type.startswith('multipart/form-data'):
+            upload = request.FILES.get('file')
+            if upload is None:
+                return Response({'error': 'file is required'}, status=status.HTTP_400_BAD_REQUEST)
+            stream, filename, content_type = upload, upload.name, upload.content_type
+        else:
+            filename = request.query_params.get('filename')
+            if not filename:
+                match = DISPOSITION_FILENAME_PATTERN.search(request.headers.get('Content-Disposition', ''))
+                filename = match.group(1) if match else ''
+            stream, content_type = request.stream, request.content_type
+        filename = _clean_filename(filename)
+        if not filename:
+            return Response({'error': 'filename is required'}, status=status.HTTP_400_BAD_REQUEST)
+        if stream is None:
+            return Response({'error': 'The upload is empty'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            attachment = store.save_stream(
+                stream, filename, content_type or 'application/octet-stream', request.user
+            )
+        except store.StoreError as exc:
+            return _store_error(exc)
+        return Response(AttachmentSerializer(attachment).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['get'], content_negotiation_class=downloads.IgnoreAcceptNegotiation)
+    def download(self, request, pk=None):
+        """Stream the file, honouring Range requests"""
+        return downloads.attachment_response(request, self.get_object())
+
+
+class UploadSessionViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.DestroyModelMixin,
+                           viewsets.GenericViewSet):
+    """Chunked uploads: POST {filename, size, content_type}, then PUT each chunk with a Content-Range"""
+    serializer_class = UploadSessionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return UploadSession.objects.filter(created_by=self.request.user)
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        filename = _clean_filename(data['filename'])
+        if not filename:
+            return Response({'error': 'filename is required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            session = store.start_upload(
+                filename, data.get('content_type') or 'application/octet-stream', data['size'], request.user
+            )
+        except store.StoreError as exc:
+            return _store_error(exc)
+        response = self.get_serializer(session).data
+        response['chunk_size'] = SUGGESTED_CHUNK_SIZE
+        return Response(response, status=status.HTTP_201_CREATED)
+
+    def update(self, request, *args, **kwargs):
+        """Append one chunk; the response carries the attachment once the last chunk is in"""
+        session = self.get_object()
+        match = CONTENT_RANGE_PATTERN.match(request.headers.get('Content-Range', ''))
+        if not match:
+            return Response(
+                {'error': 'Content-Range: bytes start-end/total is required'}, status=status.HTTP_400_BAD_REQUEST
+            )
+        start, end, total = (int(value) for value in match.groups())
+        if total != session.size or end < start:
+            return Response({'error': 'Content-Range does not match the upload'}, status=status.HTTP_400_BAD_REQUEST)
+        if request.stream is None:
+            return Response({'error': 'The chunk is empty'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            session, attachment = store.append_chunk(session.pk, request.user, start, end - start + 1, request.stream)
+        except UploadSession.DoesNotExist:
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+        except store.OffsetMismatch as exc:
+            return Response({'error': str(exc), 'received': exc.expected}, status=status.HTTP_409_CONFLICT)
+        except store.StoreError as exc:
+            return _store_error(exc)
+        if attachment is None:
+            return Response(self.get_serializer(session).data)
+        return Response(AttachmentSerializer(attachment).data, status=status.HTTP_201_CREATED)
+
+    def perform_destroy(self, instance):
+        store.abort_upload(instance)
@@ -0,0 +1,155 @@
+"""Auction award pipeline.
+
+The winner is chosen on the server from the auction's own bids: one indexed
+ORDER BY amount, timestamp LIMIT 1 lookup, so the cost does not grow with the
+number of bids and no bid rows are loaded into memory. Winner flags, the
+auction row and the purchase order are written in a single transaction while
+the auction row is locked, which also stops the bid engine from accepting
+late bids for it. Multi-lot auctions resolve every lot's winner in one query
+and raise one purchase order per winning vendor.
+"""
+import time
+import uuid
+
+from django.db import transaction
+from django.db.models import Case, OuterRef, Q, Subquery, Value, When
+from django.utils import timezone
+
+from procurement.apps.purchase_orders.models import PurchaseOrder
+from .models import Auction, AuctionLot, Bid
+
+
+class AwardError(Exception):
+    """Raised when an auction cannot be awarded"""
+
+    def __init__(self, message, code='invalid'):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+
+def winning_bid(auction_id):
+    """Lowest bid of the auction, earliest first on ties"""
+    return Bid.objects.filter(auction_id=auction_id, lot__isnull=True).order_by('amount', 'timestamp').values(
+        'id', 'vendor_id', 'amount'
+    ).first()
+
+
+def lot_winners(auction_id):
+    """Winning bid of every lot in one query, keyed by lot id.
+
+    Each lot's leader is a correlated ORDER BY amount, timestamp LIMIT 1
+    subquery, answered by a seek on the (auction, lot, amount, timestamp)
+    index, so the cost grows with the number of lots rather than bids.
+    """
+    leader = Bid.objects.filter(auction_id=auction_id, lot=OuterRef('pk')).order_by('amount', 'timestamp')
+    rows = AuctionLot.objects.filter(auction_id=auction_id).annotate(
+        bid_id=Subquery(leader.values('id')[:1]),
+        bid_vendor_id=Subquery(leader.values('vendor_id')[:1]),
+        bid_amount=Subquery(leader.values('amount')[:1]),
+    ).filter(bid_id__isnull=False).values('pk', 'bid_id', 'bid_vendor_id', 'bid_amount')
+    return {
+        row['pk']: {'id': row['bid_id'], 'vendor_id': row['bid_vendor_id'], 'amount': row['bid_amount']}
+        for row in rows
+    }
+
+
+def _flag_winners(auction_id, winner_ids):
+    """Set is_winning on exactly the given bids, touching only rows whose flag is wrong"""
+    Bid.objects.filter(auction_id=auction_id).filter(
+        Q(is_winning=True) & ~Q(pk__in=winner_ids) | Q(pk__in=winner_ids, is_winning=False)
+    ).update(is_winning=Case(When(pk__in=winner_ids, then=Value(True)), default=Value(False)))
+
+
+def _po_number():
+    return f"PO-{int(time.time())}-{uuid.uuid4().hex[:5].upper()}"
+
+
+def _lock_awardable(auction_id):
+    auction = Auction.objects.select_for_update().filter(pk=auction_id).first()
+    if auction is None:
+        raise AwardError('Auction not found', code='not_found')
+    if auction.status == 'cancelled':
+        raise AwardError('Cancelled auctions cannot be awarded')
+    if auction.winner_id is not None or auction.lots.filter(closed_at__isnull=False).exists():
+        raise AwardError('Auction has already been awarded', code='already_awarded')
+    return auction
+
+
+def award_auction(auction_id, user, payment_terms='Net 30', notes=''):
+    """Award the auction to its lowest bid and raise the purchase order"""
+    with transaction.atomic():
+        auction = _lock_awardable(auction_id)
+
+        winner = winning_bid(auction.pk)
+        if winner is None:
+            raise AwardError('Auction has no bids')
+
+        now = timezone.now()
+        _flag_winners(auction.pk, [winner['id']])
+
+        Auction.objects.filter(pk=auction.pk).update(
+            winner_id=winner['vendor_id'],
+            winning_bid=winner['amount'],
+            current_bid=winner['amount'],
+            status='completed',
+            updated_at=now,
+        )
+
+        purchase_order = PurchaseOrder.objects.create(
+            po_number=_po_number(),
+            vendor_id=winner['vendor_id'],
+            auction_id=auction.pk,
+            total_amount=winner['amount'],
+            status='pending_approval',
+            terms_and_conditions=notes or f"Purchase Order created from Auction: {auction.name}",
+            payment_terms=payment_terms,
+            created_by=user,
+        )
+
+    return purchase_order
+
+
+def award_lots(auction_id, user, payment_terms='Net 30', notes=''):
+    """Award every lot to its lowest bid and raise one purchase order per winning vendor"""
+    with transaction.atomic():
+        auction = _lock_awardable(auction_id)
+        # Locking the lots makes in-flight lot bids wait, then fail on closed_at
+        lots = list(AuctionLot.objects.select_for_update().filter(auction_id=auction.pk))
+        if not lots:
+            raise AwardError('Auction has no lots')
+        winners = lot_winners(auction.pk)
+        if not winners:
+            raise AwardError('Auction has no bids')
+
+        now = timezone.now()
+        totals = {}
+        for lot in lots:
+            winner = winners.get(lot.pk)
+            lot.closed_at = now
+            if winner:
+                lot.winner_id = winner['vendor_id']
+                lot.winning_bid = lot.current_bid = winner['amount']
+                totals.setdefault(winner['vendor_id'], []).append(lot)
+        AuctionLot.objects.bulk_update(lots, ['winner', 'winning_bid', 'current_bid', 'closed_at'])
+        _flag_winners(auction.pk, [winner['id'] for winner in winners.values()])
+        Auction.objects.filter(pk=auction.pk).update(status='completed', updated_at=now)
+
+        purchase_orders = PurchaseOrder.objects.bulk_create([
+            PurchaseOrder(
+                po_number=_po_number(),
+                vendor_id=vendor_id,
+                auction_id=auction.pk,
+                total_amount=sum(lot.winning_bid for lot in won),
+                status='pending_approval',
+                terms_and_conditions=notes or (
+                    f"Purchase Order created from Auction: {auction.name} "
+                    f"(lots {', '.join(str(lot.lot_number) for lot in won)})"
+                ),
+                payment_terms=payment_terms,
+                created_by=user,
+            )
+            for vendor_id, won in totals.items()
+        ])
+
+    return purchase_orders
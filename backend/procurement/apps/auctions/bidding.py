@@ -0,0 +1,193 @@
+"""Bid engine for live reverse auctions.
+
+Bids are accepted with a single conditional UPDATE on ``auctions.current_bid``
+whose WHERE clause carries every validation rule (auction is live, amount is
+below the reserve/ceiling price and undercuts the current bid by at least the
+``min_decrement`` configured in ``bid_rules``). The row lock taken by that
+UPDATE serialises competing bidders, so no accepted bid can be lost and the
+``is_winning`` flag flip happens under the same lock.
+
+Bids on a lot of a multi-lot auction follow the same pattern against the
+``auction_lots`` row, so different lots never contend with each other. An
+auction with lots only takes bids on its lots: those are what award_lots
+reads. Accepted bids are appended to the bid ledger in the same transaction.
+
+A ``min_decrement`` that is not a plain non-negative amount counts as 0, in
+the WHERE clause as in Python, so a malformed rule saved outside the API
+cannot make the database fail the cast.
+"""
+import re
+from decimal import Decimal, InvalidOperation
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, DecimalField, Exists, OuterRef, Q, Value, When
+from django.db.models.fields.json import KT
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from . import ledger
+from .models import Auction, AuctionLot, Bid
+
+AMOUNT_QUANTUM = Decimal('0.01')
+# Digits that fit the numeric(12, 2) the rule is cast to, and nothing else
+MIN_DECREMENT_PATTERN = re.compile(r'^[0-9]{1,10}(\.[0-9]+)?$')
+
+
+class BidRejected(Exception):
+    """Raised when a bid does not satisfy the auction rules"""
+
+    def __init__(self, message, code='invalid'):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+
+
+def parse_amount(amount):
+    """Coerce a client supplied amount into a positive 2dp Decimal"""
+    try:
+        value = Decimal(str(amount)).quantize(AMOUNT_QUANTUM)
+    except (InvalidOperation, TypeError, ValueError):
+        raise BidRejected('Invalid bid amount')
+    if not value.is_finite() or value <= 0:
+        raise BidRejected('Invalid bid amount')
+    return value
+
+
+def is_min_decrement(value):
+    """Whether ``value`` is a usable min_decrement: a non-negative amount, as a number or a string"""
+    return not isinstance(value, bool) and bool(MIN_DECREMENT_PATTERN.match(str(value)))
+
+
+def get_min_decrement(bid_rules):
+    """Minimum amount a new bid must undercut the current bid by"""
+    value = bid_rules.get('min_decrement') if isinstance(bid_rules, dict) else None
+    if value is None or not is_min_decrement(value):
+        return Decimal('0')
+    return Decimal(str(value)).quantize(AMOUNT_QUANTUM)
+
+
+def _price_filter(amount, min_decrement):
+    """Reserve and undercut rules shared by auction-level and lot-level bids"""
+    amount_value = Value(amount, output_field=DecimalField(max_digits=12, decimal_places=2))
+    return (
+        (Q(reserve_price__isnull=True) | Q(reserve_price__gt=amount_value))
+        & (
+            Q(current_bid__isnull=True)
+            | (Q(current_bid__gt=amount_value) & Q(current_bid__gte=amount_value + min_decrement))
+        )
+    )
+
+
+def _acceptance_filter(amount):
+    """WHERE clause encoding the bid rules for the conditional update"""
+    # Only cast text the pattern vouches for; anything else, missing included, counts as 0 like get_min_decrement
+    min_decrement = Case(
+        When(
+            bid_rules__min_decrement__regex=MIN_DECREMENT_PATTERN.pattern,
+            then=Cast(KT('bid_rules__min_decrement'), DecimalField(max_digits=12, decimal_places=2)),
+        ),
+        default=Value(Decimal('0'), output_field=DecimalField(max_digits=12, decimal_places=2)),
+    )
+    has_lots = Exists(AuctionLot.objects.filter(auction_id=OuterRef('pk')))
+    return Q(status='live') & ~has_lots & _price_filter(amount, min_decrement)
+
+
+def _price_rejection(state, amount, min_decrement):
+    """Explain which price rule a bid broke"""
+    if state['reserve_price'] is not None and amount >= state['reserve_price']:
+        return BidRejected('Bid must be below ceiling price', code='above_reserve')
+    if min_decrement > 0:
+        message = f"Bid must be at most {state['current_bid'] - min_decrement} to beat the current bid"
+    else:
+        message = f"Bid must be below the current bid of {state['current_bid']}"
+    return BidRejected(message, code='outbid')
+
+
+def _rejection_reason(auction_id, amount):
+    """Explain why the conditional update matched no row"""
+    state = Auction.objects.filter(pk=auction_id).values(
+        'status', 'reserve_price', 'current_bid', 'bid_rules'
+    ).first()
+    if state is None:
+        return BidRejected('Auction not found', code='not_found')
+    if state['status'] != 'live':
+        return BidRejected('Auction is not live', code='not_live')
+    if AuctionLot.objects.filter(auction_id=auction_id).exists():
+        return BidRejected('This auction is bid per lot; choose a lot', code='lot_required')
+    return _price_rejection(state, amount, get_min_decrement(state['bid_rules']))
+
+
+def _place_lot_bid(auction_id, lot_id, vendor_id, amount):
+    """Accept a bid on one lot; only that lot's row is locked, so lots are bid in parallel"""
+    auction = Auction.objects.filter(pk=auction_id).values('status', 'bid_rules').first()
+    if auction is None:
+        raise BidRejected('Auction not found', code='not_found')
+    if auction['status'] != 'live':
+        raise BidRejected('Auction is not live', code='not_live')
+    min_decrement = get_min_decrement(auction['bid_rules'])
+
+    # closed_at is checked on the lot row itself so a bid racing the award is rejected
+    accepted = AuctionLot.objects.filter(pk=lot_id, auction_id=auction_id, closed_at__isnull=True).filter(
+        _price_filter(amount, Value(min_decrement, output_field=DecimalField(max_digits=12, decimal_places=2)))
+    ).update(current_bid=amount)
+
+    if not accepted:
+        lot = AuctionLot.objects.filter(pk=lot_id, auction_id=auction_id).values(
+            'reserve_price', 'current_bid', 'closed_at'
+        ).first()
+        if lot is None:
+            raise BidRejected('Lot not found', code='not_found')
+        if lot['closed_at'] is not None:
+            raise BidRejected('Lot is closed', code='not_live')
+        raise _price_rejection(lot, amount, min_decrement)
+
+    Bid.objects.filter(lot_id=lot_id, is_winning=True).update(is_winning=False)
+    bid = Bid.objects.create(
+        auction_id=auction_id,
+        lot_id=lot_id,
+        vendor_id=vendor_id,
+        amount=amount,
+        is_winning=True,
+    )
+    ledger.append(bid)
+    return bid
+
+
+def place_bid(auction_id, vendor_id, amount, lot_id=None):
+    """Atomically accept a bid and return the created Bid.
+
+    With ``lot_id`` the bid competes within that lot of a multi-lot auction;
+    an auction with lots rejects bids without one.
+    Raises BidRejected when the bid does not beat the current bid or breaks
+    the auction rules; in that case nothing is written.
+    """
+    amount = parse_amount(amount)
+    try:
+        auction_id = Auction._meta.pk.to_python(auction_id)
+        if lot_id is not None:
+            lot_id = AuctionLot._meta.pk.to_python(lot_id)
+    except ValidationError:
+        raise BidRejected('Auction not found' if lot_id is None else 'Lot not found', code='not_found')
+
+    with transaction.atomic():
+        if lot_id is not None:
+            return _place_lot_bid(auction_id, lot_id, vendor_id, amount)
+
+        accepted = Auction.objects.filter(pk=auction_id).filter(
+            _acceptance_filter(amount)
+        ).update(current_bid=amount, updated_at=timezone.now())
+
+        if not accepted:
+            raise _rejection_reason(auction_id, amount)
+
+        Bid.objects.filter(auction_id=auction_id, lot__isnull=True, is_winning=True).update(is_winning=False)
+        bid = Bid.objects.create(
+            auction_id=auction_id,
+            vendor_id=vendor_id,
+            amount=amount,
+            is_winning=True,
+        )
+        ledger.append(bid)
+
+    return bid
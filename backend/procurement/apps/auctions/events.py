@@ -0,0 +1,202 @@
+"""Live auction event fan-out for the Server-Sent Events stream.
+
+Every process keeps one ``Broadcaster`` per watched auction. A bid event is
+JSON-encoded into an SSE frame exactly once and the same bytes are pushed to
+every subscriber queue, so a watcher costs a few bytes per bid instead of a
+full nested auction serialization per poll.
+
+Events travel between processes through a pluggable backend selected by the
+``AUCTION_EVENT_BACKEND`` setting:
+
+* ``LocalBackend`` delivers straight to this process (single worker, tests).
+* ``PostgresBackend`` uses LISTEN/NOTIFY so every worker sees every bid.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, connections, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+SUBSCRIBER_QUEUE_SIZE = 256
+
+
+def encode_frame(event_type, payload):
+    """Render one SSE frame"""
+    data = json.dumps(payload, cls=DjangoJSONEncoder, separators=(',', ':'))
+    return f'event: {event_type}\ndata: {data}\n\n'.encode()
+
+
+class Subscription:
+    """One watcher's queue of encoded frames, bound to its event loop"""
+
+    def __init__(self, broadcaster, loop):
+        self.broadcaster = broadcaster
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def push(self, frame):
+        self.loop.call_soon_threadsafe(self._put, frame)
+
+    def _put(self, frame):
+        if self.queue.full():
+            # A slow watcher loses its oldest frames rather than blocking the fan-out
+            self.queue.get_nowait()
+        self.queue.put_nowait(frame)
+
+    async def get(self, timeout=None):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self):
+        self.broadcaster.unsubscribe(self)
+
+
+class Broadcaster:
+    """Fans one auction's events out to the subscribers in this process"""
+
+    def __init__(self, auction_id):
+        self.auction_id = auction_id
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def subscribe(self):
+        subscription = Subscription(self, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+            empty = not self._subscribers
+        if empty:
+            _release_broadcaster(self)
+
+    def broadcast(self, frame):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.push(frame)
+            except RuntimeError:
+                # The subscriber's event loop has shut down
+                self.unsubscribe(subscription)
+
+
+_broadcasters = {}
+_broadcasters_lock = threading.Lock()
+
+
+def _release_broadcaster(broadcaster):
+    with _broadcasters_lock:
+        if not len(broadcaster) and _broadcasters.get(broadcaster.auction_id) is broadcaster:
+            del _broadcasters[broadcaster.auction_id]
+
+
+def dispatch(message):
+    """Deliver a backend message to this process's watchers of the auction"""
+    with _broadcasters_lock:
+        broadcaster = _broadcasters.get(str(message['auction']))
+    if broadcaster is not None:
+        broadcaster.broadcast(encode_frame(message.get('type', 'bid'), message))
+
+
+class LocalBackend:
+    """In-process backend; only watchers in the publishing process are reached"""
+
+    def start(self, deliver):
+        self.deliver = deliver
+
+    def publish(self, message):
+        self.deliver(message)
+
+
+class PostgresBackend:
+    """Shares events between worker processes through LISTEN/NOTIFY"""
+
+    channel = 'auction_events'
+    poll_interval = 5
+
+    def start(self, deliver):
+        self.deliver = deliver
+        thread = threading.Thread(target=self._listen, name='auction-events-listener', daemon=True)
+        thread.start()
+
+    def publish(self, message):
+        payload = json.dumps(message, cls=DjangoJSONEncoder, separators=(',', ':'))
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [self.channel, payload])
+
+    def _listen(self):
+        while True:
+            wrapper = connections.create_connection('default')
+            try:
+                wrapper.ensure_connection()
+                raw = wrapper.connection
+                raw.autocommit = True
+                with raw.cursor() as cursor:
+                    cursor.execute(f'LISTEN {self.channel}')
+                while True:
+                    if select.select([raw], [], [], self.poll_interval) == ([], [], []):
+                        continue
+                    raw.poll()
+                    while raw.notifies:
+                        notification = raw.notifies.pop(0)
+                        self.deliver(json.loads(notification.payload))
+            except Exception:
+                logger.exception('Auction event listener failed; reconnecting')
+            finally:
+                wrapper.close()
+            threading.Event().wait(self.poll_interval)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                backend = import_string(settings.AUCTION_EVENT_BACKEND)()
+                backend.start(dispatch)
+                _backend = backend
+    return _backend
+
+
+def subscribe(auction_id):
+    """Register the calling coroutine's loop as a watcher of the auction"""
+    get_backend()
+    key = str(auction_id)
+    # Held across get-or-create and subscribe so an emptying broadcaster is not reused
+    with _broadcasters_lock:
+        broadcaster = _broadcasters.get(key)
+        if broadcaster is None:
+            broadcaster = _broadcasters[key] = Broadcaster(key)
+        return broadcaster.subscribe()
+
+
+def publish_bid(bid, previous_rank, rank):
+    """Announce an accepted bid once the surrounding transaction commits"""
+    message = {
+        'type': 'bid',
+        'auction': bid.auction_id,
+        'lot': bid.lot_id,
+        'vendor': bid.vendor_id,
+        'amount': bid.amount,
+        'current_bid': bid.amount if bid.is_winning else None,
+        'rank': rank,
+        'previous_rank': previous_rank,
+        'timestamp': bid.timestamp,
+    }
+    transaction.on_commit(lambda: get_backend().publish(message))
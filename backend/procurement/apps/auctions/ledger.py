@@ -0,0 +1,169 @@
+"""Append-only bid ledger and periodic auction snapshots.
+
+Every accepted bid is appended to ``bid_ledger`` in the same transaction that
+accepts it. Snapshots fold the ledger into the auction state (best bid per
+vendor, bid count and current bid, per auction and per lot) up to a ledger
+position, so the state at any moment, or after a worker restart, is the
+latest snapshot before it plus the ledger tail after its position, read
+through the (auction, id) index instead of scanning every bid.
+
+A snapshot folds strictly by id: the entries after the previous snapshot's
+position, in id order, stopping at the first one recorded less than
+``SNAPSHOT_SETTLE_SECONDS`` ago. Ledger ids are handed out at insert time,
+so a bid transaction still open when the snapshot is read could commit below
+its position; stopping short of recent entries keeps those out, and since the
+position never passes an entry it did not fold, the next snapshot picks up
+every entry after it whatever its timestamp.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Auction, AuctionSnapshot, BidLedgerEntry
+
+SNAPSHOT_SETTLE_SECONDS = 30
+
+
+def scope_key(lot_id):
+    """State key of the auction itself ('') or one of its lots"""
+    return '' if lot_id is None else str(lot_id)
+
+
+def append(bid):
+    """Record an accepted bid; call inside the transaction that accepted it"""
+    return BidLedgerEntry.objects.create(
+        auction_id=bid.auction_id,
+        lot_id=bid.lot_id,
+        vendor_id=bid.vendor_id,
+        bid_id=bid.pk,
+        amount=bid.amount,
+        recorded_at=bid.timestamp,
+    )
+
+
+class AuctionState:
+    """Auction state folded from ledger entries, one scope per lot plus '' for the auction"""
+
+    def __init__(self, auction_id, position=0, as_of=None, scopes=None):
+        self.auction_id = auction_id
+        self.position = position
+        self.as_of = as_of
+        self.scopes = scopes or {}
+        self.base_position = position
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        scopes = {
+            key: {
+                'best': {vendor: Decimal(amount) for vendor, amount in scope['best'].items()},
+                'bid_count': scope['bid_count'],
+                'current_bid': Decimal(scope['current_bid']) if scope['current_bid'] is not None else None,
+            }
+            for key, scope in snapshot.state.get('scopes', {}).items()
+        }
+        return cls(snapshot.auction_id, snapshot.position, snapshot.as_of, scopes)
+
+    def apply(self, position, lot_id, vendor_id, amount, recorded_at):
+        scope = self.scopes.setdefault(scope_key(lot_id), {'best': {}, 'bid_count': 0, 'current_bid': None})
+        vendor_key = str(vendor_id)
+        best = scope['best'].get(vendor_key)
+        if best is None or amount < best:
+            scope['best'][vendor_key] = amount
+        if scope['current_bid'] is None or amount < scope['current_bid']:
+            scope['current_bid'] = amount
+        scope['bid_count'] += 1
+        self.position = max(self.position, position)
+        if self.as_of is None or recorded_at > self.as_of:
+            self.as_of = recorded_at
+
+    @property
+    def bid_count(self):
+        return sum(scope['bid_count'] for scope in self.scopes.values())
+
+    def current_bid(self, lot_id=None):
+        scope = self.scopes.get(scope_key(lot_id))
+        return scope['current_bid'] if scope else None
+
+    def leaders(self, lot_id=None, limit=10):
+        """Top ``limit`` vendors of a scope as (rank, vendor_id, amount)"""
+        scope = self.scopes.get(scope_key(lot_id))
+        if not scope:
+            return []
+        ranked = sorted((amount, vendor) for vendor, amount in scope['best'].items())[:limit]
+        return [(index + 1, vendor, amount) for index, (amount, vendor) in enumerate(ranked)]
+
+    def to_json(self):
+        return {
+            'scopes': {
+                key: {
+                    'best': {vendor: str(amount) for vendor, amount in scope['best'].items()},
+                    'bid_count': scope['bid_count'],
+                    'current_bid': str(scope['current_bid']) if scope['current_bid'] is not None else None,
+                }
+                for key, scope in self.scopes.items()
+            }
+        }
+
+
+def latest_snapshot(auction_id, at=None):
+    snapshots = AuctionSnapshot.objects.filter(auction_id=auction_id)
+    if at is not None:
+        snapshots = snapshots.filter(as_of__lte=at)
+    return snapshots.order_by('-position').first()
+
+
+def rebuild(auction_id, at=None):
+    """Auction state as of ``at`` (default: now) from the latest snapshot plus the ledger tail"""
+    snapshot = latest_snapshot(auction_id, at)
+    state = AuctionState.from_snapshot(snapshot) if snapshot else AuctionState(auction_id)
+    tail = BidLedgerEntry.objects.filter(auction_id=auction_id, id__gt=state.position)
+    if at is not None:
+        tail = tail.filter(recorded_at__lte=at)
+    rows = tail.order_by('id').values_list('id', 'lot_id', 'vendor_id', 'amount', 'recorded_at')
+    for row in rows.iterator(chunk_size=5000):
+        state.apply(*row)
+    if at is not None:
+        state.as_of = at
+    return state
+
+
+def take_snapshot(auction_id, now=None):
+    """Snapshot the ledger entries after the last snapshot, up to the first unsettled one; None if none were folded"""
+    horizon = (now or timezone.now()) - timedelta(seconds=SNAPSHOT_SETTLE_SECONDS)
+    snapshot = latest_snapshot(auction_id)
+    state = AuctionState.from_snapshot(snapshot) if snapshot else AuctionState(auction_id)
+    tail = BidLedgerEntry.objects.filter(auction_id=auction_id, id__gt=state.position)
+    rows = tail.order_by('id').values_list('id', 'lot_id', 'vendor_id', 'amount', 'recorded_at')
+    for row in rows.iterator(chunk_size=5000):
+        if row[4] > horizon:
+            break
+        state.apply(*row)
+    if state.position == state.base_position:
+        return None
+    return AuctionSnapshot.objects.create(
+        auction_id=auction_id,
+        position=state.position,
+        as_of=horizon,
+        bid_count=state.bid_count,
+        current_bid=state.current_bid(),
+        state=state.to_json(),
+    )
+
+
+def snapshot_due(now=None, interval=None, auctions=None):
+    """Snapshot every auction whose ledger grew by ``interval`` entries since its last snapshot"""
+    interval = interval or settings.AUCTION_SNAPSHOT_INTERVAL
+    auctions = Auction.objects.filter(status='live') if auctions is None else auctions
+    last_position = AuctionSnapshot.objects.filter(auction=OuterRef('pk')).order_by('-position').values('position')[:1]
+    pending = BidLedgerEntry.objects.filter(
+        auction=OuterRef('pk'), id__gt=OuterRef('snapshot_position')
+    ).order_by().values('auction').annotate(n=Count('*')).values('n')
+    due = auctions.annotate(
+        snapshot_position=Coalesce(Subquery(last_position), 0),
+        pending=Coalesce(Subquery(pending, output_field=IntegerField()), 0),
+    ).filter(pending__gte=interval).values_list('pk', flat=True)
+    return [snapshot for snapshot in (take_snapshot(auction_id, now) for auction_id in due) if snapshot]
@@ -0,0 +1,78 @@
+"""Shared fixtures for the auction benchmark commands"""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from procurement.apps.users.models import User
+from procurement.apps.vendors.models import Vendor
+from procurement.apps.auctions.models import Auction, AuctionParticipant, Bid, BidLedgerEntry
+from procurement.bench import create_owner, delete_owned
+
+
+def create_bench_auction(vendor_count, **fields):
+    """Create a throwaway owner, live auction and registered vendors"""
+    owner = create_owner()
+    tag = owner.last_name
+    now = timezone.now()
+    defaults = {
+        'name': f'Benchmark auction {tag}',
+        'start_time': now - timedelta(minutes=1),
+        'end_time': now + timedelta(hours=1),
+        'status': 'live',
+        'created_by': owner,
+    }
+    defaults.update(fields)
+    auction = Auction.objects.create(**defaults)
+    vendors = Vendor.objects.bulk_create([
+        Vendor(company_name=f'Bench vendor {tag}-{i}', status='approved', created_by=owner)
+        for i in range(vendor_count)
+    ])
+    AuctionParticipant.objects.bulk_create([
+        AuctionParticipant(auction=auction, vendor=vendor) for vendor in vendors
+    ])
+    return owner, auction, vendors
+
+
+def attach_vendor_users(owner, vendors):
+    """Give every bench vendor a login so requests can be made on its behalf"""
+    users = User.objects.bulk_create([
+        User(
+            id=f'{owner.id}-v{index}',
+            email=f'{owner.id}-v{index}@example.com',
+            first_name='Bench',
+            last_name=f'vendor {index}',
+            role='vendor',
+        )
+        for index in range(len(vendors))
+    ])
+    for vendor, user in zip(vendors, users):
+        vendor.user = user
+    Vendor.objects.bulk_update(vendors, ['user'])
+    return users
+
+
+def delete_bench_data(owner):
+    """Remove everything created by create_bench_auction"""
+    delete_owned(owner, (Auction, Vendor))
+
+
+def verify_bid_state(auction, accepted, min_decrement):
+    """Check the stored bids match every bid the engine acknowledged; returns a list of problems"""
+    auction.refresh_from_db(fields=['current_bid'])
+    stored = sorted(Bid.objects.filter(auction=auction).values_list('amount', flat=True), reverse=True)
+    if sorted(accepted, reverse=True) != stored:
+        return [f'Accepted {len(accepted)} bids but {len(stored)} are stored']
+    problems = []
+    if stored and auction.current_bid != stored[-1]:
+        problems.append(f'current_bid {auction.current_bid} != lowest bid {stored[-1]}')
+    for higher, lower in zip(stored, stored[1:]):
+        if higher - lower < min_decrement:
+            problems.append(f'Bids {higher} and {lower} violate the minimum decrement')
+            break
+    winning = list(Bid.objects.filter(auction=auction, is_winning=True).values_list('amount', flat=True))
+    if stored and winning != [stored[-1]]:
+        problems.append(f'Expected one winning bid at {stored[-1]}, found {winning}')
+    ledger_count = BidLedgerEntry.objects.filter(auction=auction).count()
+    if ledger_count != len(stored):
+        problems.append(f'{len(stored)} bids stored but {ledger_count} ledger entries')
+    return problems
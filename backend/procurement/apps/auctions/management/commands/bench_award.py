@@ -0,0 +1,71 @@
+"""Benchmark the award pipeline on an auction with a large number of bids"""
+import random
+import time
+import tracemalloc
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from procurement.apps.auctions import awarding
+from procurement.apps.auctions.models import Auction, Bid
+from ._bench import create_bench_auction, delete_bench_data
+
+
+class Command(BaseCommand):
+    help = 'Award a synthetic auction with many bids and report time, queries and memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bids', type=int, default=100_000)
+        parser.add_argument('--vendors', type=int, default=500)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--keep', action='store_true', help='Keep the synthetic auction afterwards')
+
+    def handle(self, *args, **options):
+        owner, auction, vendors = create_bench_auction(options['vendors'])
+        vendor_ids = [vendor.id for vendor in vendors]
+        rng = random.Random(42)
+        try:
+            started = time.perf_counter()
+            remaining = options['bids']
+            while remaining:
+                size = min(remaining, options['batch_size'])
+                Bid.objects.bulk_create([
+                    Bid(
+                        auction=auction,
+                        vendor_id=rng.choice(vendor_ids),
+                        amount=Decimal(rng.randint(100_000, 10_000_000)) / 100,
+                        is_winning=rng.random() < 0.001,
+                    )
+                    for _ in range(size)
+                ])
+                remaining -= size
+            self.stdout.write(f'Seeded {options["bids"]} bids in {time.perf_counter() - started:.2f}s')
+            expected = Bid.objects.filter(auction=auction).order_by('amount', 'timestamp').values_list(
+                'id', flat=True
+            ).first()
+
+            tracemalloc.start()
+            started = time.perf_counter()
+            with CaptureQueriesContext(connection) as queries:
+                purchase_order = awarding.award_auction(auction.pk, owner)
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            winners = list(Bid.objects.filter(auction=auction, is_winning=True).values_list('id', flat=True))
+            if winners != [expected]:
+                raise CommandError(f'Expected winning bid {expected}, flagged {winners}')
+            auction = Auction.objects.get(pk=auction.pk)
+            if auction.winning_bid != purchase_order.total_amount or auction.status != 'completed':
+                raise CommandError('Auction and purchase order disagree on the award')
+
+            self.stdout.write(
+                f'bids={options["bids"]} award={elapsed * 1000:.1f}ms queries={len(queries)} '
+                f'peak_python_memory={peak / 1024:.1f}KiB winning_bid={auction.winning_bid}'
+            )
+            self.stdout.write(self.style.SUCCESS('Award checks passed'))
+        finally:
+            if not options['keep']:
+                delete_bench_data(owner)
@@ -0,0 +1,86 @@
+"""Threaded concurrency benchmark for the auction bid engine"""
+import random
+import threading
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from procurement.apps.auctions import bidding
+from procurement.apps.auctions.models import Auction
+from ._bench import create_bench_auction, delete_bench_data, verify_bid_state
+
+
+class Command(BaseCommand):
+    help = 'Hammer the bid engine from many threads and verify no accepted bid was lost'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--bids-per-thread', type=int, default=200)
+        parser.add_argument('--vendors', type=int, default=100)
+        parser.add_argument('--start-price', type=Decimal, default=Decimal('1000000.00'))
+        parser.add_argument('--min-decrement', type=Decimal, default=Decimal('1.00'))
+        parser.add_argument('--keep', action='store_true', help='Keep the synthetic auction afterwards')
+
+    def handle(self, *args, **options):
+        start_price = options['start_price']
+        min_decrement = options['min_decrement']
+        owner, auction, vendors = create_bench_auction(
+            options['vendors'],
+            reserve_price=start_price,
+            bid_rules={'min_decrement': str(min_decrement)},
+        )
+        vendor_ids = [vendor.id for vendor in vendors]
+        accepted = []
+        rejected = []
+        errors = []
+        lock = threading.Lock()
+
+        def worker():
+            rng = random.Random()
+            local_accepted = []
+            local_rejected = 0
+            try:
+                for _ in range(options['bids_per_thread']):
+                    # Bid against a possibly stale view of the price so threads collide
+                    current = Auction.objects.filter(pk=auction.pk).values_list('current_bid', flat=True).first()
+                    base = current if current is not None else start_price
+                    amount = base - min_decrement * rng.randint(1, 3)
+                    try:
+                        bid = bidding.place_bid(auction.pk, rng.choice(vendor_ids), amount)
+                        local_accepted.append(bid.amount)
+                    except bidding.BidRejected:
+                        local_rejected += 1
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+            with lock:
+                accepted.extend(local_accepted)
+                rejected.append(local_rejected)
+
+        threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        try:
+            if errors:
+                raise CommandError(f'{len(errors)} worker(s) failed: {errors[0]!r}')
+            problems = verify_bid_state(auction, accepted, min_decrement)
+            if problems:
+                raise CommandError('; '.join(problems))
+            attempts = len(accepted) + sum(rejected)
+            self.stdout.write(
+                f'threads={options["threads"]} attempts={attempts} accepted={len(accepted)} '
+                f'rejected={sum(rejected)} elapsed={elapsed:.3f}s '
+                f'attempts/sec={attempts / elapsed:.1f} accepted/sec={len(accepted) / elapsed:.1f}'
+            )
+            self.stdout.write(self.style.SUCCESS('Consistency checks passed: no lost updates'))
+        finally:
+            if not options['keep']:
+                delete_bench_data(owner)
@@ -0,0 +1,97 @@
+"""Benchmark rebuilding auction state from snapshots plus the bid ledger tail"""
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from procurement.apps.auctions import ledger
+from procurement.apps.auctions.models import Bid, BidLedgerEntry
+from ._bench import create_bench_auction, delete_bench_data
+
+
+def full_replay(auction_id):
+    """Fold every bid in timestamp order, i.e. rebuilding without the ledger"""
+    state = ledger.AuctionState(auction_id)
+    rows = Bid.objects.filter(auction_id=auction_id).order_by('timestamp').values_list(
+        'lot_id', 'vendor_id', 'amount', 'timestamp'
+    )
+    for position, (lot_id, vendor_id, amount, timestamp) in enumerate(rows.iterator(chunk_size=5000), 1):
+        state.apply(position, lot_id, vendor_id, amount, timestamp)
+    return state
+
+
+class Command(BaseCommand):
+    help = 'Compare a full bid replay with snapshot + ledger tail rebuilds'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10000,100000,1000000', help='Comma separated bid counts')
+        parser.add_argument('--tail', type=int, default=1000, help='Ledger entries after the snapshot')
+        parser.add_argument('--vendors', type=int, default=200)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        for size in [int(size) for size in options['sizes'].split(',')]:
+            self.bench(size, options)
+        self.stdout.write(self.style.SUCCESS('Ledger rebuild checks passed'))
+
+    def bench(self, size, options):
+        owner, auction, vendors = create_bench_auction(options['vendors'])
+        vendor_ids = [vendor.id for vendor in vendors]
+        rng = random.Random(size)
+        start = timezone.now() - timedelta(seconds=size)
+        try:
+            for offset in range(0, size, options['batch_size']):
+                bids = Bid.objects.bulk_create([
+                    Bid(
+                        auction=auction,
+                        vendor_id=rng.choice(vendor_ids),
+                        amount=Decimal(rng.randint(100_000, 10_000_000)) / 100,
+                    )
+                    for _ in range(min(options['batch_size'], size - offset))
+                ])
+                BidLedgerEntry.objects.bulk_create([
+                    BidLedgerEntry(
+                        auction=auction,
+                        vendor_id=bid.vendor_id,
+                        bid_id=bid.pk,
+                        amount=bid.amount,
+                        recorded_at=start + timedelta(seconds=offset + index),
+                    )
+                    for index, bid in enumerate(bids)
+                ])
+
+            snapshot_at = start + timedelta(seconds=size - options['tail'] - 1)
+            started = time.perf_counter()
+            ledger.take_snapshot(
+                auction.pk, now=snapshot_at + timedelta(seconds=ledger.SNAPSHOT_SETTLE_SECONDS)
+            )
+            snapshot_elapsed = time.perf_counter() - started
+
+            started = time.perf_counter()
+            replayed = full_replay(auction.pk)
+            replay_elapsed = time.perf_counter() - started
+
+            # Seeding can overflow the query log, which would hide the rebuild's queries
+            reset_queries()
+            started = time.perf_counter()
+            with CaptureQueriesContext(connection) as queries:
+                rebuilt = ledger.rebuild(auction.pk)
+            rebuild_elapsed = time.perf_counter() - started
+
+            if (rebuilt.bid_count, rebuilt.current_bid(), rebuilt.leaders(limit=20)) != (
+                replayed.bid_count, replayed.current_bid(), replayed.leaders(limit=20)
+            ):
+                raise CommandError(f'Snapshot rebuild disagrees with a full replay at {size} bids')
+
+            self.stdout.write(
+                f'bids={size} tail={options["tail"]} full_replay={replay_elapsed * 1000:.1f}ms '
+                f'snapshot+tail={rebuild_elapsed * 1000:.1f}ms ({len(queries)} queries) '
+                f'first_snapshot={snapshot_elapsed * 1000:.1f}ms'
+            )
+        finally:
+            delete_bench_data(owner)
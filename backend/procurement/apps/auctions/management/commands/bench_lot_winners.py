@@ -0,0 +1,71 @@
+"""Benchmark per-lot winner resolution on a multi-lot auction"""
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from procurement.apps.auctions import awarding
+from procurement.apps.auctions.models import AuctionLot, Bid
+from ._bench import create_bench_auction, delete_bench_data
+
+
+class Command(BaseCommand):
+    help = 'Compare single-query lot winner resolution with a query per lot'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lots', type=int, default=50)
+        parser.add_argument('--vendors', type=int, default=500)
+        parser.add_argument('--bids-per-vendor', type=int, default=1, help='Bids each vendor places on every lot')
+        parser.add_argument('--keep', action='store_true', help='Keep the synthetic auction afterwards')
+
+    def handle(self, *args, **options):
+        owner, auction, vendors = create_bench_auction(options['vendors'])
+        rng = random.Random(7)
+        try:
+            AuctionLot.objects.bulk_create([
+                AuctionLot(auction=auction, lot_number=number, name=f'Lot {number}')
+                for number in range(1, options['lots'] + 1)
+            ])
+            lots = list(AuctionLot.objects.filter(auction=auction))
+            bids = [
+                Bid(
+                    auction=auction,
+                    lot=lot,
+                    vendor=vendor,
+                    amount=Decimal(rng.randint(100_000, 10_000_000)) / 100,
+                )
+                for lot in lots
+                for vendor in vendors
+                for _ in range(options['bids_per_vendor'])
+            ]
+            Bid.objects.bulk_create(bids, batch_size=5000)
+            self.stdout.write(f'Seeded {len(lots)} lots x {len(vendors)} vendors = {len(bids)} bids')
+
+            started = time.perf_counter()
+            with CaptureQueriesContext(connection) as naive_queries:
+                naive = {
+                    lot.pk: Bid.objects.filter(auction=auction, lot=lot).order_by('amount', 'timestamp')
+                    .values_list('id', flat=True).first()
+                    for lot in lots
+                }
+            naive_elapsed = time.perf_counter() - started
+
+            started = time.perf_counter()
+            with CaptureQueriesContext(connection) as one_pass_queries:
+                winners = awarding.lot_winners(auction.pk)
+            one_pass_elapsed = time.perf_counter() - started
+
+            if {lot_id: winner['id'] for lot_id, winner in winners.items()} != naive:
+                raise CommandError('Single-query winners differ from per-lot queries')
+
+            self.stdout.write(
+                f'per-lot queries: {naive_elapsed * 1000:.1f}ms ({len(naive_queries)} queries)\n'
+                f'single query:    {one_pass_elapsed * 1000:.1f}ms ({len(one_pass_queries)} queries)'
+            )
+            self.stdout.write(self.style.SUCCESS('Lot winners match'))
+        finally:
+            if not options['keep']:
+                delete_bench_data(owner)
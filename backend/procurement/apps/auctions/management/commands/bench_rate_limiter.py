@@ -0,0 +1,46 @@
+"""Benchmark the per-vendor bid rate limiter"""
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.module_loading import import_string
+
+
+class Command(BaseCommand):
+    help = 'Measure the cost of one rate limiter check and verify the bucket refills'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checks', type=int, default=100_000)
+        parser.add_argument('--keys', type=int, default=1000, help='Distinct (vendor, auction) pairs')
+        parser.add_argument('--limiter', default=settings.AUCTION_BID_RATE_LIMITER)
+
+    def handle(self, *args, **options):
+        limiter_class = import_string(options['limiter'])
+
+        limiter = limiter_class(rate=10, burst=3)
+        key = uuid.uuid4().hex
+        results = [limiter.hit(key) for _ in range(4)]
+        if results[:3] != [0, 0, 0] or not 0 < results[3] <= 0.1:
+            raise CommandError(f'Unexpected burst behaviour: {results}')
+        time.sleep(0.11)
+        if limiter.hit(key):
+            raise CommandError('Bucket did not refill')
+
+        limiter = limiter_class(rate=settings.AUCTION_BID_RATE, burst=settings.AUCTION_BID_BURST)
+        keys = [f'{uuid.uuid4()}:{uuid.uuid4()}' for _ in range(options['keys'])]
+        rejected = 0
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            for index in range(options['checks']):
+                rejected += bool(limiter.hit(keys[index % len(keys)]))
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f'{limiter_class.__name__}: {options["checks"]} checks, '
+            f'{elapsed / options["checks"] * 1_000_000:.2f}us per check, '
+            f'{rejected} rejected, {len(queries)} queries'
+        )
+        self.stdout.write(self.style.SUCCESS('Rate limiter checks passed'))
@@ -0,0 +1,123 @@
+"""Load test the place_bid endpoint with many concurrent vendors"""
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from procurement.apps.auctions import orderbook, ratelimit
+from ._bench import attach_vendor_users, create_bench_auction, delete_bench_data, verify_bid_state
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+class Command(BaseCommand):
+    help = 'Simulate an auction-close stampede against place_bid and report latency, throughput and queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vendors', type=int, default=1000)
+        parser.add_argument('--bids-per-vendor', type=int, default=3)
+        parser.add_argument('--concurrency', type=int, default=32, help='Worker threads issuing requests')
+        parser.add_argument('--start-price', type=Decimal, default=Decimal('1000000.00'))
+        parser.add_argument('--min-decrement', type=Decimal, default=Decimal('1.00'))
+        parser.add_argument(
+            '--bypass-rate-limit', action='store_true',
+            help='Swap in an unlimited rate limiter for the run so every request reaches the bid engine',
+        )
+        parser.add_argument('--keep', action='store_true', help='Keep the synthetic auction afterwards')
+
+    def handle(self, *args, **options):
+        min_decrement = options['min_decrement']
+        owner, auction, vendors = create_bench_auction(
+            options['vendors'],
+            reserve_price=options['start_price'],
+            bid_rules={'min_decrement': str(min_decrement)},
+        )
+        users = attach_vendor_users(owner, vendors)
+        for user in users:
+            # The custom User model does not implement the auth flags DRF's IsAuthenticated reads
+            user.is_authenticated = True
+        url = f'/api/auctions/{auction.pk}/place_bid/'
+
+        price = {'current': options['start_price']}
+        price_lock = threading.Lock()
+        results = []
+        results_lock = threading.Lock()
+
+        def bidder(user):
+            # One vendor's session; a lost race refreshes the price the way the live feed would
+            rng = random.Random()
+            client = APIClient()
+            client.force_authenticate(user)
+            local = []
+            try:
+                for _ in range(options['bids_per_vendor']):
+                    with price_lock:
+                        amount = price['current'] - min_decrement * rng.randint(1, 3)
+                    with CaptureQueriesContext(connection) as queries:
+                        started = time.perf_counter()
+                        response = client.post(url, {'amount': str(amount)}, format='json')
+                        elapsed = time.perf_counter() - started
+                    local.append((response.status_code, elapsed, len(queries), amount))
+                    if response.status_code == 201:
+                        with price_lock:
+                            price['current'] = min(price['current'], amount)
+            finally:
+                connection.close()
+            with results_lock:
+                results.extend(local)
+
+        previous_limiter = ratelimit._limiter
+        if options['bypass_rate_limit']:
+            ratelimit._limiter = ratelimit.LocalRateLimiter(rate=1e9, burst=1e9)
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+                list(pool.map(bidder, users))
+            wall = time.perf_counter() - started
+
+            accepted = [amount for code, _, _, amount in results if code == 201]
+            problems = verify_bid_state(auction, accepted, min_decrement)
+            self.report(options, results, wall)
+            if problems:
+                raise CommandError('Consistency checks failed: ' + '; '.join(problems))
+            self.stdout.write(self.style.SUCCESS(
+                f'Consistency checks passed: current_bid={auction.current_bid} matches {len(accepted)} accepted bids'
+            ))
+        finally:
+            ratelimit._limiter = previous_limiter
+            orderbook.discard(auction.pk)
+            if not options['keep']:
+                delete_bench_data(owner)
+
+    def report(self, options, results, wall):
+        statuses = {}
+        for code, _, _, _ in results:
+            statuses[code] = statuses.get(code, 0) + 1
+        latencies = sorted(elapsed for _, elapsed, _, _ in results)
+        self.stdout.write(
+            f'vendors={options["vendors"]} concurrency={options["concurrency"]} requests={len(results)} '
+            f'wall={wall:.2f}s throughput={len(results) / wall:.1f} req/s'
+        )
+        self.stdout.write('responses: ' + ', '.join(f'{code}={count}' for code, count in sorted(statuses.items())))
+        self.stdout.write(
+            f'latency p50={percentile(latencies, 0.50) * 1000:.1f}ms '
+            f'p95={percentile(latencies, 0.95) * 1000:.1f}ms '
+            f'p99={percentile(latencies, 0.99) * 1000:.1f}ms max={latencies[-1] * 1000:.1f}ms'
+        )
+        for label, code in (('accepted', 201), ('rejected', 400), ('throttled', 429)):
+            counts = [queries for status_code, _, queries, _ in results if status_code == code]
+            if counts:
+                self.stdout.write(
+                    f'queries per {label} bid: mean={statistics.mean(counts):.1f} max={max(counts)}'
+                )
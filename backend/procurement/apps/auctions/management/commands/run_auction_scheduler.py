@@ -0,0 +1,31 @@
+"""Run the auction lifecycle scheduler as a long-lived worker"""
+from django.core.management.base import BaseCommand
+
+from procurement.apps.auctions import scheduler
+
+
+class Command(BaseCommand):
+    help = 'Move auctions between scheduled, live and completed as their times pass'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run a single tick and exit')
+        parser.add_argument(
+            '--max-sleep', type=float, default=60,
+            help='Upper bound in seconds between ticks when no boundary is sooner',
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            self.report(None, scheduler.transition_due_auctions(), scheduler.next_boundary())
+            return
+        self.stdout.write('Starting auction scheduler...')
+        try:
+            scheduler.run(max_sleep=options['max_sleep'], on_tick=self.report)
+        except KeyboardInterrupt:
+            self.stdout.write('Auction scheduler stopped')
+
+    def report(self, now, counts, boundary):
+        total = sum(counts.values())
+        details = ', '.join(f'{name}={count}' for name, count in counts.items())
+        next_at = boundary.isoformat() if boundary else 'none'
+        self.stdout.write(f'Tick made {total} transition(s) ({details}); next boundary: {next_at}')
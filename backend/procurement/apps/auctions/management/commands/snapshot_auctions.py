@@ -0,0 +1,38 @@
+"""Snapshot auction state from the bid ledger"""
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from procurement.apps.auctions import ledger
+from procurement.apps.auctions.models import Auction
+
+
+class Command(BaseCommand):
+    help = 'Snapshot auctions whose bid ledger has grown since their last snapshot'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=int, default=settings.AUCTION_SNAPSHOT_INTERVAL,
+            help='Ledger entries since the last snapshot that make an auction due',
+        )
+        parser.add_argument('--all', action='store_true', help='Consider every auction, not only live ones')
+        parser.add_argument('--once', action='store_true', help='Run a single pass and exit')
+        parser.add_argument('--every', type=float, default=30, help='Seconds between passes')
+
+    def handle(self, *args, **options):
+        auctions = Auction.objects.all() if options['all'] else None
+        stop_event = threading.Event()
+        try:
+            while True:
+                snapshots = ledger.snapshot_due(interval=options['interval'], auctions=auctions)
+                for snapshot in snapshots:
+                    self.stdout.write(
+                        f'Snapshot {snapshot.auction_id} at ledger position {snapshot.position} '
+                        f'({snapshot.bid_count} bids)'
+                    )
+                if options['once']:
+                    return
+                stop_event.wait(options['every'])
+        except KeyboardInterrupt:
+            self.stdout.write('Snapshotting stopped')
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-17 09:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0003_bid_auction_timestamp_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auction',
+            index=models.Index(fields=['status', 'start_time'], name='auctions_status_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auction',
+            index=models.Index(fields=['status', 'end_time'], name='auctions_status_end_idx'),
+        ),
+    ]
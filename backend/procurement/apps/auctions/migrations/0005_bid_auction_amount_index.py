@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-17 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0004_auction_status_time_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bid',
+            index=models.Index(fields=['auction', 'amount', 'timestamp'], name='bids_auction_amount_idx'),
+        ),
+    ]
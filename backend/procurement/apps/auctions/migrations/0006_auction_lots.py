@@ -0,0 +1,46 @@
+# Generated by Django 5.2.4 on 2026-10-17 10:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0005_bid_auction_amount_index'),
+        ('vendors', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuctionLot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('lot_number', models.PositiveIntegerField()),
+                ('name', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('quantity', models.DecimalField(blank=True, decimal_places=3, max_digits=12, null=True)),
+                ('uom', models.CharField(blank=True, max_length=50, null=True)),
+                ('reserve_price', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('current_bid', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('winning_bid', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('closed_at', models.DateTimeField(blank=True, null=True)),
+                ('auction', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lots', to='auctions.auction')),
+                ('winner', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='won_auction_lots', to='vendors.vendor')),
+            ],
+            options={
+                'db_table': 'auction_lots',
+                'ordering': ['lot_number'],
+                'unique_together': {('auction', 'lot_number')},
+            },
+        ),
+        migrations.AddField(
+            model_name='bid',
+            name='lot',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='bids', to='auctions.auctionlot'),
+        ),
+        migrations.AddIndex(
+            model_name='bid',
+            index=models.Index(fields=['auction', 'lot', 'amount', 'timestamp'], name='bids_auction_lot_amount_idx'),
+        ),
+    ]
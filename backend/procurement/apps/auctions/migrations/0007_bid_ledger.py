@@ -0,0 +1,71 @@
+# Generated by Django 5.2.4 on 2026-10-17 11:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_ledger(apps, schema_editor):
+    """Record the bids placed before the ledger existed, in timestamp order"""
+    Bid = apps.get_model('auctions', 'Bid')
+    BidLedgerEntry = apps.get_model('auctions', 'BidLedgerEntry')
+    batch = []
+    for bid in Bid.objects.order_by('timestamp').values(
+        'id', 'auction_id', 'lot_id', 'vendor_id', 'amount', 'timestamp'
+    ).iterator(chunk_size=5000):
+        batch.append(BidLedgerEntry(
+            auction_id=bid['auction_id'],
+            lot_id=bid['lot_id'],
+            vendor_id=bid['vendor_id'],
+            bid_id=bid['id'],
+            amount=bid['amount'],
+            recorded_at=bid['timestamp'],
+        ))
+        if len(batch) == 5000:
+            BidLedgerEntry.objects.bulk_create(batch)
+            batch = []
+    BidLedgerEntry.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0006_auction_lots'),
+        ('vendors', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BidLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bid_id', models.UUIDField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('recorded_at', models.DateTimeField()),
+                ('auction', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ledger', to='auctions.auction')),
+                ('lot', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='auctions.auctionlot')),
+                ('vendor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='vendors.vendor')),
+            ],
+            options={
+                'db_table': 'bid_ledger',
+                'indexes': [models.Index(fields=['auction', 'id'], name='bid_ledger_auction_pos_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AuctionSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.BigIntegerField()),
+                ('as_of', models.DateTimeField()),
+                ('bid_count', models.PositiveIntegerField(default=0)),
+                ('current_bid', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('state', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('auction', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='auctions.auction')),
+            ],
+            options={
+                'db_table': 'auction_snapshots',
+                'indexes': [models.Index(fields=['auction', 'position'], name='auction_snapshots_pos_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-17 15:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0007_bid_ledger'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auction',
+            index=models.Index(fields=['updated_at'], name='auctions_updated_at_idx'),
+        ),
+    ]
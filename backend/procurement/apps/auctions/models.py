@@ -1,9 +1,29 @@
 from django.db import models
+from django.db.models.functions import Coalesce
 import uuid
 from procurement.apps.users.models import User
 from procurement.apps.vendors.models import Vendor
 
 
+class AuctionQuerySet(models.QuerySet):
+    """Query helpers for auctions"""
+    
+    def with_bid_summary(self):
+        """Annotate bid/participant aggregates as correlated subqueries in the same SELECT"""
+        bids = Bid.objects.filter(auction=models.OuterRef('pk')).order_by().values('auction')
+        participants = AuctionParticipant.objects.filter(auction=models.OuterRef('pk')).order_by().values('auction')
+        return self.annotate(
+            bid_count=Coalesce(
+                models.Subquery(bids.annotate(n=models.Count('*')).values('n')), 0
+            ),
+            participant_count=Coalesce(
+                models.Subquery(participants.annotate(n=models.Count('*')).values('n')), 0
+            ),
+            best_bid=models.Subquery(bids.annotate(best=models.Min('amount')).values('best')),
+            last_bid_at=models.Subquery(bids.annotate(last=models.Max('timestamp')).values('last')),
+        )
+
+
 class Auction(models.Model):
     """Auction model for procurement auctions"""
     
@@ -30,8 +50,15 @@ class Auction(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = AuctionQuerySet.as_manager()
+    
     class Meta:
         db_table = 'auctions'
+        indexes = [
+            models.Index(fields=['status', 'start_time'], name='auctions_status_start_idx'),
+            models.Index(fields=['status', 'end_time'], name='auctions_status_end_idx'),
+            models.Index(fields=['updated_at'], name='auctions_updated_at_idx'),
+        ]
     
     def __str__(self):
         return self.name
@@ -52,11 +79,36 @@ class AuctionParticipant(models.Model):
         return f"{self.auction.name} - {self.vendor.company_name}"
 
 
+class AuctionLot(models.Model):
+    """Independently bid lot within a multi-lot auction"""
+    
+    auction = models.ForeignKey(Auction, on_delete=models.CASCADE, related_name='lots')
+    lot_number = models.PositiveIntegerField()
+    name = models.CharField(max_length=255)
+    description = models.TextField(blank=True, null=True)
+    quantity = models.DecimalField(max_digits=12, decimal_places=3, blank=True, null=True)
+    uom = models.CharField(max_length=50, blank=True, null=True)
+    reserve_price = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
+    current_bid = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
+    winner = models.ForeignKey(Vendor, on_delete=models.SET_NULL, blank=True, null=True, related_name='won_auction_lots')
+    winning_bid = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
+    closed_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        db_table = 'auction_lots'
+        unique_together = ['auction', 'lot_number']
+        ordering = ['lot_number']
+    
+    def __str__(self):
+        return f"{self.auction.name} - Lot {self.lot_number}"
+
+
 class Bid(models.Model):
     """Bid model for auction bids"""
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4)
     auction = models.ForeignKey(Auction, on_delete=models.CASCADE, related_name='bids')
+    lot = models.ForeignKey(AuctionLot, on_delete=models.CASCADE, blank=True, null=True, related_name='bids')
     vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, related_name='bids')
     amount = models.DecimalField(max_digits=12, decimal_places=2)
     timestamp = models.DateTimeField(auto_now_add=True)
@@ -64,6 +116,57 @@ class Bid(models.Model):
     
     class Meta:
         db_table = 'bids'
+        indexes = [
+            models.Index(fields=['auction', 'timestamp'], name='bids_auction_timestamp_idx'),
+            models.Index(fields=['auction', 'amount', 'timestamp'], name='bids_auction_amount_idx'),
+            models.Index(fields=['auction', 'lot', 'amount', 'timestamp'], name='bids_auction_lot_amount_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.auction.name} - {self.vendor.company_name} - {self.amount}"
+
+
+class BidLedgerEntry(models.Model):
+    """Append-only record of an accepted bid; the id is its position in the ledger"""
+    
+    auction = models.ForeignKey(Auction, on_delete=models.CASCADE, related_name='ledger')
+    lot = models.ForeignKey(AuctionLot, on_delete=models.CASCADE, blank=True, null=True, related_name='+')
+    vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, related_name='+')
+    bid_id = models.UUIDField()
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    recorded_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'bid_ledger'
+        indexes = [
+            models.Index(fields=['auction', 'id'], name='bid_ledger_auction_pos_idx'),
+        ]
+    
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('Bid ledger entries are append-only')
+        super().save(*args, **kwargs)
+    
+    def __str__(self):
+        return f"#{self.pk} {self.auction_id} - {self.amount}"
+
+
+class AuctionSnapshot(models.Model):
+    """Auction state folded from the bid ledger up to and including ``position``"""
+    
+    auction = models.ForeignKey(Auction, on_delete=models.CASCADE, related_name='snapshots')
+    position = models.BigIntegerField()
+    as_of = models.DateTimeField()
+    bid_count = models.PositiveIntegerField(default=0)
+    current_bid = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
+    state = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'auction_snapshots'
+        indexes = [
+            models.Index(fields=['auction', 'position'], name='auction_snapshots_pos_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.auction.name} - {self.vendor.company_name} - {self.amount}"
\ No newline at end of file
+        return f"{self.auction.name} @ {self.position}"
@@ -0,0 +1,159 @@
+"""Per-process order books for live auctions.
+
+Each book keeps every vendor's best (lowest) bid in a sorted list, so a
+vendor's rank is a binary search instead of a scan of the bids table. Books
+are seeded the first time an auction is touched from its latest ledger
+snapshot plus one grouped query over the ledger entries after its position,
+updated in place by
+``place_bid`` and caught up from the tail of the bids table (indexed on
+auction + timestamp) before each read, so bids accepted by other worker
+processes are not missed. A bid's timestamp is set before its transaction
+commits, so the tail is re-read from SYNC_OVERLAP before the newest bid
+seen: a bid committing after a later-stamped one is still picked up.
+"""
+import threading
+from bisect import bisect_left, insort
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Max, Min
+
+from . import ledger
+from .models import Bid, BidLedgerEntry
+
+# Re-read this much before the newest bid seen, for bid transactions that committed after it
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+class OrderBook:
+    """Best bid per vendor for one auction (or one lot of it), sorted from L1 downwards"""
+
+    def __init__(self, auction_id, lot_id=None):
+        self.auction_id = auction_id
+        self.lot_id = lot_id
+        self._entries = []
+        self._best = {}
+        self._last_seen = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _bids(self):
+        return Bid.objects.filter(auction_id=self.auction_id, lot_id=self.lot_id)
+
+    def _apply(self, vendor_id, amount):
+        vendor_key = str(vendor_id)
+        entry = (amount, vendor_key)
+        previous = self._best.get(vendor_key)
+        if previous is not None:
+            if previous <= entry:
+                return
+            del self._entries[bisect_left(self._entries, previous)]
+        insort(self._entries, entry)
+        self._best[vendor_key] = entry
+
+    def _seen(self, timestamp):
+        if timestamp is not None and (self._last_seen is None or timestamp > self._last_seen):
+            self._last_seen = timestamp
+
+    def seed(self, exclude_bid=None):
+        """Load every vendor's best bid from the latest snapshot plus one grouped query over the ledger after it"""
+        snapshot = ledger.latest_snapshot(self.auction_id)
+        entries = BidLedgerEntry.objects.filter(auction_id=self.auction_id, lot_id=self.lot_id)
+        if snapshot is not None:
+            entries = entries.filter(id__gt=snapshot.position)
+        if exclude_bid is not None:
+            entries = entries.exclude(bid_id=exclude_bid)
+        rows = entries.values('vendor_id').annotate(
+            best=Min('amount'), last_at=Max('recorded_at')
+        ).order_by()
+        with self._lock:
+            if snapshot is not None:
+                scope = snapshot.state.get('scopes', {}).get(ledger.scope_key(self.lot_id), {})
+                for vendor_id, amount in scope.get('best', {}).items():
+                    self._apply(vendor_id, Decimal(amount))
+                self._seen(snapshot.as_of)
+            for row in rows:
+                self._apply(row['vendor_id'], row['best'])
+                self._seen(row['last_at'])
+
+    def catch_up(self):
+        """Apply bids written since the last one this book has seen"""
+        tail = self._bids()
+        if self._last_seen is not None:
+            # Reapplying a bid already seen is a no-op, so the overlap only costs a few rows
+            tail = tail.filter(timestamp__gte=self._last_seen - SYNC_OVERLAP)
+        rows = tail.order_by('timestamp').values_list('vendor_id', 'amount', 'timestamp')
+        with self._lock:
+            for vendor_id, amount, timestamp in rows:
+                self._apply(vendor_id, amount)
+                self._seen(timestamp)
+
+    def record(self, vendor_id, amount, timestamp=None):
+        """Apply a newly accepted bid and return the vendor's (previous_rank, rank)"""
+        vendor_key = str(vendor_id)
+        with self._lock:
+            previous = self._best.get(vendor_key)
+            previous_rank = bisect_left(self._entries, previous) + 1 if previous else None
+            self._apply(vendor_id, amount)
+            self._seen(timestamp)
+            return previous_rank, bisect_left(self._entries, self._best[vendor_key]) + 1
+
+    def rank(self, vendor_id):
+        """1-based rank of the vendor's best bid, or None if they have not bid"""
+        with self._lock:
+            entry = self._best.get(str(vendor_id))
+            if entry is None:
+                return None
+            return bisect_left(self._entries, entry) + 1
+
+    def best_bid(self, vendor_id):
+        entry = self._best.get(str(vendor_id))
+        return entry[0] if entry else None
+
+    def leaders(self, limit=10):
+        """Top ``limit`` entries as (rank, vendor_id, amount)"""
+        with self._lock:
+            return [
+                (index + 1, vendor_id, amount)
+                for index, (amount, vendor_id) in enumerate(self._entries[:limit])
+            ]
+
+
+_books = {}
+_books_lock = threading.Lock()
+
+
+def get_book(auction_id, lot_id=None, exclude_bid=None):
+    """Return the order book for an auction or one of its lots, seeding it on first touch"""
+    key = (str(auction_id), lot_id and int(lot_id))
+    book = _books.get(key)
+    if book is not None:
+        return book
+    with _books_lock:
+        book = _books.get(key)
+        if book is None:
+            book = OrderBook(*key)
+            book.seed(exclude_bid)
+            _books[key] = book
+    return book
+
+
+def record_bid(bid):
+    """Update the in-process book with an accepted bid; returns (previous_rank, rank)"""
+    # Seed without this bid so a first touch still reports the rank it moved from
+    book = get_book(bid.auction_id, bid.lot_id, exclude_bid=bid.pk)
+    return book.record(bid.vendor_id, bid.amount, bid.timestamp)
+
+
+def discard(*auction_ids):
+    """Drop the books of the given auctions, e.g. once they are no longer live"""
+    auction_keys = {str(auction_id) for auction_id in auction_ids}
+    with _books_lock:
+        for key in [key for key in _books if key[0] in auction_keys]:
+            del _books[key]
+
+
+def rank_label(rank):
+    return f'L{rank}'
@@ -0,0 +1,115 @@
+"""Per-vendor bid rate limiting.
+
+Each (vendor, auction) pair gets a token bucket holding up to ``burst`` bids
+that refills at ``rate`` bids per second. A check is a few float operations
+under a lock, with no database access, so it can sit in front of the bid
+engine without adding round trips.
+
+The limiter is selected by the ``AUCTION_BID_RATE_LIMITER`` setting:
+
+* ``LocalRateLimiter`` keeps buckets in process memory (single worker).
+* ``CacheRateLimiter`` keeps them in the Django cache so every worker shares
+  the same budget; point ``CACHES`` at Redis or Memcached for that.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+
+class TokenBucket:
+    """Token bucket state; ``take`` returns 0 when allowed, else seconds to wait"""
+
+    __slots__ = ('tokens', 'updated')
+
+    def __init__(self, tokens, updated):
+        self.tokens = tokens
+        self.updated = updated
+
+    def take(self, rate, burst, now):
+        self.tokens = min(burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / rate
+
+
+class LocalRateLimiter:
+    """Buckets in process memory; each worker enforces its own budget"""
+
+    clock = staticmethod(time.monotonic)
+    prune_every = 10_000
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._checks = 0
+
+    def hit(self, key):
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.burst, now)
+            retry_after = bucket.take(self.rate, self.burst, now)
+            self._checks += 1
+            if self._checks >= self.prune_every:
+                self._prune(now)
+        return retry_after
+
+    def _prune(self, now):
+        # A bucket that has refilled completely is indistinguishable from a new one
+        full_after = self.burst / self.rate
+        self._buckets = {
+            key: bucket for key, bucket in self._buckets.items() if now - bucket.updated < full_after
+        }
+        self._checks = 0
+
+
+class CacheRateLimiter:
+    """Buckets in the Django cache, shared by every worker using it"""
+
+    clock = staticmethod(time.time)
+    key_prefix = 'auction-bid-rate'
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.cache = caches[getattr(settings, 'AUCTION_BID_RATE_CACHE', 'default')]
+        self.timeout = max(1, int(burst / rate) + 1)
+
+    def hit(self, key):
+        now = self.clock()
+        cache_key = f'{self.key_prefix}:{key}'
+        state = self.cache.get(cache_key)
+        bucket = TokenBucket(*state) if state else TokenBucket(self.burst, now)
+        retry_after = bucket.take(self.rate, self.burst, now)
+        # Read-modify-write: concurrent requests for the same key may each spend
+        # the same token, over-admitting by at most the number of racing workers
+        self.cache.set(cache_key, (bucket.tokens, bucket.updated), self.timeout)
+        return retry_after
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = import_string(settings.AUCTION_BID_RATE_LIMITER)(
+                    rate=settings.AUCTION_BID_RATE, burst=settings.AUCTION_BID_BURST
+                )
+    return _limiter
+
+
+def check_bid(vendor_id, auction_id):
+    """Spend one bid token; returns 0 if allowed, otherwise seconds until the next token"""
+    return get_limiter().hit(f'{vendor_id}:{auction_id}')
@@ -0,0 +1,56 @@
+"""Auction lifecycle scheduler.
+
+Moves auctions scheduled -> live -> completed as their start/end times pass.
+Each tick issues one bulk UPDATE per transition, filtered by status and a
+time range so the (status, start_time) / (status, end_time) indexes select
+only the due rows, then sleeps until the next known boundary instead of
+rescanning the table on a fixed interval. The in-process order books of
+the auctions a tick completes are discarded once it commits.
+"""
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from procurement.workers import run_until_stopped
+from . import orderbook
+from .models import Auction
+
+
+def _complete(due, now):
+    """Mark the ``due`` auctions completed and drop their order books after commit; returns how many moved"""
+    auction_ids = list(due.select_for_update().values_list('pk', flat=True))
+    if not auction_ids:
+        return 0
+    transaction.on_commit(lambda: orderbook.discard(*auction_ids))
+    return due.filter(pk__in=auction_ids).update(status='completed', updated_at=now)
+
+
+def transition_due_auctions(now=None):
+    """Apply every due status transition and return the counts per transition"""
+    now = now or timezone.now()
+    with transaction.atomic():
+        # Scheduled auctions whose whole window has passed never go live
+        expired = _complete(Auction.objects.filter(status='scheduled', end_time__lte=now), now)
+        started = Auction.objects.filter(status='scheduled', start_time__lte=now).update(
+            status='live', updated_at=now
+        )
+        ended = _complete(Auction.objects.filter(status='live', end_time__lte=now), now)
+    return {'scheduled_to_live': started, 'live_to_completed': ended, 'scheduled_to_completed': expired}
+
+
+def next_boundary(now=None):
+    """Earliest future start or end time among auctions that still have to move"""
+    now = now or timezone.now()
+    next_start = Auction.objects.filter(status='scheduled', start_time__gt=now).aggregate(
+        at=Min('start_time')
+    )['at']
+    next_end = Auction.objects.filter(status__in=['scheduled', 'live'], end_time__gt=now).aggregate(
+        at=Min('end_time')
+    )['at']
+    boundaries = [at for at in (next_start, next_end) if at is not None]
+    return min(boundaries) if boundaries else None
+
+
+def run(max_sleep=60, stop_event=None, on_tick=None):
+    """Tick until ``stop_event`` is set, sleeping until the next boundary; ``on_tick`` gets (now, counts, boundary)"""
+    run_until_stopped(transition_due_auctions, next_boundary, max_sleep, stop_event, on_tick)
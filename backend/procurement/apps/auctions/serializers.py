@@ -1,5 +1,7 @@
 from rest_framework import serializers
-from .models import Auction, AuctionParticipant, Bid
+from procurement.expand import ExpandSerializerMixin
+from .bidding import is_min_decrement
+from .models import Auction, AuctionLot, AuctionParticipant, Bid
 
 
 class BidSerializer(serializers.ModelSerializer):
@@ -8,12 +10,25 @@ class BidSerializer(serializers.ModelSerializer):
     class Meta:
         model = Bid
         fields = [
-            'id', 'auction', 'vendor', 'vendor_name', 'amount',
+            'id', 'auction', 'lot', 'vendor', 'vendor_name', 'amount',
             'timestamp', 'is_winning'
         ]
         read_only_fields = ['id', 'timestamp', 'vendor_name', 'is_winning']
 
 
+class AuctionLotSerializer(serializers.ModelSerializer):
+    winner_name = serializers.CharField(source='winner.company_name', read_only=True)
+    
+    class Meta:
+        model = AuctionLot
+        fields = [
+            'id', 'auction', 'lot_number', 'name', 'description', 'quantity',
+            'uom', 'reserve_price', 'current_bid', 'winner', 'winner_name',
+            'winning_bid', 'closed_at'
+        ]
+        read_only_fields = ['id', 'current_bid', 'winner', 'winner_name', 'winning_bid', 'closed_at']
+
+
 class AuctionParticipantSerializer(serializers.ModelSerializer):
     vendor_name = serializers.CharField(source='vendor.company_name', read_only=True)
     
@@ -23,7 +38,30 @@ class AuctionParticipantSerializer(serializers.ModelSerializer):
         read_only_fields = ['registered_at', 'vendor_name']
 
 
-class AuctionSerializer(serializers.ModelSerializer):
+class AuctionSummarySerializer(serializers.ModelSerializer):
+    """Flat auction representation for list views, read from annotated aggregates"""
+    winner_name = serializers.CharField(source='winner.company_name', read_only=True)
+    bid_count = serializers.IntegerField(read_only=True)
+    participant_count = serializers.IntegerField(read_only=True)
+    best_bid = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+    last_bid_at = serializers.DateTimeField(read_only=True)
+    
+    class Meta:
+        model = Auction
+        fields = [
+            'id', 'name', 'description', 'start_time', 'end_time',
+            'reserve_price', 'current_bid', 'bid_rules', 'status', 'winner',
+            'winner_name', 'winning_bid', 'created_by', 'created_at',
+            'updated_at', 'bid_count', 'participant_count', 'best_bid',
+            'last_bid_at'
+        ]
+        read_only_fields = fields
+
+
+class AuctionSerializer(ExpandSerializerMixin, serializers.ModelSerializer):
+    EXPANDABLE_FIELDS = ('lots', 'participants', 'bids')
+    
+    lots = AuctionLotSerializer(many=True, read_only=True)
     participants = AuctionParticipantSerializer(many=True, read_only=True)
     bids = BidSerializer(many=True, read_only=True)
     winner_name = serializers.CharField(source='winner.company_name', read_only=True)
@@ -34,6 +72,14 @@ class AuctionSerializer(serializers.ModelSerializer):
             'id', 'name', 'description', 'items', 'start_time', 'end_time',
             'reserve_price', 'current_bid', 'bid_rules', 'status', 'winner',
             'winner_name', 'winning_bid', 'created_by', 'created_at',
-            'updated_at', 'participants', 'bids'
+            'updated_at', 'lots', 'participants', 'bids'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'winner_name', 'participants', 'bids']
\ No newline at end of file
+        read_only_fields = ['id', 'created_at', 'updated_at', 'winner_name', 'lots', 'participants', 'bids']
+    
+    def validate_bid_rules(self, bid_rules):
+        if bid_rules is not None and not isinstance(bid_rules, dict):
+            raise serializers.ValidationError('Bid rules must be an object')
+        min_decrement = (bid_rules or {}).get('min_decrement')
+        if min_decrement is not None and not is_min_decrement(min_decrement):
+            raise serializers.ValidationError('min_decrement must be a non-negative amount')
+        return bid_rules
\ No newline at end of file
@@ -1,11 +1,13 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import AuctionViewSet, BidViewSet
+from .views import AuctionViewSet, AuctionLotViewSet, BidViewSet, auction_stream
 
 router = DefaultRouter()
 router.register(r'bids', BidViewSet)
+router.register(r'lots', AuctionLotViewSet)
 router.register(r'', AuctionViewSet)
 
 urlpatterns = [
+    path('<uuid:auction_id>/stream/', auction_stream, name='auction-stream'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,18 +1,61 @@
+import asyncio
+import math
+
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from .models import Auction, AuctionParticipant, Bid
-from .serializers import AuctionSerializer, AuctionParticipantSerializer, BidSerializer
+from procurement.apps.purchase_orders.serializers import PurchaseOrderSerializer
+from procurement.apps.users.authentication import authenticate_async
+from procurement.apps.vendors.models import Vendor
+from procurement.expand import ExpandViewMixin
+from . import awarding, bidding, events, ledger, orderbook, ratelimit
+from .models import Auction, AuctionLot, AuctionParticipant, Bid
+from .serializers import (
+    AuctionSerializer, AuctionSummarySerializer, AuctionLotSerializer, AuctionParticipantSerializer,
+    BidSerializer
+)
+
+STREAM_HEARTBEAT_SECONDS = 15
 
 
-class AuctionViewSet(viewsets.ModelViewSet):
+class AuctionViewSet(ExpandViewMixin, viewsets.ModelViewSet):
     queryset = Auction.objects.all()
     serializer_class = AuctionSerializer
     permission_classes = [permissions.IsAuthenticated]
     
+    def get_queryset(self):
+        queryset = Auction.objects.select_related('winner')
+        if self.action != 'list':
+            return queryset
+        queryset = queryset.order_by('-created_at')
+        expand = self.get_expand()
+        if not expand:
+            return queryset.with_bid_summary()
+        if 'lots' in expand:
+            queryset = queryset.prefetch_related('lots__winner')
+        if 'participants' in expand:
+            queryset = queryset.prefetch_related('participants__vendor')
+        if 'bids' in expand:
+            queryset = queryset.prefetch_related('bids__vendor')
+        return queryset
+    
+    def get_serializer_class(self):
+        if self.action == 'list' and not self.get_expand():
+            return AuctionSummarySerializer
+        return AuctionSerializer
+    
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
     
+    def perform_update(self, serializer):
+        auction = serializer.save()
+        # Completed or cancelled auctions take no more bids, so their books are dead weight
+        if auction.status != 'live':
+            orderbook.discard(auction.pk)
+    
     @action(detail=True, methods=['post'])
     def register(self, request, pk=None):
         """Register vendor for auction"""
@@ -33,30 +76,183 @@ class AuctionViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'])
     def place_bid(self, request, pk=None):
         """Place a bid in the auction"""
-        auction = self.get_object()
         vendor = request.user.vendor_profile.first()
         amount = request.data.get('amount')
+        lot_id = request.data.get('lot')
         
         if not vendor:
             return Response({'error': 'Vendor profile not found'}, status=status.HTTP_400_BAD_REQUEST)
         
-        if auction.status != 'live':
-            return Response({'error': 'Auction is not live'}, status=status.HTTP_400_BAD_REQUEST)
+        retry_after = ratelimit.check_bid(vendor.id, pk)
+        if retry_after:
+            return Response(
+                {'error': 'Too many bids, please slow down', 'code': 'rate_limited', 'retry_after': round(retry_after, 3)},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={'Retry-After': str(math.ceil(retry_after))},
+            )
         
-        # Create bid
-        bid = Bid.objects.create(
-            auction=auction,
-            vendor=vendor,
-            amount=amount
-        )
+        try:
+            bid = bidding.place_bid(pk, vendor.id, amount, lot_id=lot_id)
+        except bidding.BidRejected as exc:
+            status_code = status.HTTP_404_NOT_FOUND if exc.code == 'not_found' else status.HTTP_400_BAD_REQUEST
+            return Response({'error': exc.message, 'code': exc.code}, status=status_code)
+        
+        previous_rank, rank = orderbook.record_bid(bid)
+        events.publish_bid(bid, previous_rank, rank)
+        data = BidSerializer(bid).data
+        data['rank'] = rank
+        data['rank_label'] = orderbook.rank_label(rank)
+        return Response(data, status=status.HTTP_201_CREATED)
+    
+    @action(detail=True, methods=['get'])
+    def leaderboard(self, request, pk=None):
+        """Get the ranked best bid of each vendor from the in-memory order book"""
+        auction = self.get_object()
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 10)), 100))
+            lot_id = int(request.query_params['lot']) if request.query_params.get('lot') else None
+        except ValueError:
+            return Response({'error': 'limit and lot must be integers'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Update auction current bid if this is the highest
-        if not auction.current_bid or amount > auction.current_bid:
-            auction.current_bid = amount
-            auction.save()
+        current_bid = auction.current_bid
+        if lot_id is not None:
+            lot = AuctionLot.objects.filter(pk=lot_id, auction=auction).values('current_bid').first()
+            if lot is None:
+                return Response({'error': 'Lot not found'}, status=status.HTTP_404_NOT_FOUND)
+            current_bid = lot['current_bid']
         
-        serializer = BidSerializer(bid)
+        book = orderbook.get_book(auction.id, lot_id)
+        book.catch_up()
+        leaders = book.leaders(limit)
+        
+        names = {
+            str(vendor_id): name
+            for vendor_id, name in Vendor.objects.filter(
+                id__in=[vendor_id for _, vendor_id, _ in leaders]
+            ).values_list('id', 'company_name')
+        }
+        data = {
+            'auction': auction.id,
+            'lot': lot_id,
+            'current_bid': current_bid,
+            'bidder_count': len(book),
+            'leaders': [
+                {
+                    'rank': rank,
+                    'rank_label': orderbook.rank_label(rank),
+                    'vendor': vendor_id,
+                    'vendor_name': names.get(vendor_id),
+                    'amount': amount,
+                }
+                for rank, vendor_id, amount in leaders
+            ],
+        }
+        
+        vendor = request.user.vendor_profile.first() if request.user.role == 'vendor' else None
+        if vendor:
+            rank = book.rank(vendor.id)
+            data['my_rank'] = rank
+            data['my_rank_label'] = orderbook.rank_label(rank) if rank else None
+            data['my_best_bid'] = book.best_bid(vendor.id)
+        
+        return Response(data)
+    
+    @action(detail=True, methods=['get'])
+    def replay(self, request, pk=None):
+        """Get the auction state at a point in time, rebuilt from the latest snapshot and the bid ledger"""
+        auction = self.get_object()
+        at = None
+        if request.query_params.get('at'):
+            at = parse_datetime(request.query_params['at'])
+            if at is None:
+                return Response({'error': 'at must be an ISO 8601 datetime'}, status=status.HTTP_400_BAD_REQUEST)
+            if timezone.is_naive(at):
+                at = timezone.make_aware(at)
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 10)), 100))
+            lot_id = int(request.query_params['lot']) if request.query_params.get('lot') else None
+        except ValueError:
+            return Response({'error': 'limit and lot must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        state = ledger.rebuild(auction.id, at)
+        return Response({
+            'auction': auction.id,
+            'lot': lot_id,
+            'as_of': state.as_of,
+            'position': state.position,
+            'bid_count': state.bid_count,
+            'current_bid': state.current_bid(lot_id),
+            'leaders': [
+                {'rank': rank, 'rank_label': orderbook.rank_label(rank), 'vendor': vendor_id, 'amount': amount}
+                for rank, vendor_id, amount in state.leaders(lot_id, limit)
+            ],
+        })
+    
+    @action(detail=True, methods=['post'], url_path='create-po')
+    def create_po(self, request, pk=None):
+        """Award the auction to its lowest bid and create the Purchase Order"""
+        auction = self.get_object()
+        
+        if auction.created_by != request.user:
+            return Response(
+                {'message': 'You can only create POs for your own auctions'}, 
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        multi_lot = auction.lots.exists()
+        award = awarding.award_lots if multi_lot else awarding.award_auction
+        try:
+            result = award(
+                auction.pk,
+                request.user,
+                payment_terms=request.data.get('payment_terms', 'Net 30'),
+                notes=request.data.get('notes', ''),
+            )
+        except awarding.AwardError as exc:
+            status_code = status.HTTP_409_CONFLICT if exc.code == 'already_awarded' else status.HTTP_400_BAD_REQUEST
+            return Response({'message': exc.message}, status=status_code)
+        
+        orderbook.discard(auction.pk)
+        # Multi-lot auctions yield one purchase order per winning vendor
+        serializer = PurchaseOrderSerializer(result, many=multi_lot)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
+    
+    @action(detail=True, methods=['get'])
+    def lot_results(self, request, pk=None):
+        """Get the current leader of every lot, resolved in a single query"""
+        auction = self.get_object()
+        winners = awarding.lot_winners(auction.pk)
+        lots = AuctionLot.objects.filter(auction=auction)
+        names = dict(
+            Vendor.objects.filter(id__in={winner['vendor_id'] for winner in winners.values()})
+            .values_list('id', 'company_name')
+        )
+        
+        results = []
+        for lot in lots:
+            winner = winners.get(lot.id, {})
+            results.append({
+                'lot': lot.id,
+                'lot_number': lot.lot_number,
+                'name': lot.name,
+                'leading_bid': winner.get('id'),
+                'vendor': winner.get('vendor_id'),
+                'vendor_name': names.get(winner.get('vendor_id')),
+                'amount': winner.get('amount'),
+            })
+        return Response(results)
+
+
+class AuctionLotViewSet(viewsets.ModelViewSet):
+    queryset = AuctionLot.objects.all()
+    serializer_class = AuctionLotSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_queryset(self):
+        auction_id = self.request.query_params.get('auction_id')
+        if auction_id:
+            return AuctionLot.objects.filter(auction_id=auction_id).select_related('winner')
+        return AuctionLot.objects.select_related('winner')
 
 
 class BidViewSet(viewsets.ReadOnlyModelViewSet):
@@ -69,6 +265,39 @@ class BidViewSet(viewsets.ReadOnlyModelViewSet):
         if auction_id:
             return Bid.objects.filter(auction_id=auction_id).order_by('-timestamp')
         return Bid.objects.all().order_by('-timestamp')
+
+
+async def auction_stream(request, auction_id):
+    """Server-Sent Events stream of bids placed in an auction (ASGI only)"""
+    user = await authenticate_async(request)
+    if user is None:
+        return JsonResponse({'error': 'Authentication required'}, status=status.HTTP_401_UNAUTHORIZED)
+    
+    snapshot = await Auction.objects.filter(pk=auction_id).values('id', 'status', 'current_bid').afirst()
+    if snapshot is None:
+        return JsonResponse({'error': 'Auction not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    subscription = events.subscribe(auction_id)
+    
+    async def stream():
+        try:
+            yield b'retry: 3000\n\n'
+            yield events.encode_frame('snapshot', snapshot)
+            while True:
+                try:
+                    yield await subscription.get(timeout=STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Comment frame keeps proxies from closing an idle connection
+                    yield b': ping\n\n'
+        finally:
+            subscription.close()
+    
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @action(detail=True, methods=['patch'])
 def update_status(self, request, pk=None):
     """Update auction status"""
@@ -87,48 +316,6 @@ def update_status(self, request, pk=None):
     serializer = self.get_serializer(auction)
     return Response(serializer.data)
 
-@action(detail=True, methods=['post'])
-def create_po(self, request, pk=None):
-    """Create Purchase Order from Auction"""
-    from procurement.apps.purchase_orders.models import PurchaseOrder
-    from procurement.apps.purchase_orders.serializers import PurchaseOrderSerializer
-    
-    auction = self.get_object()
-    vendor_id = request.data.get('vendor_id')
-    bid_amount = request.data.get('bid_amount')
-    payment_terms = request.data.get('payment_terms', 'Net 30')
-    notes = request.data.get('notes', '')
-    
-    if auction.created_by != request.user:
-        return Response(
-            {'message': 'You can only create POs for your own auctions'}, 
-            status=status.HTTP_403_FORBIDDEN
-        )
-    
-    # Generate PO number
-    po_number = f"PO-{int(time.time())}-{uuid.uuid4().hex[:5].upper()}"
-    
-    # Create Purchase Order
-    purchase_order = PurchaseOrder.objects.create(
-        po_number=po_number,
-        vendor_id=vendor_id,
-        auction=auction,
-        total_amount=bid_amount or '0',
-        status='pending_approval',
-        terms_and_conditions=notes or f"Purchase Order created from Auction: {auction.name}",
-        payment_terms=payment_terms,
-        created_by=request.user
-    )
-    
-    # Update auction winner
-    auction.winner_id = vendor_id
-    auction.winning_bid = bid_amount
-    auction.status = 'completed'
-    auction.save()
-    
-    serializer = PurchaseOrderSerializer(purchase_order)
-    return Response(serializer.data)
-
 @action(detail=True, methods=['get'])
 def bids(self, request, pk=None):
     """Get auction bids"""
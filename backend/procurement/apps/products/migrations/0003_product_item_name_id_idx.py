@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-17 17:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['item_name', 'id'], name='products_item_name_id_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.4 on 2026-10-17 18:05
+
+from django.db import migrations, models
+
+
+def backfill_paths(apps, schema_editor):
+    """Derive every category's path and level from its parent chain, as ProductCategory.save does"""
+    ProductCategory = apps.get_model('products', 'ProductCategory')
+    categories = {category.pk: category for category in ProductCategory.objects.only('pk', 'parent_id')}
+    paths = {}
+
+    def assign(category):
+        chain = []
+        # Walk up to the first ancestor with a known path; a parent cycle is cut where it closes
+        while category is not None and category.pk not in paths and category not in chain:
+            chain.append(category)
+            category = categories.get(category.parent_id)
+        prefix, level = paths.get(category.pk, ('', 0)) if category is not None else ('', 0)
+        for ancestor in reversed(chain):
+            level += 1
+            prefix = f'{prefix}{ancestor.pk.hex}/'
+            paths[ancestor.pk] = (prefix, level)
+            ancestor.path, ancestor.level = prefix, level
+
+    for category in categories.values():
+        assign(category)
+    ProductCategory.objects.bulk_update(categories.values(), ['path', 'level'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_product_item_name_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productcategory',
+            name='path',
+            field=models.CharField(default='', editable=False, max_length=1024),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_paths, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='productcategory',
+            name='path',
+            field=models.CharField(db_index=True, editable=False, max_length=1024),
+        ),
+    ]
@@ -1,4 +1,6 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
 import uuid
 from procurement.apps.users.models import User
 
@@ -12,6 +14,8 @@ class ProductCategory(models.Model):
     description = models.TextField(blank=True, null=True)
     parent = models.ForeignKey('self', on_delete=models.CASCADE, blank=True, null=True, related_name='children')
     level = models.IntegerField(default=1)
+    # Materialized path: the hex ids of the ancestors and this category, each followed by '/'
+    path = models.CharField(max_length=1024, editable=False, db_index=True)
     sort_order = models.IntegerField(default=0)
     is_active = models.BooleanField(default=True)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='created_categories')
@@ -22,10 +26,49 @@ class ProductCategory(models.Model):
         db_table = 'product_categories'
         verbose_name_plural = 'Product Categories'
     
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding:
+                previous = ProductCategory.objects.filter(pk=self.pk).values_list('path', 'level').first()
+            parent_path, parent_level = '', 0
+            if self.parent_id:
+                parent_path, parent_level = ProductCategory.objects.values_list('path', 'level').get(pk=self.parent_id)
+            if previous and parent_path.startswith(previous[0]):
+                raise ValueError('A category cannot be placed under itself or one of its subcategories')
+            self.path = f'{parent_path}{self.pk.hex}/'
+            self.level = parent_level + 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields:
+                kwargs['update_fields'] = {*update_fields, 'path', 'level'}
+            super().save(*args, **kwargs)
+            if previous and previous[0] != self.path:
+                # Moved: re-root the whole subtree in one statement
+                ProductCategory.objects.filter(path__startswith=previous[0]).exclude(pk=self.pk).update(
+                    path=Concat(Value(self.path), Substr('path', len(previous[0]) + 1)),
+                    level=F('level') + (self.level - previous[1]),
+                )
+    
+    def subtree(self):
+        """This category and every category under it, at any depth, as one indexed prefix query"""
+        return ProductCategory.objects.filter(path__startswith=self.path)
+    
     def __str__(self):
         return f"{self.code} - {self.name}"
 
 
+def link_children(categories):
+    """Set each category's ``tree_children`` from the others, keeping their order; returns those without a parent among them"""
+    nodes = {category.pk: category for category in categories}
+    roots = []
+    for category in categories:
+        category.tree_children = []
+    for category in categories:
+        parent = nodes.get(category.parent_id)
+        (parent.tree_children if parent else roots).append(category)
+    return roots
+
+
 class Product(models.Model):
     """Product catalog model"""
     
@@ -49,6 +92,10 @@ class Product(models.Model):
     
     class Meta:
         db_table = 'products'
+        indexes = [
+            # Serves the keyset pages of ProductViewSet.search
+            models.Index(fields=['item_name', 'id'], name='products_item_name_id_idx'),
+        ]
     
     def __str__(self):
         return self.item_name
\ No newline at end of file
@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Product, ProductCategory
+from procurement.projection import FieldProjectionMixin
+from .models import Product, ProductCategory, link_children
 
 
 class ProductCategorySerializer(serializers.ModelSerializer):
@@ -8,19 +9,28 @@ class ProductCategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = ProductCategory
         fields = [
-            'id', 'name', 'code', 'description', 'parent', 'level',
+            'id', 'name', 'code', 'description', 'parent', 'level', 'path',
             'sort_order', 'is_active', 'created_by', 'created_at',
             'updated_at', 'children'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'children']
+        read_only_fields = ['id', 'level', 'path', 'created_at', 'updated_at', 'children']
+    
+    def validate_parent(self, parent):
+        if parent and self.instance and parent.path.startswith(self.instance.path):
+            raise serializers.ValidationError('A category cannot be placed under itself or one of its subcategories')
+        return parent
     
     def get_children(self, obj):
-        if obj.children.exists():
-            return ProductCategorySerializer(obj.children.all(), many=True).data
-        return []
+        children = getattr(obj, 'tree_children', None)
+        if children is None:
+            # Not linked by the tree endpoint: read the whole subtree in one query
+            descendants = obj.subtree().exclude(pk=obj.pk).order_by('level', 'sort_order', 'name')
+            link_children([obj, *descendants])
+            children = obj.tree_children
+        return ProductCategorySerializer(children, many=True, context=self.context).data
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(FieldProjectionMixin, serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
     
     class Meta:
@@ -2,7 +2,9 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.db.models import Q
-from .models import Product, ProductCategory
+from procurement import projection
+from procurement.pagination import KeysetPagination
+from .models import Product, ProductCategory, link_children
 from .serializers import ProductSerializer, ProductCategorySerializer
 
 
@@ -16,8 +18,9 @@ class ProductCategoryViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def tree(self, request):
-        """Get hierarchical category tree"""
-        root_categories = ProductCategory.objects.filter(parent=None, is_active=True)
+        """Get hierarchical category tree, assembled from one query ordered parents first"""
+        categories = list(ProductCategory.objects.order_by('level', 'sort_order', 'name'))
+        root_categories = [category for category in link_children(categories) if category.is_active]
         serializer = self.get_serializer(root_categories, many=True)
         return Response(serializer.data)
 
@@ -30,14 +33,16 @@ class ProductViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
     
-    @action(detail=False, methods=['get'])
+    @action(detail=False, methods=['get'], pagination_class=KeysetPagination)
     def search(self, request):
-        """Search products by various criteria"""
+        """Search products by various criteria, by name, one ?cursor= page of the ?fields= asked for"""
         query = request.query_params.get('q', '')
         category_id = request.query_params.get('category', '')
+        subtree = request.query_params.get('subtree', '').lower() == 'true'
         tags = request.query_params.get('tags', '')
+        fields = projection.requested_fields(request, ProductSerializer)
         
-        queryset = self.get_queryset()
+        queryset = projection.project(self.get_queryset().select_related('category'), ProductSerializer, fields)
         
         if query:
             queryset = queryset.filter(
@@ -47,7 +52,11 @@ class ProductViewSet(viewsets.ModelViewSet):
                 Q(external_code__icontains=query)
             )
         
-        if category_id:
+        if category_id and subtree:
+            # Products in the category or any category under it
+            path = ProductCategory.objects.filter(pk=category_id).values_list('path', flat=True).first()
+            queryset = queryset.filter(category__path__startswith=path) if path else queryset.none()
+        elif category_id:
             queryset = queryset.filter(category_id=category_id)
         
         if tags:
@@ -55,8 +64,9 @@ class ProductViewSet(viewsets.ModelViewSet):
             for tag in tag_list:
                 queryset = queryset.filter(tags__contains=[tag.strip()])
         
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(queryset.order_by('item_name', 'pk'))
+        serializer = self.get_serializer(page, many=True, context={**self.get_serializer_context(), 'fields': fields})
+        return self.get_paginated_response(serializer.data)
     
     def get_queryset(self):
         """Filter products based on user role"""
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-17 15:55
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('purchase_orders', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='polineitem',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=models.Index(fields=['updated_at'], name='purchase_orders_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='polineitem',
+            index=models.Index(fields=['updated_at'], name='po_line_items_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='polineitem',
+            index=models.Index(fields=['delivery_date'], name='po_line_items_delivery_idx'),
+        ),
+    ]
@@ -39,6 +39,9 @@ class PurchaseOrder(models.Model):
     
     class Meta:
         db_table = 'purchase_orders'
+        indexes = [
+            models.Index(fields=['updated_at'], name='purchase_orders_updated_idx'),
+        ]
     
     def __str__(self):
         return self.po_number
@@ -61,9 +64,14 @@ class POLineItem(models.Model):
     total_price = models.DecimalField(max_digits=10, decimal_places=2)
     delivery_date = models.DateTimeField(blank=True, null=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         db_table = 'po_line_items'
+        indexes = [
+            models.Index(fields=['updated_at'], name='po_line_items_updated_idx'),
+            models.Index(fields=['delivery_date'], name='po_line_items_delivery_idx'),
+        ]
     
     def __str__(self):
         return f"{self.purchase_order.po_number} - {self.product.item_name}"
\ No newline at end of file
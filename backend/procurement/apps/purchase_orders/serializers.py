@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from procurement.apps.attachments.serializers import AttachmentReferencesField
 from .models import PurchaseOrder, POLineItem
 
 
@@ -19,6 +20,7 @@ class PurchaseOrderSerializer(serializers.ModelSerializer):
     vendor_name = serializers.CharField(source='vendor.company_name', read_only=True)
     rfx_title = serializers.CharField(source='rfx.title', read_only=True)
     auction_name = serializers.CharField(source='auction.name', read_only=True)
+    attachments = AttachmentReferencesField(required=False)
     
     class Meta:
         model = PurchaseOrder
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class RfxConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'procurement.apps.rfx'
\ No newline at end of file
+    name = 'procurement.apps.rfx'
+
+    def ready(self):
+        from . import stats  # noqa: F401 - registers the statistics maintenance receivers
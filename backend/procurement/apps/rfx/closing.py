@@ -0,0 +1,132 @@
+"""Due-date driven RFx auto-close worker.
+
+Open events (published or active) with a due date are kept in a min-heap
+keyed on ``due_date``, loaded once through the (status, due_date) index.
+Each tick folds in the events created or edited since the previous tick,
+read through the ``updated_at`` index, pops everything that has fallen due
+and closes it with one bulk UPDATE, then sleeps until the next due date.
+The table is never rescanned after the initial load.
+
+Edits leave stale heap entries behind instead of searching the heap for
+them; an entry only counts while it matches the latest due date recorded
+for its event. The change feed re-reads ``CHANGE_OVERLAP_SECONDS`` before
+its watermark, because ``updated_at`` is stamped before the writing
+transaction commits and a slow commit would otherwise be missed. Only open
+events are read from the feed: one closed, cancelled or stripped of its due
+date elsewhere keeps its heap entry, and the closing UPDATE re-checks status
+and due date so the leftover entry changes nothing.
+"""
+import heapq
+from datetime import timedelta
+
+from django.utils import timezone
+
+from procurement.workers import run_until_stopped
+from .models import RFxEvent
+
+OPEN_STATUSES = ('published', 'active')
+CHANGE_OVERLAP_SECONDS = 30
+BATCH_SIZE = 500
+
+
+def accepts_responses(rfx, now=None):
+    """Whether vendors may still respond to ``rfx``"""
+    if rfx.status in ('closed', 'cancelled'):
+        return False
+    return rfx.due_date is None or rfx.due_date > (now or timezone.now())
+
+
+class DueHeap:
+    """Min-heap of (due_date, rfx_id) with lazy removal of superseded entries"""
+
+    def __init__(self):
+        self._heap = []
+        self._due = {}
+
+    def __len__(self):
+        return len(self._due)
+
+    def set(self, rfx_id, due_date, status):
+        """Record the current due date and status of an event"""
+        if status not in OPEN_STATUSES or due_date is None:
+            self._due.pop(rfx_id, None)
+            return
+        if self._due.get(rfx_id) == due_date:
+            return
+        self._due[rfx_id] = due_date
+        heapq.heappush(self._heap, (due_date, rfx_id))
+        if len(self._heap) > 2 * len(self._due) + 1000:
+            self._heap = [(due, pk) for pk, due in self._due.items()]
+            heapq.heapify(self._heap)
+
+    def next_due(self):
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now):
+        """Remove and return the ids of every event due at or before ``now``"""
+        due = []
+        while (next_due := self.next_due()) is not None and next_due <= now:
+            _, rfx_id = heapq.heappop(self._heap)
+            del self._due[rfx_id]
+            due.append(rfx_id)
+        return due
+
+
+class RFxCloser:
+    """Closes RFx events as their due dates pass"""
+
+    def __init__(self):
+        self.heap = DueHeap()
+        self.watermark = None
+
+    def load(self, now):
+        rows = RFxEvent.objects.filter(status__in=OPEN_STATUSES, due_date__isnull=False)
+        for rfx_id, due_date, status in rows.values_list('pk', 'due_date', 'status').iterator(chunk_size=5000):
+            self.heap.set(rfx_id, due_date, status)
+        self.watermark = now
+
+    def refresh(self, now):
+        """Fold in events created or edited since the last tick; returns how many were read"""
+        since = self.watermark - timedelta(seconds=CHANGE_OVERLAP_SECONDS)
+        rows = RFxEvent.objects.filter(
+            updated_at__gte=since, status__in=OPEN_STATUSES, due_date__isnull=False
+        ).values_list('pk', 'due_date', 'status')
+        changed = 0
+        for rfx_id, due_date, status in rows.iterator(chunk_size=5000):
+            self.heap.set(rfx_id, due_date, status)
+            changed += 1
+        self.watermark = now
+        return changed
+
+    def close_due(self, now):
+        """Close every event due by ``now``; the filter re-checks rows edited since they were read"""
+        due = self.heap.pop_due(now)
+        closed = 0
+        for start in range(0, len(due), BATCH_SIZE):
+            closed += RFxEvent.objects.filter(
+                pk__in=due[start:start + BATCH_SIZE], status__in=OPEN_STATUSES, due_date__lte=now
+            ).update(status='closed', updated_at=now)
+        return closed
+
+    def tick(self, now=None):
+        """Sync the heap and close due events; returns (changes read, events closed)"""
+        now = now or timezone.now()
+        if self.watermark is None:
+            self.load(now)
+            changed = len(self.heap)
+        else:
+            changed = self.refresh(now)
+        closed = self.close_due(now)
+        return changed, closed
+
+    def next_due(self, now=None):
+        """Earliest due date still open in the heap"""
+        return self.heap.next_due()
+
+
+def run(max_sleep=60, stop_event=None, on_tick=None):
+    """Tick until ``stop_event`` is set, sleeping until the next due date; ``on_tick`` gets (now, counts, next due)"""
+    closer = RFxCloser()
+    run_until_stopped(closer.tick, closer.next_due, max_sleep, stop_event, on_tick)
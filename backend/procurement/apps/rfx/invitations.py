@@ -0,0 +1,116 @@
+"""Set-based vendor invitations for RFx events.
+
+Inviting N vendors costs a constant number of statements rather than a
+get_or_create per vendor: one lookup of the requested vendors, one fetch of
+who is already invited, one batched insert with ``ignore_conflicts`` (so a
+concurrent invite of the same vendor is not an error) and one batched insert
+of notifications for the vendors that were newly invited. The batched
+inserts bypass the model signals, so the event's statistics are rebuilt once
+afterwards.
+"""
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from procurement.apps.boms.models import BOMItem
+from procurement.apps.notifications.models import Notification
+from procurement.apps.vendors import matching
+from procurement.apps.vendors.models import Vendor
+from . import stats
+from .models import RFxInvitation
+
+BATCH_SIZE = 500
+
+
+class InvitationResult:
+    """Outcome of a bulk invite"""
+
+    def __init__(self, invited, already_invited, unknown, notified):
+        self.invited = invited
+        self.already_invited = already_invited
+        self.unknown = unknown
+        self.notified = notified
+
+    def counts(self):
+        return {
+            'invited': len(self.invited),
+            'already_invited': len(self.already_invited),
+            'unknown': len(self.unknown),
+            'notified': self.notified,
+        }
+
+
+def _parse_vendor_ids(vendor_ids):
+    """Split the requested ids into distinct valid UUIDs (in request order) and malformed values"""
+    valid, invalid, seen = [], [], set()
+    for raw in vendor_ids:
+        try:
+            vendor_id = Vendor._meta.pk.to_python(raw)
+        except ValidationError:
+            invalid.append(str(raw))
+            continue
+        if vendor_id is not None and vendor_id not in seen:
+            seen.add(vendor_id)
+            valid.append(vendor_id)
+    return valid, invalid
+
+
+def _notify(rfx, user_ids):
+    Notification.objects.bulk_create(
+        [
+            Notification(
+                user_id=user_id,
+                title=f"New invitation: {rfx.title}",
+                message=f"You have been invited to respond to {rfx.type.upper()} {rfx.reference_no or rfx.title}",
+                type='info',
+                entity_type='rfx',
+                entity_id=rfx.pk,
+            )
+            for user_id in user_ids
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+
+def bom_categories(rfx):
+    """Categories named by the event's BOM, its items and their products, in first-seen order"""
+    if rfx.bom_id is None:
+        return []
+    values = [rfx.bom.category]
+    for row in BOMItem.objects.filter(bom_id=rfx.bom_id).values_list(
+        'category', 'product__category__name', 'product__category_legacy'
+    ):
+        values.extend(row)
+    return list(dict.fromkeys(value for value in values if value))
+
+
+def suggest_vendors(rfx, categories=None, certifications=(), region='', limit=20):
+    """Best matches for ``rfx`` (by its BOM categories unless given) among vendors not yet invited"""
+    categories = categories or bom_categories(rfx)
+    invited = RFxInvitation.objects.filter(rfx=rfx).values_list('vendor_id', flat=True)
+    return categories, matching.match_vendors(
+        Vendor.objects.all(), categories, certifications, region, exclude=list(invited), limit=limit
+    )
+
+
+def invite_vendors(rfx, vendor_ids):
+    """Invite the given vendors to ``rfx`` and notify the ones not invited before"""
+    requested, unknown = _parse_vendor_ids(vendor_ids)
+    users = dict(Vendor.objects.filter(pk__in=requested).values_list('pk', 'user_id'))
+    unknown += [str(vendor_id) for vendor_id in requested if vendor_id not in users]
+    existing = set(
+        RFxInvitation.objects.filter(rfx=rfx, vendor_id__in=list(users)).values_list('vendor_id', flat=True)
+    )
+    new = [vendor_id for vendor_id in requested if vendor_id in users and vendor_id not in existing]
+
+    with transaction.atomic():
+        RFxInvitation.objects.bulk_create(
+            [RFxInvitation(rfx=rfx, vendor_id=vendor_id, status='invited') for vendor_id in new],
+            batch_size=BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        user_ids = [users[vendor_id] for vendor_id in new if users[vendor_id]]
+        _notify(rfx, user_ids)
+        if new:
+            stats.rebuild([rfx.pk])
+
+    return InvitationResult(new, [vendor_id for vendor_id in requested if vendor_id in existing], unknown, len(user_ids))
@@ -0,0 +1,79 @@
+"""Benchmark RFx next-stage promotion of events with thousands of invitees"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries
+from django.test.utils import override_settings
+
+from procurement.apps.rfx import stages
+from procurement.apps.rfx.models import RFxEvent, RFxInvitation, RFxResponse
+from procurement.apps.vendors.models import Vendor
+from procurement.bench import bench_owner
+
+
+class Command(BaseCommand):
+    help = 'Promote a synthetic RFI through RFP to RFQ and report time, queries and copied rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--invitees', type=int, default=5000)
+        parser.add_argument('--responses', type=int, default=1000)
+        parser.add_argument('--shortlist', type=int, default=200)
+
+    def handle(self, *args, **options):
+        with bench_owner(RFxEvent, Vendor) as owner:
+            tag = owner.last_name
+            vendors = Vendor.objects.bulk_create([
+                Vendor(company_name=f'Bench vendor {tag}-{i}', created_by=owner)
+                for i in range(options['invitees'])
+            ], batch_size=2000)
+            rfi = RFxEvent.objects.create(title=f'Bench RFI {tag}', type='rfi', created_by=owner, scope='Bench scope')
+            RFxInvitation.objects.bulk_create(
+                [RFxInvitation(rfx=rfi, vendor=vendor) for vendor in vendors], batch_size=2000
+            )
+            responses = RFxResponse.objects.bulk_create([
+                RFxResponse(rfx=rfi, vendor=vendor, quoted_price=1000 + i, lead_time=10, response={'note': i})
+                for i, vendor in enumerate(vendors[:options['responses']])
+            ], batch_size=2000)
+
+            rfp, invited, carried = self.timed('RFI -> RFP (all invitees)', stages.promote, rfi, owner)
+            self.expect('RFP invitations', invited, options['invitees'], rfp.invitations.count())
+
+            rfp_responses = RFxResponse.objects.bulk_create([
+                RFxResponse(rfx=rfp, vendor_id=response.vendor_id, quoted_price=response.quoted_price)
+                for response in responses[:options['shortlist']]
+            ])
+            shortlist = [str(response.pk) for response in rfp_responses]
+            rfq, invited, carried = self.timed(
+                'RFP -> RFQ (shortlist, carry forward)', stages.promote, rfp, owner,
+                shortlist=shortlist, carry_forward_responses=True,
+            )
+            self.expect('RFQ invitations', invited, len(shortlist), rfq.invitations.count())
+            self.expect('RFQ responses', carried, len(shortlist), rfq.responses.count())
+
+            before = RFxEvent.objects.filter(created_by=owner).count()
+            try:
+                stages.promote(rfp, owner, shortlist=shortlist + [str(responses[-1].pk)])
+            except stages.StageError:
+                pass
+            else:
+                raise CommandError('A shortlist with a response of another RFx was accepted')
+            if RFxEvent.objects.filter(created_by=owner).count() != before:
+                raise CommandError('A rejected promotion left an event behind')
+            self.stdout.write(self.style.SUCCESS('Promotion copies match and rejected promotions roll back'))
+
+    def timed(self, label, func, *args, **kwargs):
+        with override_settings(DEBUG=True):
+            reset_queries()
+            started = time.perf_counter()
+            result = func(*args, **kwargs)
+            elapsed = time.perf_counter() - started
+            queries = len(connection.queries)
+        self.stdout.write(
+            f'{label}: {result[1]} invitations, {result[2]} responses copied in '
+            f'{elapsed * 1000:.1f}ms with {queries} queries'
+        )
+        return result
+
+    def expect(self, label, reported, expected, stored):
+        if not reported == expected == stored:
+            raise CommandError(f'{label}: reported {reported}, expected {expected}, stored {stored}')
@@ -0,0 +1,115 @@
+"""Benchmark vectorised RFx response scoring against a per-row Python loop"""
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from procurement.apps.rfx import scoring
+from procurement.apps.rfx.models import RFxEvent, RFxResponse
+from procurement.apps.vendors.models import Vendor
+from procurement.bench import bench_owner
+
+
+def python_scores(rfx_id, criteria):
+    """Reference implementation: the same scoring written as plain loops"""
+    rows = list(RFxResponse.objects.filter(rfx_id=rfx_id).order_by('submitted_at').values_list(
+        'id', 'quoted_price', 'lead_time', 'response'
+    ))
+    columns = []
+    for criterion in criteria:
+        column = []
+        for _, price, lead_time, response in rows:
+            if criterion['path'] is None:
+                value = price if criterion['key'] == 'quoted_price' else lead_time
+            else:
+                value = response or {}
+                for part in criterion['path'].split('.'):
+                    value = value.get(part) if isinstance(value, dict) else None
+            column.append(float(value) if value is not None else None)
+        columns.append(column)
+    total_weight = sum(criterion['weight'] for criterion in criteria)
+    bounds = []
+    for column in columns:
+        present = [value for value in column if value is not None]
+        bounds.append((min(present), max(present)) if present else (0, 0))
+    totals = {}
+    for row_index, row in enumerate(rows):
+        total = 0
+        for criterion, column, (low, high) in zip(criteria, columns, bounds):
+            value = column[row_index]
+            if value is None:
+                continue
+            if high == low:
+                scaled = 1.0
+            elif criterion['direction'] == 'min':
+                scaled = (high - value) / (high - low)
+            else:
+                scaled = (value - low) / (high - low)
+            total += scaled * criterion['weight'] / total_weight
+        totals[row[0]] = total
+    return totals
+
+
+class Command(BaseCommand):
+    help = 'Score a synthetic RFQ with many responses and criteria and time it'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--responses', type=int, default=5000)
+        parser.add_argument('--criteria', type=int, default=40, help='Line-item criteria besides price and lead time')
+        parser.add_argument('--skip-reference', action='store_true', help='Do not time the Python loop version')
+
+    def handle(self, *args, **options):
+        rng = random.Random(13)
+        with bench_owner(RFxEvent, Vendor) as owner:
+            tag = owner.last_name
+            keys = [f'item_{index}' for index in range(options['criteria'])]
+            rfx = RFxEvent.objects.create(
+                title=f'Scoring benchmark {tag}', type='rfq', created_by=owner,
+                evaluation_parameters={'criteria': [
+                    {'key': 'quoted_price', 'weight': 40},
+                    {'key': 'lead_time', 'weight': 10},
+                ] + [
+                    {'key': key, 'weight': 50 / len(keys), 'direction': 'min', 'path': f'line_items.{key}'}
+                    for key in keys
+                ]},
+            )
+            vendors = Vendor.objects.bulk_create([
+                Vendor(company_name=f'Bench vendor {tag}-{i}', created_by=owner)
+                for i in range(options['responses'])
+            ])
+            RFxResponse.objects.bulk_create([
+                RFxResponse(
+                    rfx=rfx,
+                    vendor=vendor,
+                    quoted_price=Decimal(rng.randint(10_000, 1_000_000)) / 100,
+                    lead_time=rng.randint(5, 90),
+                    response={'line_items': {
+                        key: round(rng.uniform(1, 500), 2) for key in keys if rng.random() > 0.02
+                    }},
+                )
+                for vendor in vendors
+            ], batch_size=1000)
+
+            criteria = scoring.parse_criteria(rfx.evaluation_parameters)
+            started = time.perf_counter()
+            rows, raw = scoring.load_matrix(rfx.id, criteria)
+            loaded = time.perf_counter()
+            scoring.rank_matrix(rows, raw, criteria, limit=20)
+            scored = time.perf_counter()
+            ranked = scoring.rank_matrix(rows, raw, criteria)
+            finished = time.perf_counter()
+            self.stdout.write(
+                f'responses={len(rows)} criteria={len(criteria)} load={(loaded - started) * 1000:.1f}ms '
+                f'score+rank(top 20)={(scored - loaded) * 1000:.1f}ms '
+                f'score+rank(full matrix)={(finished - scored) * 1000:.1f}ms'
+            )
+
+            if not options['skip_reference']:
+                started = time.perf_counter()
+                expected = python_scores(rfx.id, criteria)
+                self.stdout.write(f'python loop reference={(time.perf_counter() - started) * 1000:.1f}ms')
+                for row in ranked:
+                    if abs(expected[row['response']] - row['total_score']) > 1e-5:
+                        raise CommandError(f'Score mismatch for response {row["response"]}')
+            self.stdout.write(self.style.SUCCESS('Scoring checks passed'))
@@ -0,0 +1,70 @@
+"""Benchmark the vendor-scoped RFx event list: join + DISTINCT versus semi-join filters"""
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Exists, OuterRef
+
+from procurement.apps.rfx.models import RFxEvent, RFxInvitation
+from procurement.apps.users.models import User
+from procurement.apps.vendors.lookups import vendor_ids_for_user
+from procurement.apps.vendors.models import Vendor
+from procurement.bench import bench_owner
+
+
+class Command(BaseCommand):
+    help = 'Compare plans and latency of the vendor RFx visibility filter variants'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=20000)
+        parser.add_argument('--vendors', type=int, default=500)
+        parser.add_argument('--invites-per-event', type=int, default=10)
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        rng = random.Random(5)
+        with bench_owner(RFxEvent, Vendor) as owner:
+            tag = owner.last_name
+            vendor_user = User.objects.create(id=f'{owner.id}-v', email=f'{owner.id}-v@example.com', role='vendor')
+            vendors = Vendor.objects.bulk_create([
+                Vendor(company_name=f'Bench vendor {tag}-{i}', created_by=owner, user=vendor_user if i == 0 else None)
+                for i in range(options['vendors'])
+            ])
+            events = RFxEvent.objects.bulk_create([
+                RFxEvent(title=f'Bench RFQ {i}', type='rfq', created_by=owner)
+                for i in range(options['events'])
+            ], batch_size=2000)
+            RFxInvitation.objects.bulk_create([
+                RFxInvitation(rfx=event, vendor=vendor)
+                for event in events
+                for vendor in rng.sample(vendors, options['invites_per_event'])
+            ], batch_size=5000)
+
+            before = RFxEvent.objects.filter(invitations__vendor__user=vendor_user).distinct().order_by('-created_at')
+            correlated = RFxEvent.objects.filter(Exists(RFxInvitation.objects.filter(
+                rfx=OuterRef('pk'), vendor_id__in=vendor_ids_for_user(vendor_user)
+            ))).order_by('-created_at')
+            after = RFxEvent.objects.filter(pk__in=RFxInvitation.objects.filter(
+                vendor_id__in=vendor_ids_for_user(vendor_user)
+            ).values('rfx_id')).order_by('-created_at')
+
+            results = {}
+            variants = (('join + DISTINCT', before), ('correlated EXISTS', correlated), ('semi-join', after))
+            for label, queryset in variants:
+                self.stdout.write(f'--- {label}\n{queryset[:options["page_size"]].explain()}')
+                timings = []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    count = queryset.count()
+                    page = list(queryset.values_list('pk', flat=True)[:options['page_size']])
+                    timings.append(time.perf_counter() - started)
+                results[label] = (count, tuple(page))
+                self.stdout.write(
+                    f'{label}: {count} visible events, count + first page median '
+                    f'{statistics.median(timings) * 1000:.1f}ms over {options["repeat"]} runs'
+                )
+            if len(set(results.values())) != 1:
+                raise CommandError('The visibility filters disagree')
+            self.stdout.write(self.style.SUCCESS('All filters return the same events'))
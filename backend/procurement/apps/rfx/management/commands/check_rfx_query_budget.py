@@ -0,0 +1,63 @@
+"""Fail when the RFx list endpoint's query count grows with the number of events"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from procurement.apps.rfx.models import RFxEvent, RFxInvitation, RFxResponse
+from procurement.apps.vendors.models import Vendor
+from procurement.bench import bench_owner
+
+# Queries allowed per list request, whatever the page holds: the session middleware's
+# user lookup, page count, page and one per prefetched collection
+QUERY_BUDGET = {
+    '': 3,
+    'invitations': 4,
+    'responses': 4,
+    'all': 5,
+}
+
+
+class Command(BaseCommand):
+    help = 'Check the RFx event list stays within a constant query budget for every expand= option'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=20)
+        parser.add_argument('--vendors', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with bench_owner(RFxEvent, Vendor, prefix='budget', role='buyer_admin') as owner:
+            tag = owner.last_name
+            # The custom User model does not implement the auth flags DRF's IsAuthenticated reads
+            owner.is_authenticated = True
+            client = APIClient()
+            client.force_authenticate(owner)
+            vendors = Vendor.objects.bulk_create([
+                Vendor(company_name=f'Budget vendor {tag}-{i}', email=f'v{i}@{tag}.example.com', created_by=owner)
+                for i in range(options['vendors'])
+            ])
+            # The session middleware creates the user's session row on first contact; keep it out of the budget
+            client.get('/api/rfx/events/')
+            failures = []
+            for count in (1, options['events']):
+                self.seed(owner, vendors, count)
+                for expand, budget in QUERY_BUDGET.items():
+                    with CaptureQueriesContext(connection) as queries:
+                        response = client.get('/api/rfx/events/', {'expand': expand, 'page_size': 100})
+                    if response.status_code != 200:
+                        raise CommandError(f'expand={expand!r} returned {response.status_code}')
+                    self.stdout.write(f'events={count} expand={expand or "-"}: {len(queries)} queries (budget {budget})')
+                    if len(queries) > budget:
+                        failures.append(f'expand={expand!r} with {count} events used {len(queries)} > {budget}')
+            if failures:
+                raise CommandError('Query budget exceeded: ' + '; '.join(failures))
+            self.stdout.write(self.style.SUCCESS('RFx list stays within its query budget'))
+
+    def seed(self, owner, vendors, count):
+        existing = RFxEvent.objects.filter(created_by=owner).count()
+        events = RFxEvent.objects.bulk_create([
+            RFxEvent(title=f'Budget RFQ {existing + i}', type='rfq', created_by=owner)
+            for i in range(count - existing)
+        ])
+        RFxInvitation.objects.bulk_create([RFxInvitation(rfx=event, vendor=vendor) for event in events for vendor in vendors])
+        RFxResponse.objects.bulk_create([RFxResponse(rfx=event, vendor=vendor) for event in events for vendor in vendors])
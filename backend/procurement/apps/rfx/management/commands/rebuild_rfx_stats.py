@@ -0,0 +1,20 @@
+"""Recompute the materialised RFx statistics from responses and invitations"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from procurement.apps.rfx import stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild RFx statistics for every event (or the given ones) with one grouped query'
+
+    def add_arguments(self, parser):
+        parser.add_argument('rfx_ids', nargs='*', help='Only rebuild these events')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = stats.rebuild(options['rfx_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt statistics of {written} RFx event(s) in {time.perf_counter() - started:.2f}s'
+        ))
@@ -0,0 +1,31 @@
+"""Run the RFx auto-close worker as a long-lived process"""
+from django.core.management.base import BaseCommand
+
+from procurement.apps.rfx import closing
+
+
+class Command(BaseCommand):
+    help = 'Close published and active RFx events as their due dates pass'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Run a single tick and exit')
+        parser.add_argument(
+            '--max-sleep', type=float, default=60,
+            help='Upper bound in seconds between ticks when no due date is sooner',
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            closer = closing.RFxCloser()
+            self.report(None, closer.tick(), closer.next_due())
+            return
+        self.stdout.write('Starting RFx closer...')
+        try:
+            closing.run(max_sleep=options['max_sleep'], on_tick=self.report)
+        except KeyboardInterrupt:
+            self.stdout.write('RFx closer stopped')
+
+    def report(self, now, counts, next_due):
+        changed, closed = counts
+        next_at = next_due.isoformat() if next_due else 'none'
+        self.stdout.write(f'Tick read {changed} event change(s), closed {closed}; next due date: {next_at}')
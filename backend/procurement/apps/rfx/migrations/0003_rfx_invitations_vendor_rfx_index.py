@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 13:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rfx', '0002_initial'),
+        ('vendors', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rfxinvitation',
+            index=models.Index(fields=['vendor', 'rfx'], name='rfx_invitations_vendor_rfx_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-17 14:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rfx', '0003_rfx_invitations_vendor_rfx_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rfxevent',
+            index=models.Index(fields=['status', 'due_date'], name='rfx_events_status_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rfxevent',
+            index=models.Index(fields=['updated_at'], name='rfx_events_updated_at_idx'),
+        ),
+    ]
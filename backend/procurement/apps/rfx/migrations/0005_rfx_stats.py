@@ -0,0 +1,78 @@
+# Generated by Django 5.2.4 on 2026-10-17 14:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_stats(apps, schema_editor):
+    """Compute statistics for the events that existed before the table"""
+    RFxEvent = apps.get_model('rfx', 'RFxEvent')
+    RFxInvitation = apps.get_model('rfx', 'RFxInvitation')
+    RFxStats = apps.get_model('rfx', 'RFxStats')
+    invitation_counts = {}
+    for rfx_id, status, count in (
+        RFxInvitation.objects.order_by().values_list('rfx_id', 'status').annotate(n=models.Count('*'))
+    ):
+        invitation_counts.setdefault(rfx_id, {})[status] = count
+    rows = RFxEvent.objects.order_by().annotate(
+        response_count=models.Count('responses'),
+        quoted_count=models.Count('responses__quoted_price'),
+        quoted_price_total=models.Sum('responses__quoted_price'),
+        min_quoted_price=models.Min('responses__quoted_price'),
+        max_quoted_price=models.Max('responses__quoted_price'),
+        min_lead_time=models.Min('responses__lead_time'),
+    ).values(
+        'pk', 'response_count', 'quoted_count', 'quoted_price_total',
+        'min_quoted_price', 'max_quoted_price', 'min_lead_time',
+    )
+    batch = []
+    for row in rows.iterator(chunk_size=1000):
+        counts = invitation_counts.get(row['pk'], {})
+        batch.append(RFxStats(
+            rfx_id=row['pk'],
+            response_count=row['response_count'],
+            quoted_count=row['quoted_count'],
+            quoted_price_total=row['quoted_price_total'] or 0,
+            min_quoted_price=row['min_quoted_price'],
+            max_quoted_price=row['max_quoted_price'],
+            min_lead_time=row['min_lead_time'],
+            invited_count=counts.get('invited', 0),
+            viewed_count=counts.get('viewed', 0),
+            responded_count=counts.get('responded', 0),
+            declined_count=counts.get('declined', 0),
+        ))
+        if len(batch) == 1000:
+            RFxStats.objects.bulk_create(batch)
+            batch = []
+    RFxStats.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rfx', '0004_rfx_events_due_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RFxStats',
+            fields=[
+                ('rfx', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='rfx.rfxevent')),
+                ('response_count', models.IntegerField(default=0)),
+                ('invited_count', models.IntegerField(default=0)),
+                ('viewed_count', models.IntegerField(default=0)),
+                ('responded_count', models.IntegerField(default=0)),
+                ('declined_count', models.IntegerField(default=0)),
+                ('quoted_count', models.IntegerField(default=0)),
+                ('quoted_price_total', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('min_quoted_price', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('max_quoted_price', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('min_lead_time', models.IntegerField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'rfx_stats',
+            },
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
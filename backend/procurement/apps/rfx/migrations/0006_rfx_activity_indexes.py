@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-17 15:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rfx', '0005_rfx_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rfxinvitation',
+            index=models.Index(fields=['invited_at'], name='rfx_invitations_invited_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rfxinvitation',
+            index=models.Index(fields=['responded_at'], name='rfx_invitations_responded_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rfxresponse',
+            index=models.Index(fields=['submitted_at'], name='rfx_responses_submitted_idx'),
+        ),
+    ]
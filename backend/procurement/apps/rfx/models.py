@@ -1,3 +1,4 @@
+from decimal import Decimal
 from django.db import models
 import uuid
 from procurement.apps.users.models import User
@@ -42,6 +43,10 @@ class RFxEvent(models.Model):
     
     class Meta:
         db_table = 'rfx_events'
+        indexes = [
+            models.Index(fields=['status', 'due_date'], name='rfx_events_status_due_idx'),
+            models.Index(fields=['updated_at'], name='rfx_events_updated_at_idx'),
+        ]
     
     def __str__(self):
         return f"{self.type.upper()} - {self.title}"
@@ -66,6 +71,11 @@ class RFxInvitation(models.Model):
     class Meta:
         db_table = 'rfx_invitations'
         unique_together = ['rfx', 'vendor']
+        indexes = [
+            models.Index(fields=['vendor', 'rfx'], name='rfx_invitations_vendor_rfx_idx'),
+            models.Index(fields=['invited_at'], name='rfx_invitations_invited_idx'),
+            models.Index(fields=['responded_at'], name='rfx_invitations_responded_idx'),
+        ]
     
     def __str__(self):
         return f"{self.rfx.title} - {self.vendor.company_name}"
@@ -87,6 +97,42 @@ class RFxResponse(models.Model):
     
     class Meta:
         db_table = 'rfx_responses'
+        indexes = [
+            models.Index(fields=['submitted_at'], name='rfx_responses_submitted_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.rfx.title} - {self.vendor.company_name} Response"
\ No newline at end of file
+        return f"{self.rfx.title} - {self.vendor.company_name} Response"
+
+
+class RFxStats(models.Model):
+    """Denormalised response and invitation statistics of an RFx event"""
+    
+    rfx = models.OneToOneField(RFxEvent, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    response_count = models.IntegerField(default=0)
+    invited_count = models.IntegerField(default=0)
+    viewed_count = models.IntegerField(default=0)
+    responded_count = models.IntegerField(default=0)
+    declined_count = models.IntegerField(default=0)
+    quoted_count = models.IntegerField(default=0)  # Responses with a quoted price
+    quoted_price_total = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    min_quoted_price = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
+    max_quoted_price = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
+    min_lead_time = models.IntegerField(blank=True, null=True)  # Days
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'rfx_stats'
+    
+    def __str__(self):
+        return f"{self.rfx_id} - {self.response_count} responses"
+    
+    @property
+    def invitation_count(self):
+        return self.invited_count + self.viewed_count + self.responded_count + self.declined_count
+    
+    @property
+    def avg_quoted_price(self):
+        if not self.quoted_count:
+            return None
+        return (Decimal(self.quoted_price_total) / self.quoted_count).quantize(Decimal('0.01'))
@@ -0,0 +1,169 @@
+"""Vectorised scoring of RFx responses.
+
+All responses of an event are loaded as one columnar query: ``quoted_price``
+and ``lead_time`` come straight from their columns, every other criterion is
+extracted from the response JSON by the database. Each column becomes a NumPy
+array, is min-max normalised to 0..1 (1 is best, in the criterion's
+direction) and the weighted sum ranks the vendors, so the cost is a handful
+of array operations instead of a Python loop per response and criterion.
+
+``evaluation_parameters`` may hold the criteria either as a list::
+
+    {"criteria": [{"key": "quoted_price", "weight": 60},
+                  {"key": "quality", "weight": 40, "direction": "max", "path": "scores.quality"}]}
+
+or as a plain ``{"key": weight}`` mapping, possibly JSON-encoded. Events
+without usable criteria are scored on price and lead time.
+"""
+import json
+import math
+import re
+
+import numpy as np
+from django.db.models.fields.json import KT
+
+from .models import RFxResponse
+
+COLUMN_CRITERIA = {'quoted_price': 'min', 'lead_time': 'min'}
+DEFAULT_CRITERIA = [
+    {'key': 'quoted_price', 'weight': 0.7, 'direction': 'min'},
+    {'key': 'lead_time', 'weight': 0.3, 'direction': 'min'},
+]
+PATH_PATTERN = re.compile(r'^[A-Za-z0-9_]+(\.[A-Za-z0-9_]+)*$')
+
+
+class ScoringError(Exception):
+    """Raised when evaluation criteria cannot be used"""
+
+
+def parse_criteria(parameters):
+    """Normalise evaluation parameters into a list of {key, weight, direction, path}"""
+    if isinstance(parameters, str):
+        try:
+            parameters = json.loads(parameters)
+        except ValueError:
+            parameters = None
+    if isinstance(parameters, dict) and 'criteria' in parameters:
+        parameters = parameters['criteria']
+    if isinstance(parameters, dict):
+        parameters = [{'key': key, 'weight': weight} for key, weight in parameters.items()]
+    if not parameters or not isinstance(parameters, list):
+        return [dict(criterion, path=None) for criterion in DEFAULT_CRITERIA]
+
+    criteria = []
+    for item in parameters:
+        if not isinstance(item, dict) or not item.get('key'):
+            raise ScoringError('Each criterion needs a key')
+        key = str(item['key'])
+        try:
+            weight = float(item.get('weight', 1))
+        except (TypeError, ValueError):
+            raise ScoringError(f'Weight of {key} must be a number')
+        direction = item.get('direction') or COLUMN_CRITERIA.get(key, 'max')
+        if direction not in ('min', 'max'):
+            raise ScoringError(f'Direction of {key} must be min or max')
+        path = None if key in COLUMN_CRITERIA else str(item.get('path') or key)
+        if path is not None and not PATH_PATTERN.match(path):
+            raise ScoringError(f'Invalid response path for {key}')
+        if not math.isfinite(weight) or weight < 0:
+            raise ScoringError(f'Weight of {key} must be a finite, non-negative number')
+        criteria.append({'key': key, 'weight': weight, 'direction': direction, 'path': path})
+    total = sum(criterion['weight'] for criterion in criteria)
+    if not total:
+        raise ScoringError('At least one criterion needs a positive weight')
+    if not math.isfinite(total):
+        raise ScoringError('Criterion weights are too large')
+    return criteria
+
+
+def _to_float(values):
+    """Column of DB values as float64, NaN for missing, non-numeric or non-finite entries"""
+    try:
+        column = np.array(values, dtype=float)
+    except (TypeError, ValueError):
+        column = np.full(len(values), np.nan)
+        for index, value in enumerate(values):
+            try:
+                column[index] = float(value)
+            except (TypeError, ValueError):
+                continue
+    # Vendor text such as "inf", "nan" or "1e999" parses, but cannot be scored or rendered as JSON
+    column[~np.isfinite(column)] = np.nan
+    return column
+
+
+def load_matrix(rfx_id, criteria):
+    """Fetch every response of the event as (rows, raw values matrix of shape responses x criteria)"""
+    annotations = {
+        f'c{index}': KT('response__' + criterion['path'].replace('.', '__'))
+        for index, criterion in enumerate(criteria)
+        if criterion['path'] is not None
+    }
+    fields = [
+        criterion['key'] if criterion['path'] is None else f'c{index}'
+        for index, criterion in enumerate(criteria)
+    ]
+    rows = list(
+        RFxResponse.objects.filter(rfx_id=rfx_id)
+        .annotate(**annotations)
+        .order_by('submitted_at')
+        .values_list('id', 'vendor_id', 'vendor__company_name', 'quoted_price', *fields)
+    )
+    if not rows:
+        return rows, np.empty((0, len(criteria)))
+    columns = list(zip(*rows))
+    raw = np.column_stack([_to_float(column) for column in columns[4:]])
+    return rows, raw
+
+
+def normalise(raw, directions):
+    """Min-max scale each column to 0..1 with 1 best; missing values score 0"""
+    missing = np.isnan(raw)
+    low = np.where(missing, np.inf, raw).min(axis=0)
+    high = np.where(missing, -np.inf, raw).max(axis=0)
+    with np.errstate(invalid='ignore'):
+        span = high - low
+        flat = ~np.isfinite(span) | (span == 0)
+        safe_span = np.where(flat, 1, span)
+        minimise = np.array([direction == 'min' for direction in directions])
+        scaled = np.where(minimise, (high - raw) / safe_span, (raw - low) / safe_span)
+    # A criterion every vendor ties on carries no information; score all present values as 1
+    scaled = np.where(flat, 1.0, scaled)
+    return np.where(missing, 0.0, scaled)
+
+
+def rank_matrix(rows, raw, criteria, limit=None):
+    """Weighted, normalised scores of loaded responses, best first (only the top ``limit`` are built)"""
+    if not rows:
+        return []
+    weights = np.array([criterion['weight'] for criterion in criteria], dtype=float)
+    weights = weights / weights.sum()
+    scores = normalise(raw, [criterion['direction'] for criterion in criteria])
+    totals = scores @ weights
+
+    # Highest total first; ties go to the lower quoted price, then the earlier submission
+    prices = _to_float([row[3] for row in rows])
+    order = np.lexsort((np.arange(len(rows)), np.nan_to_num(prices, nan=np.inf), -totals))
+
+    order = order[:limit]
+    total_list = np.round(totals[order], 6).tolist()
+    score_list = np.round(scores[order], 6).tolist()
+    value_list = np.where(np.isnan(raw[order]), None, raw[order]).tolist()
+    return [
+        {
+            'rank': position + 1,
+            'response': rows[index][0],
+            'vendor': rows[index][1],
+            'vendor_name': rows[index][2],
+            'total_score': total_list[position],
+            'scores': score_list[position],
+            'values': value_list[position],
+        }
+        for position, index in enumerate(order.tolist())
+    ]
+
+
+def score_responses(rfx_id, criteria, limit=None):
+    """Score and rank every response of an event; returns (response count, top ``limit`` rows)"""
+    rows, raw = load_matrix(rfx_id, criteria)
+    return len(rows), rank_matrix(rows, raw, criteria, limit)
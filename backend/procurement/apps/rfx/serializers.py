@@ -1,5 +1,8 @@
 from rest_framework import serializers
-from .models import RFxEvent, RFxInvitation, RFxResponse
+from procurement.apps.attachments.serializers import AttachmentReferencesField
+from procurement.expand import ExpandSerializerMixin
+from .closing import accepts_responses
+from .models import RFxEvent, RFxInvitation, RFxResponse, RFxStats
 
 
 class RFxInvitationSerializer(serializers.ModelSerializer):
@@ -17,6 +20,7 @@ class RFxInvitationSerializer(serializers.ModelSerializer):
 
 class RFxResponseSerializer(serializers.ModelSerializer):
     vendor_name = serializers.CharField(source='vendor.company_name', read_only=True)
+    attachments = AttachmentReferencesField(required=False)
     
     class Meta:
         model = RFxResponse
@@ -26,13 +30,37 @@ class RFxResponseSerializer(serializers.ModelSerializer):
             'submitted_at'
         ]
         read_only_fields = ['id', 'submitted_at', 'vendor_name']
+    
+    def validate(self, attrs):
+        rfx = attrs.get('rfx') or getattr(self.instance, 'rfx', None)
+        if rfx is not None and not accepts_responses(rfx):
+            raise serializers.ValidationError({'rfx': 'This RFx is closed for responses'})
+        return attrs
+
+
+class RFxStatsSerializer(serializers.ModelSerializer):
+    invitation_count = serializers.IntegerField(read_only=True)
+    avg_quoted_price = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+    
+    class Meta:
+        model = RFxStats
+        fields = [
+            'response_count', 'invitation_count', 'invited_count', 'viewed_count',
+            'responded_count', 'declined_count', 'min_quoted_price', 'avg_quoted_price',
+            'max_quoted_price', 'min_lead_time', 'updated_at'
+        ]
+        read_only_fields = fields
 
 
-class RFxEventSerializer(serializers.ModelSerializer):
+class RFxEventSerializer(ExpandSerializerMixin, serializers.ModelSerializer):
+    EXPANDABLE_FIELDS = ('invitations', 'responses')
+    
     invitations = RFxInvitationSerializer(many=True, read_only=True)
     responses = RFxResponseSerializer(many=True, read_only=True)
+    stats = RFxStatsSerializer(read_only=True)
+    attachments = AttachmentReferencesField(required=False)
     bom_name = serializers.CharField(source='bom.name', read_only=True)
-    created_by_name = serializers.CharField(source='created_by.get_full_name', read_only=True)
+    created_by_name = serializers.CharField(source='created_by.full_name', read_only=True)
     
     class Meta:
         model = RFxEvent
@@ -41,6 +69,8 @@ class RFxEventSerializer(serializers.ModelSerializer):
             'due_date', 'status', 'evaluation_parameters', 'attachments',
             'bom', 'bom_name', 'contact_person', 'budget', 'parent_rfx',
             'created_by', 'created_by_name', 'created_at', 'updated_at',
-            'invitations', 'responses'
+            'stats', 'invitations', 'responses'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at', 'bom_name', 'created_by_name', 'invitations', 'responses']
\ No newline at end of file
+        read_only_fields = [
+            'id', 'created_at', 'updated_at', 'bom_name', 'created_by_name', 'stats', 'invitations', 'responses'
+        ]
\ No newline at end of file
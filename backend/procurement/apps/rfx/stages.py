@@ -0,0 +1,100 @@
+"""RFI -> RFP -> RFQ stage promotion.
+
+Promoting an event clones it as the next stage and carries its vendors
+forward, optionally narrowed to a shortlist of responses whose content can
+be copied into the new event as a starting point. Everything happens in one
+transaction with batched inserts, so the cost does not grow by a query per
+invitee and a failure leaves no half-built stage behind.
+"""
+import time
+import uuid
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from . import stats
+from .models import RFxEvent, RFxInvitation, RFxResponse
+
+NEXT_STAGE = {'rfi': 'rfp', 'rfp': 'rfq'}
+BATCH_SIZE = 1000
+
+
+class StageError(Exception):
+    """Raised when an event cannot be promoted"""
+
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
+
+
+def _reference_no(next_type):
+    return f"{next_type.upper()}-{int(time.time())}-{uuid.uuid4().hex[:5].upper()}"
+
+
+def _shortlisted_responses(parent, shortlist):
+    try:
+        response_ids = [RFxResponse._meta.pk.to_python(response_id) for response_id in shortlist]
+    except ValidationError:
+        raise StageError('shortlist must contain response ids')
+    responses = list(RFxResponse.objects.filter(rfx=parent, pk__in=response_ids))
+    if len(responses) != len(set(response_ids)):
+        raise StageError('Every shortlisted response must belong to this RFx')
+    return responses
+
+
+def promote(parent, user, shortlist=None, carry_forward_responses=False):
+    """Create the next stage of ``parent``; returns (next_rfx, invited count, carried response count)"""
+    next_type = NEXT_STAGE.get(parent.type)
+    if next_type is None:
+        raise StageError('RFQ is the final stage in the workflow')
+
+    with transaction.atomic():
+        responses = None
+        if shortlist is not None:
+            responses = _shortlisted_responses(parent, shortlist)
+            vendor_ids = list(dict.fromkeys(response.vendor_id for response in responses))
+        else:
+            vendor_ids = list(parent.invitations.values_list('vendor_id', flat=True))
+            if carry_forward_responses:
+                responses = list(parent.responses.all())
+
+        next_rfx = RFxEvent.objects.create(
+            title=f"{next_type.upper()} - {parent.title}",
+            reference_no=_reference_no(next_type),
+            type=next_type,
+            scope=parent.scope,
+            criteria=parent.criteria,
+            evaluation_parameters=parent.evaluation_parameters,
+            attachments=parent.attachments,
+            bom_id=parent.bom_id,
+            contact_person=parent.contact_person,
+            budget=parent.budget,
+            parent_rfx=parent,
+            created_by=user,
+            status='draft'
+        )
+        RFxInvitation.objects.bulk_create(
+            [RFxInvitation(rfx=next_rfx, vendor_id=vendor_id, status='invited') for vendor_id in vendor_ids],
+            batch_size=BATCH_SIZE,
+        )
+        carried = []
+        if carry_forward_responses and responses:
+            carried = RFxResponse.objects.bulk_create(
+                [
+                    RFxResponse(
+                        rfx=next_rfx,
+                        vendor_id=response.vendor_id,
+                        response=response.response,
+                        quoted_price=response.quoted_price,
+                        delivery_terms=response.delivery_terms,
+                        payment_terms=response.payment_terms,
+                        lead_time=response.lead_time,
+                        attachments=response.attachments,
+                    )
+                    for response in responses
+                ],
+                batch_size=BATCH_SIZE,
+            )
+        stats.rebuild([next_rfx.pk])
+
+    return next_rfx, len(vendor_ids), len(carried)
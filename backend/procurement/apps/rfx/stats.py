@@ -0,0 +1,153 @@
+"""Materialised per-RFx response and invitation statistics.
+
+``RFxStats`` holds what lists and dashboards show for an event (responses
+received, invitations by status, lowest / average / highest quote and the
+shortest lead time) so they no longer load every response to compute it.
+
+New responses and invitations bump the row with a single conditional UPDATE
+(counts, running price total, LEAST/GREATEST for the extremes). Edits and
+deletes can move a minimum or maximum in either direction, so they recount
+the event instead; the recount only ever UPDATEs, which keeps it safe while
+the event itself is being cascade-deleted. Bulk inserts bypass the signals
+and call ``rebuild`` for the events they touched, and the
+``rebuild_rfx_stats`` command recomputes every row from one grouped query.
+"""
+from django.db.models import Count, F, IntegerField, Max, Min, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import RFxEvent, RFxInvitation, RFxResponse, RFxStats
+
+BATCH_SIZE = 1000
+STATUS_FIELDS = {
+    'invited': 'invited_count',
+    'viewed': 'viewed_count',
+    'responded': 'responded_count',
+    'declined': 'declined_count',
+}
+STAT_FIELDS = [
+    'response_count', 'quoted_count', 'quoted_price_total', 'min_quoted_price',
+    'max_quoted_price', 'min_lead_time', *STATUS_FIELDS.values(),
+]
+TOTAL_FIELD = RFxStats._meta.get_field('quoted_price_total')
+
+
+def _invitation_count(status):
+    counts = RFxInvitation.objects.filter(rfx=OuterRef('pk'), status=status).order_by().values('rfx')
+    return Coalesce(Subquery(counts.annotate(n=Count('*')).values('n'), output_field=IntegerField()), 0)
+
+
+def computed(rfx_ids=None):
+    """Statistics of the given events (default: all) as dicts, from one grouped query"""
+    events = RFxEvent.objects.order_by()
+    if rfx_ids is not None:
+        events = events.filter(pk__in=rfx_ids)
+    return events.values('pk').annotate(
+        response_count=Count('responses'),
+        quoted_count=Count('responses__quoted_price'),
+        quoted_price_total=Coalesce(Sum('responses__quoted_price'), Value(0), output_field=TOTAL_FIELD),
+        min_quoted_price=Min('responses__quoted_price'),
+        max_quoted_price=Max('responses__quoted_price'),
+        min_lead_time=Min('responses__lead_time'),
+        **{field: _invitation_count(status) for status, field in STATUS_FIELDS.items()},
+    ).values('pk', *STAT_FIELDS)
+
+
+def rebuild(rfx_ids=None):
+    """Recompute and upsert the statistics of the given events (default: all); returns the row count"""
+    written = 0
+    batch = []
+    for row in computed(rfx_ids).iterator(chunk_size=BATCH_SIZE):
+        batch.append(RFxStats(rfx_id=row.pop('pk'), **row))
+        if len(batch) == BATCH_SIZE:
+            written += _upsert(batch)
+            batch = []
+    return written + _upsert(batch)
+
+
+def _upsert(batch):
+    RFxStats.objects.bulk_create(
+        batch,
+        update_conflicts=True,
+        unique_fields=['rfx'],
+        update_fields=[*STAT_FIELDS, 'updated_at'],
+    )
+    return len(batch)
+
+
+def recount(rfx_id):
+    """Recompute an event's existing statistics row without creating one"""
+    for row in computed([rfx_id]):
+        del row['pk']
+        RFxStats.objects.filter(rfx_id=rfx_id).update(**row)
+
+
+def _bump(rfx_id, **changes):
+    """Apply an increment to an event's row, building the row if it is missing"""
+    if not RFxStats.objects.filter(rfx_id=rfx_id).update(**changes):
+        rebuild([rfx_id])
+
+
+def _deleting_event(origin):
+    """Whether a cascade started at an RFx event, whose statistics row goes with it"""
+    return isinstance(origin, RFxEvent) or getattr(origin, 'model', None) is RFxEvent
+
+
+def _lowest(field, value):
+    return Coalesce(Least(F(field), Value(value)), Value(value))
+
+
+def _highest(field, value):
+    return Coalesce(Greatest(F(field), Value(value)), Value(value))
+
+
+@receiver(post_save, sender=RFxEvent)
+def _create_event_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        RFxStats.objects.create(rfx=instance)
+
+
+@receiver(post_save, sender=RFxResponse)
+def _response_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if not created:
+        recount(instance.rfx_id)
+        return
+    changes = {'response_count': F('response_count') + 1}
+    if instance.quoted_price is not None:
+        changes.update(
+            quoted_count=F('quoted_count') + 1,
+            quoted_price_total=F('quoted_price_total') + instance.quoted_price,
+            min_quoted_price=_lowest('min_quoted_price', instance.quoted_price),
+            max_quoted_price=_highest('max_quoted_price', instance.quoted_price),
+        )
+    if instance.lead_time is not None:
+        changes['min_lead_time'] = _lowest('min_lead_time', instance.lead_time)
+    _bump(instance.rfx_id, **changes)
+
+
+@receiver(post_save, sender=RFxInvitation)
+def _invitation_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    field = STATUS_FIELDS.get(instance.status)
+    if created and field:
+        _bump(instance.rfx_id, **{field: F(field) + 1})
+    else:
+        # The previous status is unknown here, so count them again
+        recount(instance.rfx_id)
+
+
+@receiver(post_delete, sender=RFxResponse)
+def _response_deleted(sender, instance, origin=None, **kwargs):
+    if not _deleting_event(origin):
+        recount(instance.rfx_id)
+
+
+@receiver(post_delete, sender=RFxInvitation)
+def _invitation_deleted(sender, instance, origin=None, **kwargs):
+    field = STATUS_FIELDS.get(instance.status)
+    if field and not _deleting_event(origin):
+        RFxStats.objects.filter(rfx_id=instance.rfx_id).update(**{field: F(field) - 1})
@@ -1,12 +1,19 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Q
+from django.db.models import Prefetch, Q
+from procurement.apps.vendors.lookups import vendor_ids_for_user
+from procurement.apps.vendors.serializers import VendorSerializer
+from procurement.expand import ExpandViewMixin
+from . import invitations, scoring, stages
 from .models import RFxEvent, RFxInvitation, RFxResponse
 from .serializers import RFxEventSerializer, RFxInvitationSerializer, RFxResponseSerializer
 
+# Larger invite lists get counts only instead of every invitation row
+INVITE_ECHO_LIMIT = 100
 
-class RFxEventViewSet(viewsets.ModelViewSet):
+
+class RFxEventViewSet(ExpandViewMixin, viewsets.ModelViewSet):
     queryset = RFxEvent.objects.all()
     serializer_class = RFxEventSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -18,19 +25,112 @@ class RFxEventViewSet(viewsets.ModelViewSet):
     def invite_vendors(self, request, pk=None):
         """Invite vendors to participate in RFx"""
         rfx = self.get_object()
-        vendor_ids = request.data.get('vendor_ids', [])
+        if hasattr(request.data, 'getlist'):
+            vendor_ids = request.data.getlist('vendor_ids')
+        else:
+            vendor_ids = request.data.get('vendor_ids', [])
+        if not isinstance(vendor_ids, list):
+            return Response({'error': 'vendor_ids must be a list'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        result = invitations.invite_vendors(rfx, vendor_ids)
+        data = result.counts()
+        if len(vendor_ids) <= INVITE_ECHO_LIMIT:
+            data['unknown_vendor_ids'] = result.unknown
+            rows = RFxInvitation.objects.filter(
+                rfx=rfx, vendor_id__in=result.invited + result.already_invited
+            ).select_related('vendor')
+            data['invitations'] = RFxInvitationSerializer(rows, many=True).data
+        
+        return Response(data, status=status.HTTP_201_CREATED if result.invited else status.HTTP_200_OK)
+    
+    @action(detail=True, methods=['get'], url_path='match-vendors')
+    def match_vendors(self, request, pk=None):
+        """Vendors not yet invited that cover the BOM's categories (or ?categories=), best match first"""
+        if request.user.role == 'vendor':
+            return Response(
+                {'message': 'Only buyers can match vendors'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        rfx = self.get_object()
+        params = request.query_params
+        try:
+            limit = int(params.get('limit', 20))
+        except ValueError:
+            return Response({'message': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        categories, matches = invitations.suggest_vendors(
+            rfx,
+            categories=[value.strip() for value in params.get('categories', '').split(',') if value.strip()],
+            certifications=[value.strip() for value in params.get('certifications', '').split(',')],
+            region=params.get('region', ''),
+            limit=limit,
+        )
+        return Response({
+            'rfx': rfx.id,
+            'categories': categories,
+            'results': [
+                {**VendorSerializer(vendor).data, 'matched_categories': covered} for vendor, covered in matches
+            ],
+        })
+    
+    @action(detail=True, methods=['post'], url_path='create-next-stage')
+    def create_next_stage(self, request, pk=None):
+        """Promote the RFx to its next stage (RFI -> RFP -> RFQ), carrying its vendors forward"""
+        parent_rfx = self.get_object()
         
-        invitations = []
-        for vendor_id in vendor_ids:
-            invitation, created = RFxInvitation.objects.get_or_create(
-                rfx=rfx,
-                vendor_id=vendor_id,
-                defaults={'status': 'invited'}
+        if parent_rfx.created_by_id != request.user.pk:
+            return Response(
+                {'message': 'You can only create next stage for your own RFx'},
+                status=status.HTTP_403_FORBIDDEN
             )
-            invitations.append(invitation)
         
-        serializer = RFxInvitationSerializer(invitations, many=True)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        shortlist = request.data.get('shortlist')
+        if shortlist is not None and not isinstance(shortlist, list):
+            return Response({'message': 'shortlist must be a list of response ids'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            next_rfx, invited, carried = stages.promote(
+                parent_rfx,
+                request.user,
+                shortlist=shortlist,
+                carry_forward_responses=bool(request.data.get('carry_forward_responses')),
+            )
+        except stages.StageError as exc:
+            return Response({'message': exc.message}, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = RFxEventSerializer(next_rfx, context=self.get_serializer_context() | {'expand': set()}).data
+        data['invited_count'] = invited
+        data['carried_response_count'] = carried
+        return Response(data, status=status.HTTP_201_CREATED)
+    
+    @action(detail=True, methods=['get', 'post'])
+    def score(self, request, pk=None):
+        """Score and rank every response on the event's weighted criteria (POST criteria to try others)"""
+        if request.user.role == 'vendor':
+            return Response(
+                {'message': 'Only buyers can compare responses'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        rfx = self.get_object()
+        parameters = request.data.get('criteria') if request.method == 'POST' else None
+        try:
+            criteria = scoring.parse_criteria(parameters or rfx.evaluation_parameters)
+            limit = max(1, int(request.query_params['limit'])) if request.query_params.get('limit') else None
+        except scoring.ScoringError as exc:
+            return Response({'message': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        except ValueError:
+            return Response({'message': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        count, ranked = scoring.score_responses(rfx.id, criteria, limit)
+        return Response({
+            'rfx': rfx.id,
+            'criteria': [
+                {'key': criterion['key'], 'weight': criterion['weight'], 'direction': criterion['direction']}
+                for criterion in criteria
+            ],
+            'count': count,
+            'results': ranked,
+        })
     
     @action(detail=True, methods=['get'])
     def responses(self, request, pk=None):
@@ -42,12 +142,30 @@ class RFxEventViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Filter RFx events based on user role"""
+        queryset = RFxEvent.objects.all()
         if self.request.user.role == 'vendor':
-            # Vendors see only RFx events they're invited to
-            return RFxEvent.objects.filter(
-                invitations__vendor__user=self.request.user
-            ).distinct()
-        return RFxEvent.objects.all()
+            # Vendors see only RFx events they're invited to. A semi-join driven by the
+            # (vendor, rfx) index needs no DISTINCT, so the page can stop early
+            queryset = queryset.filter(pk__in=RFxInvitation.objects.filter(
+                vendor_id__in=vendor_ids_for_user(self.request.user)
+            ).values('rfx_id'))
+        if self.action not in ('list', 'retrieve'):
+            return queryset
+        
+        queryset = queryset.select_related('bom', 'created_by', 'stats')
+        # Detail views always carry the nested collections; lists only when expanded
+        expand = self.get_expand() if self.action == 'list' else set(RFxEventSerializer.EXPANDABLE_FIELDS)
+        if 'invitations' in expand:
+            queryset = queryset.prefetch_related(
+                Prefetch('invitations', queryset=RFxInvitation.objects.select_related('vendor'))
+            )
+        if 'responses' in expand:
+            queryset = queryset.prefetch_related(
+                Prefetch('responses', queryset=RFxResponse.objects.select_related('vendor'))
+            )
+        if self.action == 'list':
+            queryset = queryset.order_by('-created_at')
+        return queryset
 
 
 class RFxInvitationViewSet(viewsets.ModelViewSet):
@@ -56,9 +174,10 @@ class RFxInvitationViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     
     def get_queryset(self):
+        queryset = RFxInvitation.objects.select_related('vendor')
         if self.request.user.role == 'vendor':
-            return RFxInvitation.objects.filter(vendor__user=self.request.user)
-        return RFxInvitation.objects.all()
+            return queryset.filter(vendor_id__in=vendor_ids_for_user(self.request.user))
+        return queryset
 
 
 class RFxResponseViewSet(viewsets.ModelViewSet):
@@ -69,64 +188,17 @@ class RFxResponseViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         # For vendors, automatically set the vendor based on their profile
         if self.request.user.role == 'vendor':
-            vendor = self.request.user.vendor_profile.first()
-            if vendor:
-                serializer.save(vendor=vendor)
+            vendor_ids = vendor_ids_for_user(self.request.user)
+            if vendor_ids:
+                serializer.save(vendor_id=vendor_ids[0])
         else:
             serializer.save()
     
     def get_queryset(self):
+        queryset = RFxResponse.objects.select_related('vendor')
         if self.request.user.role == 'vendor':
-            return RFxResponse.objects.filter(vendor__user=self.request.user)
-        return RFxResponse.objects.all()
-@action(detail=True, methods=['post'])
-def create_next_stage(self, request, pk=None):
-    """Create next stage RFx (RFI -> RFP -> RFQ)"""
-    parent_rfx = self.get_object()
-    
-    if parent_rfx.created_by != request.user:
-        return Response(
-            {'message': 'You can only create next stage for your own RFx'}, 
-            status=status.HTTP_403_FORBIDDEN
-        )
-    
-    # Determine next type
-    if parent_rfx.type == 'rfi':
-        next_type = 'rfp'
-    elif parent_rfx.type == 'rfp':
-        next_type = 'rfq'
-    else:
-        return Response(
-            {'message': 'RFQ is the final stage in the workflow'}, 
-            status=status.HTTP_400_BAD_REQUEST
-        )
-    
-    # Create next stage RFx
-    next_rfx = RFxEvent.objects.create(
-        title=f"{next_type.upper()} - {parent_rfx.title}",
-        reference_no=f"{next_type.upper()}-{int(time.time())}",
-        type=next_type,
-        scope=parent_rfx.scope,
-        criteria=parent_rfx.criteria,
-        bom=parent_rfx.bom,
-        contact_person=parent_rfx.contact_person,
-        budget=parent_rfx.budget,
-        parent_rfx=parent_rfx,
-        created_by=request.user,
-        status='draft'
-    )
-    
-    # Copy vendor invitations
-    for invitation in parent_rfx.rfxinvitation_set.all():
-        RFxInvitation.objects.create(
-            rfx=next_rfx,
-            vendor=invitation.vendor,
-            status='invited'
-        )
-    
-    serializer = self.get_serializer(next_rfx)
-    return Response(serializer.data)
-
+            return queryset.filter(vendor_id__in=vendor_ids_for_user(self.request.user))
+        return queryset
 @action(detail=True, methods=['patch'])
 def update_status(self, request, pk=None):
     """Update RFx status"""
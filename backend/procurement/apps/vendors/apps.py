@@ -3,4 +3,9 @@ from django.apps import AppConfig
 
 class VendorsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'procurement.apps.vendors'
\ No newline at end of file
+    name = 'procurement.apps.vendors'
+
+    def ready(self):
+        from . import lookups  # noqa: F401 - registers the cache invalidation receivers
+        from . import matching  # noqa: F401 - keeps the in-process matching index current
+        from . import search  # noqa: F401 - keeps the in-process search index current
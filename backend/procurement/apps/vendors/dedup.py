@@ -0,0 +1,235 @@
+"""Vendor duplicate detection and merging.
+
+Every vendor carries normalised identity keys, rebuilt on save and each
+behind its own index: ``gst_key`` and ``pan_key`` (upper-cased, everything
+but letters and digits dropped) and ``email_key`` (lower-cased, whitespace
+dropped). Two vendors are duplicates when any of their keys are equal.
+
+``find_duplicates`` checks a candidate vendor with one indexed equality
+lookup per key, OR-ed into a single query. ``find_clusters`` groups the
+existing vendors in one pass over the keys: each key value is a hash bucket
+owned by the first vendor seen with it, and later vendors in the bucket are
+joined to the owner through a union-find, so vendors linked through
+different keys land in the same cluster.
+
+``merge`` keeps one survivor per cluster (linked to a user first, then
+approved, then the oldest), fills its blank fields from the other vendors
+and unions their list fields. Every foreign key to the merged vendors is
+re-pointed with one CASE UPDATE per relation and batch, and the merged
+vendors are deleted. Rows that would break a unique_together once
+re-pointed (an RFx invitation or auction participation both vendors had)
+are deleted instead. Snapshots of auctions the merged vendors bid in are
+dropped, so their state is folded again from the re-pointed ledger.
+"""
+from collections import defaultdict
+
+from django.db import connections, transaction
+from django.db.models import Q
+
+from procurement.apps.auctions.models import AuctionSnapshot, BidLedgerEntry
+
+from .models import IDENTITY_KEY_FIELDS, Vendor, identity_key
+
+BATCH_SIZE = 900
+MAX_MATCHES = 20
+# Copied to the survivor from a merged vendor where the survivor's is blank
+FILLED_FIELDS = [
+    'contact_person', 'email', 'phone', 'pan_number', 'gst_number', 'tan_number',
+    'bank_details', 'address', 'years_of_experience', 'user_id',
+]
+UNIONED_FIELDS = ['categories', 'certifications', 'office_locations', 'tags']
+
+
+def _batches(values):
+    values = list(values)
+    for start in range(0, len(values), BATCH_SIZE):
+        yield values[start:start + BATCH_SIZE]
+
+
+def _as_text(value):
+    """``value`` as the serializer's CharField would store it, or None for what it rejects"""
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        return None
+    return str(value)
+
+
+def candidate_keys(gst_number=None, pan_number=None, email=None):
+    """Identity keys of a prospective vendor, leaving out blank ones"""
+    values = {'gst_number': _as_text(gst_number), 'pan_number': _as_text(pan_number), 'email': _as_text(email)}
+    keys = {key_field: identity_key(field, values[field]) for key_field, field in IDENTITY_KEY_FIELDS.items()}
+    return {key_field: key for key_field, key in keys.items() if key}
+
+
+def find_duplicates(queryset, gst_number=None, pan_number=None, email=None, exclude=None):
+    """(vendor, matched fields) for vendors in ``queryset`` sharing a GST number, PAN or email, oldest first"""
+    keys = candidate_keys(gst_number, pan_number, email)
+    if not keys:
+        return []
+    condition = Q()
+    for key_field, key in keys.items():
+        condition |= Q(**{key_field: key})
+    vendors = queryset.filter(condition)
+    if exclude is not None:
+        vendors = vendors.exclude(pk=exclude)
+    return [
+        (vendor, [IDENTITY_KEY_FIELDS[key_field] for key_field, key in keys.items() if getattr(vendor, key_field) == key])
+        for vendor in vendors.order_by('created_at', 'pk')[:MAX_MATCHES]
+    ]
+
+
+def find_clusters(key_fields=tuple(IDENTITY_KEY_FIELDS)):
+    """Lists of ids of vendors linked by a shared identity key, each with two or more vendors"""
+    parent = {}
+
+    def root(pk):
+        while parent[pk] != pk:
+            parent[pk] = parent[parent[pk]]
+            pk = parent[pk]
+        return pk
+
+    owners = {}
+    has_key = Q()
+    for key_field in key_fields:
+        has_key |= Q(**{f'{key_field}__isnull': False})
+    rows = Vendor.objects.filter(has_key).order_by().values_list('pk', *key_fields)
+    for pk, *keys in rows.iterator(chunk_size=5000):
+        parent[pk] = pk
+        for key_field, key in zip(key_fields, keys):
+            if key is None:
+                continue
+            owner = owners.setdefault((key_field, key), pk)
+            if owner != pk:
+                owner_root, pk_root = root(owner), root(pk)
+                if owner_root != pk_root:
+                    parent[pk_root] = owner_root
+
+    clusters = defaultdict(list)
+    for pk in parent:
+        clusters[root(pk)].append(pk)
+    return [members for members in clusters.values() if len(members) > 1]
+
+
+def _survivor_order(vendor):
+    return (vendor.user_id is None, vendor.status != 'approved', vendor.created_at, vendor.pk)
+
+
+def _absorb(survivor, vendor):
+    """Fill ``survivor``'s blanks from ``vendor``; returns the names of the fields changed"""
+    changed = set()
+    for field in FILLED_FIELDS:
+        if getattr(survivor, field) in (None, '', {}, []) and getattr(vendor, field) not in (None, '', {}, []):
+            setattr(survivor, field, getattr(vendor, field))
+            changed.add(field)
+    for field in UNIONED_FIELDS:
+        values = list(getattr(survivor, field) or [])
+        added = [value for value in getattr(vendor, field) or [] if value not in values]
+        if added:
+            setattr(survivor, field, values + added)
+            changed.add(field)
+    return changed
+
+
+def _relations():
+    """Foreign keys to Vendor, including those without a reverse accessor"""
+    return [
+        relation.field for relation in Vendor._meta.get_fields(include_hidden=True)
+        if relation.auto_created and not relation.concrete and (relation.one_to_many or relation.one_to_one)
+    ]
+
+
+def _drop_conflicts(field, mapping):
+    """Delete rows of merged vendors that would duplicate a row of their survivor once re-pointed"""
+    model = field.model
+    dropped = 0
+    for together in model._meta.unique_together:
+        if field.name not in together:
+            continue
+        others = [model._meta.get_field(name).attname for name in together if name != field.name]
+        rows = []
+        for batch in _batches({*mapping, *mapping.values()}):
+            rows.extend(model._base_manager.filter(**{f'{field.attname}__in': batch}).values_list(
+                'pk', field.attname, *others
+            ))
+        # The survivors' own rows come first, so theirs are the ones kept
+        rows.sort(key=lambda row: (row[1] in mapping, row[0]))
+        seen, doomed = set(), []
+        for pk, vendor_id, *rest in rows:
+            target = (mapping.get(vendor_id, vendor_id), *rest)
+            if target in seen:
+                doomed.append(pk)
+            else:
+                seen.add(target)
+        for batch in _batches(doomed):
+            # Through the signals, so materialised counts such as RFxStats follow
+            model._base_manager.filter(pk__in=batch).delete()
+        dropped += len(doomed)
+    return dropped
+
+
+def _repoint(field, mapping, connection):
+    """Point ``field`` from merged vendors to their survivors, one UPDATE per batch"""
+    # Raw CASE, as in performance._write: an ORM Case resolves one When per merged vendor
+    quote = connection.ops.quote_name
+    column, pk = quote(field.column), Vendor._meta.pk
+    updated = 0
+    with connection.cursor() as cursor:
+        for batch in _batches(mapping):
+            params = []
+            for vendor_id in batch:
+                params += [pk.get_db_prep_value(vendor_id, connection), pk.get_db_prep_value(mapping[vendor_id], connection)]
+            params += [pk.get_db_prep_value(vendor_id, connection) for vendor_id in batch]
+            cursor.execute(
+                f'UPDATE {quote(field.model._meta.db_table)} SET {column} = CAST(CASE {column} '
+                f'{" ".join(["WHEN %s THEN %s"] * len(batch))} END AS {field.cast_db_type(connection)}) '
+                f'WHERE {column} IN ({", ".join(["%s"] * len(batch))})',
+                params,
+            )
+            updated += cursor.rowcount
+    return updated
+
+
+def merge(clusters, dry_run=False):
+    """Merge each cluster of vendor ids into its survivor; returns counts and the users left without a profile"""
+    vendors = {}
+    for batch in _batches(pk for members in clusters for pk in members):
+        vendors.update(Vendor.objects.in_bulk(batch))
+
+    mapping, changes = {}, {}
+    survivors = []
+    for members in clusters:
+        ordered = sorted((vendors[pk] for pk in members if pk in vendors), key=_survivor_order)
+        if len(ordered) < 2:
+            continue
+        survivor, changed = ordered[0], set()
+        for vendor in ordered[1:]:
+            mapping[vendor.pk] = survivor.pk
+            changed |= _absorb(survivor, vendor)
+        survivors.append(survivor)
+        changes[survivor.pk] = changed
+    unlinked_users = sorted({
+        vendors[pk].user_id for pk, survivor_pk in mapping.items()
+        if vendors[pk].user_id is not None and vendors[pk].user_id != vendors[survivor_pk].user_id
+    }, key=str)
+    result = {'clusters': len(survivors), 'merged': len(mapping), 'repointed': 0, 'dropped': 0,
+              'unlinked_users': unlinked_users}
+    if dry_run or not mapping:
+        return result
+
+    connection = connections[Vendor.objects.db]
+    with transaction.atomic(using=connection.alias):
+        auction_ids = set()
+        for batch in _batches(mapping):
+            auction_ids.update(BidLedgerEntry.objects.filter(vendor_id__in=batch).values_list('auction_id', flat=True))
+        for survivor in survivors:
+            if changes[survivor.pk]:
+                survivor.save(update_fields={
+                    Vendor._meta.get_field(field).name for field in changes[survivor.pk]
+                } | {'updated_at'})
+        for field in _relations():
+            result['dropped'] += _drop_conflicts(field, mapping)
+            result['repointed'] += _repoint(field, mapping, connection)
+        for batch in _batches(auction_ids):
+            AuctionSnapshot.objects.filter(auction_id__in=batch).delete()
+        for batch in _batches(mapping):
+            Vendor.objects.filter(pk__in=batch).delete()
+    return result
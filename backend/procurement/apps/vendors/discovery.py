@@ -0,0 +1,282 @@
+"""Vendor discovery through an external provider.
+
+A (query, category, location) triple is normalised (case, whitespace, and
+"all" meaning no filter) into a cache key. The parsed vendor list is cached
+for ``VENDOR_DISCOVERY_CACHE_TIMEOUT`` seconds, so a repeated query costs
+one cache read and neither the provider call nor the response parsing is
+repeated. Identical queries that arrive while one is being fetched wait for
+that fetch instead of starting their own; the wait is a
+``concurrent.futures.Future``, so it works across event loops and threads.
+
+The provider is selected by the ``VENDOR_DISCOVERY_PROVIDER`` setting:
+
+* ``PerplexityProvider`` asks the Perplexity chat completions API.
+* ``StubProvider`` answers from canned data with no network access.
+
+Provider failures and empty answers fall back to ``FALLBACK_VENDORS``,
+which are not cached so the next request tries the provider again.
+"""
+import asyncio
+import concurrent.futures
+import hashlib
+import logging
+import os
+import re
+import threading
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+MAX_VENDORS = 8
+FALLBACK_VENDORS = [
+    {
+        'name': 'Metro Business Solutions',
+        'category': 'Business Services',
+        'email': 'contact@metrobusiness.co.in',
+        'phone': '+91-80-29876543',
+        'location': 'MG Road, Bangalore, Karnataka',
+        'website': 'www.metrobusiness.co.in',
+        'description': 'Comprehensive business solutions including procurement, logistics, and consulting services'
+    }
+]
+
+NAME_PATTERN = re.compile(r'^\*\*([^*]+)\*\*|^###?\s*(.+)|^\d+\.\s*\*\*([^*]+)\*\*')
+EMAIL_PATTERN = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')
+PHONE_PATTERN = re.compile(r'[\+]?[\d\s\-\(\)]{8,}')
+ADDRESS_PATTERN = re.compile(r'(?:Address:|Location:)\s*(.+)')
+WEBSITE_PATTERN = re.compile(r'(?:www\.|https?:\/\/)[\w\.-]+\.\w+')
+DESCRIPTION_PATTERN = re.compile(r'Description:\s*(.+)')
+
+
+class DiscoveryError(Exception):
+    """Raised when a provider cannot answer a query"""
+
+
+def normalize(value):
+    value = ' '.join((value or '').lower().split())
+    return '' if value == 'all' else value
+
+
+def cache_key(query, category, location):
+    digest = hashlib.sha256('\x1f'.join((query, category, location)).encode()).hexdigest()
+    return f'vendor-discovery:{digest}'
+
+
+def build_prompt(query, category, location):
+    prompt = f"Find professional vendors and suppliers specializing in {query}"
+    if category:
+        prompt += f" in the {category} category"
+    if location:
+        prompt += f" located in {location}"
+    else:
+        prompt += " in India"
+    return prompt
+
+
+def parse_vendor_response(text):
+    """Vendor dicts from a provider's markdown answer, at most MAX_VENDORS"""
+    vendors = []
+    current_vendor = None
+
+    for line in text.split('\n'):
+        line = line.strip()
+
+        name_match = NAME_PATTERN.match(line)
+        if name_match:
+            if current_vendor and current_vendor.get('name'):
+                vendors.append(current_vendor)
+
+            vendor_name = (name_match.group(1) or name_match.group(2) or name_match.group(3)).strip()
+            if vendor_name and vendor_name != "Company Name":
+                current_vendor = {
+                    'name': vendor_name,
+                    'category': 'Business Services',
+                    'email': '',
+                    'phone': '',
+                    'location': '',
+                    'website': '',
+                    'description': ''
+                }
+
+        if current_vendor:
+            if 'Email:' in line:
+                email_match = EMAIL_PATTERN.search(line)
+                if email_match:
+                    current_vendor['email'] = email_match.group(0)
+
+            if 'Phone:' in line:
+                phone_match = PHONE_PATTERN.search(line)
+                if phone_match:
+                    current_vendor['phone'] = phone_match.group(0).strip()
+
+            if 'Address:' in line or 'Location:' in line:
+                address_match = ADDRESS_PATTERN.search(line)
+                if address_match:
+                    current_vendor['location'] = address_match.group(1).strip()
+
+            if 'Website:' in line or 'www.' in line:
+                website_match = WEBSITE_PATTERN.search(line)
+                if website_match:
+                    current_vendor['website'] = website_match.group(0)
+
+            if 'Description:' in line:
+                desc_match = DESCRIPTION_PATTERN.search(line)
+                if desc_match:
+                    current_vendor['description'] = desc_match.group(1).strip()
+
+    if current_vendor and current_vendor.get('name'):
+        vendors.append(current_vendor)
+
+    return vendors[:MAX_VENDORS]
+
+
+class PerplexityProvider:
+    """Asks the Perplexity chat completions API, keyed by PERPLEXITY_API_KEY"""
+
+    url = 'https://api.perplexity.ai/chat/completions'
+    model = 'sonar-pro'
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+
+    async def complete(self, prompt):
+        api_key = os.environ.get('PERPLEXITY_API_KEY')
+        if not api_key:
+            raise DiscoveryError('PERPLEXITY_API_KEY is not set')
+        try:
+            # requests is blocking; a worker thread keeps the event loop serving other requests
+            response = await asyncio.to_thread(
+                requests.post,
+                self.url,
+                headers={
+                    "Authorization": f"Bearer {api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "model": self.model,
+                    "messages": [
+                        {
+                            "role": "system",
+                            "content": "You are a procurement assistant. Find real vendors with actual contact information."
+                        },
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ],
+                    "max_tokens": 1500,
+                    "temperature": 0.1
+                },
+                timeout=self.timeout,
+            )
+        except requests.RequestException as exc:
+            raise DiscoveryError(str(exc)) from exc
+        if response.status_code != 200:
+            raise DiscoveryError(f'Provider answered {response.status_code}')
+        try:
+            return response.json().get('choices', [{}])[0].get('message', {}).get('content', '')
+        except ValueError as exc:
+            raise DiscoveryError('Provider answered with invalid JSON') from exc
+
+
+class StubProvider:
+    """Answers every prompt with canned vendors after ``delay`` seconds, without network access"""
+
+    delay = 0
+
+    def __init__(self, timeout=None):
+        self.calls = 0
+
+    async def complete(self, prompt):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return '\n'.join(
+            f"{index}. **Stub Supplier {index}**\n"
+            f"Email: sales{index}@stub-supplier.example\n"
+            f"Phone: +91-80-4000-000{index}\n"
+            f"Location: Bangalore, Karnataka\n"
+            f"Description: {prompt}"
+            for index in range(1, 4)
+        )
+
+
+_provider = None
+_provider_lock = threading.Lock()
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+def get_provider():
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = import_string(settings.VENDOR_DISCOVERY_PROVIDER)(
+                    timeout=settings.VENDOR_DISCOVERY_TIMEOUT
+                )
+    return _provider
+
+
+def reset_provider():
+    """Forget the provider instance, e.g. after VENDOR_DISCOVERY_PROVIDER changes"""
+    global _provider
+    with _provider_lock:
+        _provider = None
+
+
+async def _fetch(key, query, category, location):
+    text = await get_provider().complete(build_prompt(query, category, location))
+    vendors = parse_vendor_response(text)
+    if vendors:
+        await cache.aset(key, vendors, settings.VENDOR_DISCOVERY_CACHE_TIMEOUT)
+    return vendors
+
+
+async def discover(query, category='', location=''):
+    """Vendors for a discovery query, from the cache, an in-flight fetch or the provider"""
+    query, category, location = normalize(query), normalize(category), normalize(location)
+    key = cache_key(query, category, location)
+    vendors = await cache.aget(key)
+    if vendors is not None:
+        return vendors
+
+    with _in_flight_lock:
+        pending = _in_flight.get(key)
+        leader = pending is None
+        if leader:
+            pending = _in_flight[key] = concurrent.futures.Future()
+            # Running futures cannot be cancelled, so a follower that goes away leaves the others waiting
+            pending.set_running_or_notify_cancel()
+
+    if not leader:
+        try:
+            return await asyncio.wrap_future(pending) or FALLBACK_VENDORS
+        except DiscoveryError:
+            return FALLBACK_VENDORS
+
+    try:
+        # A fetch that finished between the cache miss and taking the lead has already cached its answer
+        vendors = await cache.aget(key)
+        if vendors is None:
+            vendors = await _fetch(key, query, category, location)
+        pending.set_result(vendors)
+    except DiscoveryError as exc:
+        logger.warning('Vendor discovery failed: %s', exc)
+        pending.set_exception(exc)
+        vendors = []
+    except Exception as exc:
+        logger.exception('Vendor discovery failed')
+        pending.set_exception(DiscoveryError(str(exc)))
+        vendors = []
+    except BaseException:
+        pending.set_exception(DiscoveryError('The discovery request was abandoned'))
+        raise
+    finally:
+        with _in_flight_lock:
+            _in_flight.pop(key, None)
+    return vendors or FALLBACK_VENDORS
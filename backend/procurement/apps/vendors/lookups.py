@@ -0,0 +1,49 @@
+"""Cached user -> vendor profile lookup.
+
+Vendor-scoped queries need the ids of the vendor profiles linked to the
+requesting user. Resolving them once and filtering on ``vendor_id`` keeps the
+scoped querysets free of joins through ``vendors`` and ``users``; the ids are
+cached per user and dropped, for the user linked before and after, whenever a
+vendor profile is saved or deleted. The ids decide what a user may see, so
+they are only kept for ``VENDOR_IDS_CACHE_TIMEOUT`` seconds: with a
+per-process cache that bounds how long other workers miss an invalidation.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Vendor
+
+
+def _cache_key(user_id):
+    return f'vendor-ids:{user_id}'
+
+
+def vendor_ids_for_user(user):
+    """Ids of the vendor profiles linked to ``user``"""
+    vendor_ids = getattr(user, '_vendor_ids', None)
+    if vendor_ids is None:
+        vendor_ids = cache.get(_cache_key(user.pk))
+        if vendor_ids is None:
+            vendor_ids = list(Vendor.objects.filter(user_id=user.pk).values_list('pk', flat=True))
+            cache.set(_cache_key(user.pk), vendor_ids, settings.VENDOR_IDS_CACHE_TIMEOUT)
+        # Also memoised on the user object, which lives as long as the request
+        user._vendor_ids = vendor_ids
+    return vendor_ids
+
+
+@receiver(pre_save, sender=Vendor)
+def _remember_linked_user(sender, instance, update_fields=None, **kwargs):
+    """Note the user the stored row links to, which loses access if the save re-links it"""
+    instance._previous_user_id = None
+    if not instance._state.adding and (update_fields is None or 'user' in update_fields):
+        instance._previous_user_id = Vendor.objects.filter(pk=instance.pk).values_list('user_id', flat=True).first()
+
+
+@receiver(post_save, sender=Vendor)
+@receiver(post_delete, sender=Vendor)
+def _invalidate_vendor_ids(sender, instance, **kwargs):
+    user_ids = {instance.user_id, getattr(instance, '_previous_user_id', None)} - {None}
+    if user_ids:
+        cache.delete_many([_cache_key(user_id) for user_id in user_ids])
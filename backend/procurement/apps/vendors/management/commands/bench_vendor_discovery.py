@@ -0,0 +1,82 @@
+"""Check vendor discovery caching and request coalescing against the stub provider"""
+import asyncio
+import threading
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from procurement.apps.vendors import discovery
+
+
+class Command(BaseCommand):
+    help = 'Fire concurrent identical discovery queries at a slow stub provider and count provider calls'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--distinct', type=int, default=5, help='Distinct queries in the concurrent wave')
+        parser.add_argument('--delay', type=float, default=0.5, help='Stub provider latency in seconds')
+
+    def handle(self, *args, **options):
+        with override_settings(VENDOR_DISCOVERY_PROVIDER='procurement.apps.vendors.discovery.StubProvider'):
+            discovery.reset_provider()
+            try:
+                self.run(options)
+            finally:
+                discovery.reset_provider()
+
+    def run(self, options):
+        provider = discovery.get_provider()
+        provider.delay = options['delay']
+        queries = [f'Industrial valves batch {index}' for index in range(options['distinct'])]
+        for query in queries:
+            cache.delete(discovery.cache_key(discovery.normalize(query), '', ''))
+
+        # One event loop: every request for a query after the first waits on its fetch
+        requests = [
+            # Case, whitespace and "all" variants normalise to the same key
+            (f'  {queries[index % len(queries)].upper()} ', 'all', '')
+            for index in range(options['concurrency'])
+        ]
+        started = time.perf_counter()
+        results = asyncio.run(self.gather(requests))
+        elapsed = time.perf_counter() - started
+        self.report('one loop', len(requests), provider, elapsed)
+        self.expect(provider.calls, len(queries), results)
+
+        # A loop per thread, as async views get under WSGI
+        query = 'Copper cable suppliers'
+        cache.delete(discovery.cache_key(discovery.normalize(query), '', ''))
+        provider.calls = 0
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(asyncio.run(discovery.discover(query))))
+            for _ in range(options['concurrency'])
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.report('thread per request', len(threads), provider, time.perf_counter() - started)
+        self.expect(provider.calls, 1, results)
+
+        provider.calls = 0
+        started = time.perf_counter()
+        asyncio.run(self.gather(requests))
+        self.report('cached repeat', len(requests), provider, time.perf_counter() - started)
+        self.expect(provider.calls, 0, results)
+        self.stdout.write(self.style.SUCCESS('Each distinct query reached the provider once'))
+
+    async def gather(self, requests):
+        return await asyncio.gather(*(discovery.discover(*request) for request in requests))
+
+    def report(self, label, count, provider, elapsed):
+        self.stdout.write(f'{label:<20} {count} requests, {provider.calls} provider calls, {elapsed * 1000:.0f}ms')
+
+    def expect(self, calls, expected, results):
+        if calls != expected:
+            raise CommandError(f'Expected {expected} provider calls, got {calls}')
+        if any(result is discovery.FALLBACK_VENDORS for result in results):
+            raise CommandError('A request fell back instead of getting the stub vendors')
@@ -0,0 +1,75 @@
+"""Benchmark category matching against filtering the JSON lists per category"""
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+
+from procurement.apps.vendors import matching
+from procurement.apps.vendors.models import Vendor
+
+from .bench_vendor_search import CATEGORIES, CERTIFICATIONS, vendor_fixture
+
+
+class Command(BaseCommand):
+    help = 'Seed (or reuse) the vendor search fixture and time category matching'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vendors', type=int, default=500000)
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per query; the median is reported')
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--keep', action='store_true', help='Keep the fixture for the next run instead of deleting it')
+
+    def handle(self, *args, **options):
+        with vendor_fixture(options['vendors'], options['keep'], self.stdout):
+            matching.reset_index()
+            try:
+                self.run(options)
+            finally:
+                matching.reset_index()
+
+    def run(self, options):
+        self.stdout.write(f'backend: {connection.vendor}')
+        started = time.perf_counter()
+        matching.index.load()
+        self.stdout.write(f'matching index load: {time.perf_counter() - started:.1f}s')
+
+        rng = random.Random(23)
+        cases = [
+            ('one category', {'categories': ['Electrical']}),
+            ('three categories', {'categories': rng.sample(CATEGORIES, 3)}),
+            ('three + region', {'categories': rng.sample(CATEGORIES, 3), 'region': 'Pune'}),
+            ('three + certifications', {'categories': rng.sample(CATEGORIES, 3), 'certifications': CERTIFICATIONS[:2]}),
+            ('every category', {'categories': CATEGORIES}),
+        ]
+        queryset = Vendor.objects.all()
+        for label, params in cases:
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                matches = matching.match_vendors(queryset, limit=options['limit'], **params)
+                timings.append(time.perf_counter() - started)
+            line = f'{label:<24} top {len(matches):>3} ({len(matches[0][1]) if matches else 0} covered)  ' \
+                   f'match {statistics.median(timings) * 1000:8.1f}ms'
+            legacy = self.legacy(queryset, **params)
+            if legacy is not None:
+                started = time.perf_counter()
+                list(legacy[:options['limit']])
+                line += f'  legacy {(time.perf_counter() - started) * 1000:8.1f}ms (unranked)'
+            self.stdout.write(line)
+
+    def legacy(self, queryset, categories, certifications=(), region=''):
+        """The categories__contains filters matching used to take, where this database supports them"""
+        if not connection.features.supports_json_field_contains:
+            return None
+        covers = Q()
+        for category in categories:
+            covers |= Q(categories__contains=[category])
+        queryset = queryset.filter(covers)
+        for cert in certifications:
+            queryset = queryset.filter(certifications__contains=[cert])
+        if region:
+            queryset = queryset.filter(Q(office_locations__contains=[region]) | Q(address__icontains=region))
+        return queryset.order_by('-performance_score')
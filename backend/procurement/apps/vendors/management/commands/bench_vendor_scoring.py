@@ -0,0 +1,136 @@
+"""Time full and incremental vendor performance scoring on a seeded history"""
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries
+from django.db.models import Max
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from procurement.apps.auctions.models import Auction, AuctionParticipant
+from procurement.apps.products.models import Product
+from procurement.apps.purchase_orders.models import POLineItem, PurchaseOrder
+from procurement.apps.rfx.models import RFxEvent, RFxInvitation, RFxResponse
+from procurement.apps.vendors import performance
+from procurement.apps.vendors.models import Vendor, VendorScoreRun
+from procurement.bench import bench_owner
+
+BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = 'Seed vendors with RFx, purchase order and auction history, then time full and incremental scoring'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vendors', type=int, default=100000)
+        parser.add_argument('--touched', type=int, default=1000, help='Vendors given new activity before the incremental run')
+
+    def handle(self, *args, **options):
+        rng = random.Random(21)
+        # The full run rescores every vendor, so this only runs on a bench database; even there the
+        # runs recorded before the bench stay, and the latest of them is the watermark again afterwards
+        last_run = VendorScoreRun.objects.aggregate(last=Max('pk'))['last'] or 0
+        try:
+            with bench_owner(PurchaseOrder, Auction, RFxEvent, Product, Vendor) as owner:
+                self.bench(rng, owner, options)
+        finally:
+            VendorScoreRun.objects.filter(pk__gt=last_run).delete()
+
+    def bench(self, rng, owner, options):
+        started = time.perf_counter()
+        vendors = self.seed(rng, owner, options['vendors'])
+        self.stdout.write(f'seeded {len(vendors)} vendors with history in {time.perf_counter() - started:.1f}s')
+
+        self.timed('full run', lambda: performance.run(full=True))
+        touched = self.touch(rng, owner, rng.sample(vendors, min(options['touched'], len(vendors))))
+        run = self.timed('incremental run', performance.run)
+        if run.full or run.scored_count < len(touched):
+            raise CommandError(f'Incremental run scored {run.scored_count} vendors, expected {len(touched)}')
+        self.timed('idle incremental run', performance.run)
+        self.check_scores(owner)
+        self.stdout.write(self.style.SUCCESS('Incremental scores match a full recomputation'))
+
+    def seed(self, rng, owner, count):
+        now = timezone.now()
+        vendors = Vendor.objects.bulk_create(
+            [Vendor(company_name=f'Bench vendor {i}', created_by=owner) for i in range(count)], batch_size=BATCH_SIZE
+        )
+        events = RFxEvent.objects.bulk_create(
+            [RFxEvent(title=f'Bench RFQ {i}', type='rfq', created_by=owner) for i in range(max(count // 50, 10))]
+        )
+        invitations, responses = [], []
+        for vendor in vendors:
+            for event in rng.sample(events, 3):
+                invitations.append(RFxInvitation(rfx=event, vendor=vendor))
+                if rng.random() < 0.6:
+                    responses.append(RFxResponse(rfx=event, vendor=vendor, lead_time=rng.randint(1, 120)))
+        RFxInvitation.objects.bulk_create(invitations, batch_size=BATCH_SIZE)
+        RFxResponse.objects.bulk_create(responses, batch_size=BATCH_SIZE)
+
+        product = Product.objects.create(item_name='Bench item', created_by=owner)
+        orders = PurchaseOrder.objects.bulk_create([
+            PurchaseOrder(
+                po_number=f'BENCH-{owner.id}-{i}', vendor=rng.choice(vendors), total_amount=Decimal('100.00'),
+                status=rng.choice(['issued', 'shipped', 'delivered', 'paid', 'cancelled']), created_by=owner,
+            )
+            for i in range(count // 5)
+        ], batch_size=BATCH_SIZE)
+        POLineItem.objects.bulk_create([
+            POLineItem(
+                purchase_order=order, product=product, quantity=1, unit_price=10, total_price=10,
+                delivery_date=now + timedelta(days=rng.randint(-60, 30)),
+                status=rng.choice(['pending', 'shipped', 'delivered']),
+            )
+            for order in orders for _ in range(3)
+        ], batch_size=BATCH_SIZE)
+
+        auctions = Auction.objects.bulk_create([
+            Auction(name=f'Bench auction {i}', start_time=now - timedelta(days=2), end_time=now - timedelta(days=1),
+                    status='completed', created_by=owner)
+            for i in range(max(count // 100, 1))
+        ])
+        participants = []
+        for auction in auctions:
+            joined = rng.sample(vendors, 10)
+            auction.winner = joined[0]
+            participants.extend(AuctionParticipant(auction=auction, vendor=vendor) for vendor in joined)
+        Auction.objects.bulk_update(auctions, ['winner'], batch_size=BATCH_SIZE)
+        AuctionParticipant.objects.bulk_create(participants, batch_size=BATCH_SIZE)
+        return vendors
+
+    def touch(self, rng, owner, vendors):
+        """New responses for some vendors and deliveries for others, as the API would record them"""
+        event = RFxEvent.objects.create(title='Bench follow-up RFQ', type='rfq', created_by=owner)
+        half = len(vendors) // 2
+        RFxInvitation.objects.bulk_create([RFxInvitation(rfx=event, vendor=vendor) for vendor in vendors[:half]])
+        RFxResponse.objects.bulk_create([
+            RFxResponse(rfx=event, vendor=vendor, lead_time=rng.randint(1, 120)) for vendor in vendors[:half]
+        ])
+        delivered = POLineItem.objects.filter(purchase_order__vendor__in=vendors[half:], status='pending')
+        delivering = set(delivered.values_list('purchase_order__vendor_id', flat=True))
+        delivered.update(status='delivered', updated_at=timezone.now())
+        return {vendor.pk for vendor in vendors[:half]} | delivering
+
+    def timed(self, label, run_scoring):
+        with override_settings(DEBUG=True):
+            reset_queries()
+            started = time.perf_counter()
+            run = run_scoring()
+            elapsed = time.perf_counter() - started
+            queries = len(connection.queries)
+        self.stdout.write(f'{label:<22} {run.scored_count:>7} vendors in {elapsed:6.2f}s with {queries} queries')
+        return run
+
+    def check_scores(self, owner):
+        expected = performance.compute()
+        stored = dict(
+            Vendor.objects.filter(created_by=owner).values_list('pk', 'performance_score')
+        )
+        for vendor_id, score in stored.items():
+            want = expected.get(vendor_id)
+            want = None if want is None else Decimal(f'{want:.2f}')
+            if score != want:
+                raise CommandError(f'Vendor {vendor_id} stored {score}, a full recomputation gives {want}')
@@ -0,0 +1,162 @@
+"""Benchmark keyset pages of ranked vendor search against the legacy icontains filter"""
+import random
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Q
+
+from procurement.apps.users.models import User
+from procurement.apps.vendors import search
+from procurement.apps.vendors.models import Vendor
+from procurement.bench import delete_owned, require_bench_database
+from procurement.pagination import keyset_page
+
+FIXTURE_OWNER = 'bench-vendor-search'
+PAGE_SIZE = 20
+ADJECTIVES = ['Apex', 'Precision', 'Global', 'Sunrise', 'Metro', 'Prime', 'Allied', 'Bharat', 'Vertex', 'Omega',
+              'Reliable', 'Eastern', 'Summit', 'Pioneer', 'Crystal', 'United', 'Dynamic', 'Royal', 'Zenith', 'Classic']
+NOUNS = ['Bearings', 'Fasteners', 'Castings', 'Polymers', 'Electricals', 'Logistics', 'Textiles', 'Chemicals',
+         'Tooling', 'Packaging', 'Steel', 'Pumps', 'Cables', 'Forgings', 'Valves', 'Controls', 'Printing', 'Foods']
+SUFFIXES = ['Industries', 'Enterprises', 'Pvt Ltd', 'Traders', 'Solutions', 'Works', 'Corporation', 'Agencies']
+PEOPLE = ['Arjun', 'Priya', 'Rahul', 'Sneha', 'Vikram', 'Anita', 'Karan', 'Meera', 'Suresh', 'Lakshmi']
+SURNAMES = ['Sharma', 'Iyer', 'Patel', 'Reddy', 'Gupta', 'Nair', 'Singh', 'Rao', 'Mehta', 'Das']
+CITIES = ['Mumbai', 'Pune', 'Bangalore', 'Chennai', 'Hyderabad', 'Delhi', 'Ahmedabad', 'Kolkata', 'Coimbatore',
+          'Jaipur', 'Nagpur', 'Surat', 'Indore', 'Lucknow', 'Kochi', 'Vadodara']
+CATEGORIES = ['Raw Materials', 'Electrical', 'Mechanical', 'IT Services', 'Packaging', 'Logistics', 'Chemicals',
+              'Office Supplies', 'Construction', 'Textiles', 'Safety Equipment', 'Facility Management']
+CERTIFICATIONS = ['ISO 9001', 'ISO 14001', 'ISO 45001', 'BIS', 'CE', 'RoHS', 'MSME', 'NABL']
+
+
+def seed_vendors(owner, count):
+    """Bulk create ``count`` approved vendors with plausible names, places and tags"""
+    rng = random.Random(19)
+    batch = []
+    for i in range(count):
+        city = rng.choice(CITIES)
+        vendor = Vendor(
+            company_name=f'{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {rng.choice(SUFFIXES)}',
+            contact_person=f'{rng.choice(PEOPLE)} {rng.choice(SURNAMES)}',
+            email=f'sales{i}@vendor{i}.example.in',
+            address=f'{rng.randint(1, 400)} Industrial Area, {city}',
+            categories=rng.sample(CATEGORIES, rng.randint(1, 3)),
+            certifications=rng.sample(CERTIFICATIONS, rng.randint(0, 3)),
+            office_locations=[city, *rng.sample(CITIES, rng.randint(0, 2))],
+            status='approved',
+            created_by=owner,
+        )
+        vendor.search_document = vendor.build_search_document()
+        batch.append(vendor)
+        if len(batch) == 5000:
+            Vendor.objects.bulk_create(batch)
+            batch = []
+    Vendor.objects.bulk_create(batch)
+
+
+@contextmanager
+def vendor_fixture(count, keep, stdout):
+    """The FIXTURE_OWNER user with ``count`` vendors, reusing a kept fixture and deleted afterwards unless ``keep``"""
+    require_bench_database()
+    owner, _ = User.objects.get_or_create(id=FIXTURE_OWNER, defaults={'email': f'{FIXTURE_OWNER}@example.com'})
+    try:
+        fixture = Vendor.objects.filter(created_by=owner)
+        if fixture.count() != count:
+            fixture.delete()
+            started = time.perf_counter()
+            seed_vendors(owner, count)
+            stdout.write(f'seeded {count} vendors in {time.perf_counter() - started:.1f}s')
+        yield owner
+    finally:
+        if not keep:
+            delete_owned(owner, (Vendor,))
+
+
+class Command(BaseCommand):
+    help = 'Seed (or reuse) a vendor fixture and time keyset pages of ranked search against the legacy filter'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vendors', type=int, default=500000)
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per query; the median is reported')
+        parser.add_argument('--keep', action='store_true', help='Keep the fixture for the next run instead of deleting it')
+
+    def handle(self, *args, **options):
+        with vendor_fixture(options['vendors'], options['keep'], self.stdout) as owner:
+            search.reset_index()
+            try:
+                self.run(Vendor.objects.filter(created_by=owner), options)
+            finally:
+                search.reset_index()
+
+    def run(self, fixture, options):
+        backend = connection.vendor
+        self.stdout.write(f'backend: {backend}')
+        if backend != 'postgresql':
+            started = time.perf_counter()
+            search.index.load()
+            self.stdout.write(f'memory index load: {time.perf_counter() - started:.1f}s')
+
+        sample = fixture.order_by('pk').values_list('company_name', flat=True)[options['vendors'] // 2]
+        cases = [
+            ('exact name', {'query': sample}),
+            ('common word', {'query': 'bearings'}),
+            ('prefix', {'query': 'bear'}),
+            ('two words', {'query': 'precision pune'}),
+            ('broad', {'query': 'a'}),
+            ('category', {'category': 'Electrical'}),
+            ('category + certifications', {'category': 'Electrical', 'certifications': ['ISO 9001', 'BIS']}),
+            ('location', {'location': 'Pune'}),
+        ]
+        queryset = Vendor.objects.all()
+        for label, params in cases:
+            timings, (rows, after) = self.timed(
+                options['repeat'], lambda: self.keyset_page(search.search_vendors(queryset, **params), None)
+            )
+            line = f'{label:<28} page 1 {statistics.median(timings) * 1000:8.1f}ms'
+            if after is not None:
+                deep, _ = self.timed(
+                    options['repeat'], lambda: self.keyset_page(search.search_vendors(queryset, **params), after)
+                )
+                line += f'  page 2 {statistics.median(deep) * 1000:8.1f}ms'
+            legacy = self.legacy(queryset, **params)
+            if legacy is not None:
+                legacy_timings, count = self.timed(options['repeat'], lambda: self.first_page(legacy))
+                line += f'  legacy {statistics.median(legacy_timings) * 1000:8.1f}ms ({count} counted)'
+            self.stdout.write(line)
+
+    def keyset_page(self, results, after):
+        if hasattr(results, 'keyset_page'):
+            return results.keyset_page(after, PAGE_SIZE)
+        return keyset_page(results, after, PAGE_SIZE)
+
+    def first_page(self, results):
+        """The legacy endpoint's page 1: a count plus an OFFSET slice"""
+        page = Paginator(results, PAGE_SIZE).page(1)
+        list(page.object_list)
+        return page.paginator.count
+
+    def timed(self, repeat, run):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = run()
+            timings.append(time.perf_counter() - started)
+        return timings, result
+
+    def legacy(self, queryset, query='', location='', category='', certifications=()):
+        """The filter VendorViewSet.search used before the index, where this database supports it"""
+        if (category or certifications or location) and not connection.features.supports_json_field_contains:
+            return None
+        if query:
+            queryset = queryset.filter(
+                Q(company_name__icontains=query) | Q(contact_person__icontains=query) | Q(email__icontains=query)
+            )
+        if location:
+            queryset = queryset.filter(Q(address__icontains=location) | Q(office_locations__contains=[location]))
+        if category:
+            queryset = queryset.filter(categories__contains=[category])
+        for cert in certifications:
+            queryset = queryset.filter(certifications__contains=[cert])
+        return queryset.order_by('company_name', 'pk')
@@ -0,0 +1,42 @@
+"""Merge vendors that share a normalised GST number, PAN or email"""
+from django.core.management.base import BaseCommand, CommandError
+
+from procurement.apps.vendors import dedup
+from procurement.apps.vendors.models import IDENTITY_KEY_FIELDS
+
+KEY_NAMES = {'gst': 'gst_key', 'pan': 'pan_key', 'email': 'email_key'}
+
+
+class Command(BaseCommand):
+    help = 'Cluster duplicate vendors by identity key and merge each cluster into one vendor'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keys', default='gst,pan,email', help='Comma-separated keys linking duplicates')
+        parser.add_argument('--dry-run', action='store_true', help='Report the clusters without merging them')
+
+    def handle(self, *args, **options):
+        names = [name.strip() for name in options['keys'].split(',') if name.strip()]
+        unknown = [name for name in names if name not in KEY_NAMES]
+        if unknown or not names:
+            raise CommandError(f'--keys takes a comma-separated subset of {", ".join(KEY_NAMES)}')
+        key_fields = tuple(KEY_NAMES[name] for name in names)
+
+        clusters = dedup.find_clusters(key_fields)
+        result = dedup.merge(clusters, dry_run=options['dry_run'])
+        linked_by = ', '.join(IDENTITY_KEY_FIELDS[key_field] for key_field in key_fields)
+        if options['dry_run']:
+            self.stdout.write(
+                f"{result['clusters']} cluster(s) by {linked_by}; {result['merged']} vendor(s) would be merged"
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Merged {result['merged']} vendor(s) into {result['clusters']} by {linked_by}: "
+                f"{result['repointed']} row(s) re-pointed, {result['dropped']} conflicting row(s) dropped"
+            ))
+        if result['unlinked_users']:
+            self.stdout.write(self.style.WARNING(
+                f"{len(result['unlinked_users'])} user(s) lose a merged vendor profile: "
+                + ', '.join(map(str, result['unlinked_users']))
+            ))
+        if result['merged'] and not options['dry_run']:
+            self.stdout.write('Run score_vendors --full to rescore the surviving vendors')
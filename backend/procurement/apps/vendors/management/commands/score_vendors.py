@@ -0,0 +1,16 @@
+"""Recompute vendor performance scores from delivery, RFx and auction history"""
+from django.core.management.base import BaseCommand
+
+from procurement.apps.vendors import performance
+
+
+class Command(BaseCommand):
+    help = 'Rescore vendors with activity since the last run (every vendor with --full)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Rescore every vendor, e.g. nightly')
+
+    def handle(self, *args, **options):
+        run = performance.run(full=options['full'])
+        kind = 'Full' if run.full else 'Incremental'
+        self.stdout.write(self.style.SUCCESS(f'{kind} run scored {run.scored_count} vendor(s) in {run.duration:.2f}s'))
@@ -0,0 +1,255 @@
+"""Vendor matching by category, certification and region.
+
+``MatchIndex`` is an in-process inverted index. Each normalised category,
+certification and location token (from ``office_locations`` and the
+address) maps to a sorted NumPy array of vendor slots. A match concatenates
+the arrays of the requested categories and counts each slot with
+``np.unique``, so the work grows with the vendors covering those categories
+rather than with the vendors table. Certification and region filters are
+sorted-array intersections. Candidates are ranked by overlap (the number of
+requested categories covered), then ``performance_score``.
+
+Like ``search.MemoryIndex``, vendors occupy append-only slots. The Vendor
+save/delete signals keep a worker's index current with its own writes, and
+the index is rebuilt when dead slots pass COMPACT_RATIO. Every
+``VENDOR_MATCH_INDEX_TTL`` seconds it catches up with writes from other
+workers: vendors saved since the last sync are re-read by ``updated_at``,
+scores are re-read after a score_vendors run, and a vendor count that no
+longer matches (deletes elsewhere) triggers a full reload. Bulk writes that
+skip ``updated_at`` must call ``reset_index()``.
+"""
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Vendor, VendorScoreRun, search_terms
+
+# Vendors in these statuses are never suggested
+EXCLUDED_STATUSES = ('rejected', 'suspended')
+COMPACT_RATIO = 0.25
+# Re-read this much before the last sync, for saves that committed after it
+SYNC_OVERLAP = timedelta(seconds=60)
+COLUMNS = ['pk', 'status', 'performance_score', 'categories', 'certifications', 'office_locations', 'address']
+MAX_LIMIT = 100
+VISIBLE_CHUNK_SIZE = 900
+
+
+def normalize(value):
+    return ' '.join(str(value).lower().split())
+
+
+class MatchIndex:
+    """Inverted index of vendor categories, certifications and location tokens"""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.loaded_at = None
+        self.synced_at = None
+
+    def _clear(self):
+        self.pks = []
+        self.scores = []
+        self.live = []
+        self.slots = {}
+        self.postings = defaultdict(list)
+        self.arrays = {}
+        self.columns = None
+        self.dead = 0
+        # Raw list value -> normalised key; the same few categories recur across vendors
+        self.normalized = {}
+
+    def load(self):
+        with self.lock:
+            self._clear()
+            synced_at = timezone.now()
+            for row in Vendor.objects.order_by().values_list(*COLUMNS).iterator(chunk_size=5000):
+                self._add(*row)
+            self.loaded_at, self.synced_at = time.monotonic(), synced_at
+
+    def refresh(self):
+        """Catch up with vendors saved and scored since the last sync, or reload when vendors went missing"""
+        with self.lock:
+            synced_at = timezone.now()
+            since = self.synced_at - SYNC_OVERLAP
+            for row in Vendor.objects.filter(updated_at__gte=since).order_by().values_list(*COLUMNS).iterator():
+                self._remove(row[0])
+                self._add(*row)
+            if VendorScoreRun.objects.filter(finished_at__gte=since).exists():
+                scores = Vendor.objects.order_by().values_list('pk', 'performance_score')
+                for pk, score in scores.iterator(chunk_size=5000):
+                    slot = self.slots.get(pk)
+                    if slot is not None:
+                        self.scores[slot] = np.nan if score is None else float(score)
+                self.columns = None
+            if Vendor.objects.count() != len(self.slots):
+                self.load()
+                return
+            self.loaded_at, self.synced_at = time.monotonic(), synced_at
+
+    def reset(self):
+        with self.lock:
+            self.loaded_at = None
+            self._clear()
+
+    def _add(self, pk, status, performance_score, categories, certifications, office_locations, address):
+        slot = len(self.pks)
+        self.pks.append(pk)
+        self.scores.append(np.nan if performance_score is None else float(performance_score))
+        self.live.append(status not in EXCLUDED_STATUSES)
+        self.slots[pk] = slot
+        keys = {('categories', self._normalize(value)) for value in categories or []}
+        keys.update(('certifications', self._normalize(value)) for value in certifications or [])
+        locations = ' '.join(map(str, office_locations or [])) + ' ' + (address or '')
+        keys.update(('location', term) for term in search_terms(locations))
+        for key in keys:
+            self.postings[key].append(slot)
+            self.arrays.pop(key, None)
+        self.columns = None
+
+    def _normalize(self, value):
+        key = self.normalized.get(value) if isinstance(value, str) else None
+        if key is None:
+            key = normalize(value)
+            if isinstance(value, str):
+                self.normalized[value] = key
+        return key
+
+    def _remove(self, pk):
+        slot = self.slots.pop(pk, None)
+        if slot is not None:
+            self.live[slot] = False
+            self.pks[slot] = None
+            self.dead += 1
+            self.columns = None
+
+    def update(self, vendor):
+        with self.lock:
+            if self.loaded_at is None:
+                return
+            self._remove(vendor.pk)
+            self._add(
+                vendor.pk, vendor.status, vendor.performance_score, vendor.categories,
+                vendor.certifications, vendor.office_locations, vendor.address,
+            )
+
+    def remove(self, pk):
+        with self.lock:
+            if self.loaded_at is not None:
+                self._remove(pk)
+
+    def _array(self, key):
+        array = self.arrays.get(key)
+        if array is None:
+            # Slots are appended in increasing order, so postings are already sorted
+            array = self.arrays[key] = np.array(self.postings.get(key, ()), dtype=np.int64)
+        return array
+
+    def _columns(self):
+        """Per-slot (live, score) arrays, rebuilt after a change"""
+        if self.columns is None:
+            self.columns = (np.array(self.live, dtype=bool), np.array(self.scores, dtype=float))
+        return self.columns
+
+
+    def match(self, categories, certifications=(), region='', exclude=()):
+        """Vendors covering any of ``categories`` and passing the filters, best first"""
+        with self.lock:
+            if self.loaded_at is None or self.dead > COMPACT_RATIO * max(len(self.pks), 1):
+                self.load()
+            elif time.monotonic() - self.loaded_at >= settings.VENDOR_MATCH_INDEX_TTL:
+                self.refresh()
+            # Normalised category -> the spelling asked for, which is what covered() reports
+            requested = {}
+            for value in categories:
+                requested.setdefault(normalize(value), str(value).strip())
+            requested.pop('', None)
+            if not requested:
+                return []
+            arrays = [self._array(('categories', category)) for category in requested]
+            candidates, overlap = np.unique(np.concatenate(arrays), return_counts=True)
+
+            live, scores = self._columns()
+            keep = live[candidates]
+            for certification in filter(None, map(normalize, certifications)):
+                keep &= np.isin(candidates, self._array(('certifications', certification)), assume_unique=True)
+            terms = search_terms(region)
+            if terms:
+                in_region = self._array(('location', terms[0]))
+                for term in terms[1:]:
+                    in_region = np.intersect1d(in_region, self._array(('location', term)), assume_unique=True)
+                keep &= np.isin(candidates, in_region, assume_unique=True)
+            excluded = [self.slots[pk] for pk in exclude if pk in self.slots]
+            if excluded:
+                keep &= ~np.isin(candidates, excluded)
+            candidates, overlap = candidates[keep], overlap[keep]
+
+            # lexsort orders by its last key first: most categories, then best score with unscored
+            # vendors last; it is stable, so ties stay in slot order
+            order = np.lexsort((-np.nan_to_num(scores[candidates], nan=-1.0), -overlap))
+            return _Ranked(self.pks, candidates[order], list(zip(requested.values(), arrays)))
+
+
+class _Ranked:
+    """Ranked match slots that resolve each one's covered categories only when read"""
+
+    def __init__(self, pks, slots, membership):
+        self.pks = list(pks)
+        self.slots = slots
+        self.membership = membership
+
+    def __len__(self):
+        return len(self.slots)
+
+    def pk(self, position):
+        return self.pks[self.slots[position]]
+
+    def covered(self, positions):
+        slots = self.slots[positions]
+        covered = [[] for _ in positions]
+        for category, array in self.membership:
+            for row in np.flatnonzero(np.isin(slots, array, assume_unique=True)):
+                covered[row].append(category)
+        return covered
+
+
+index = MatchIndex()
+
+
+def reset_index():
+    """Drop the in-process index; the next match reloads it"""
+    index.reset()
+
+
+def match_vendors(queryset, categories, certifications=(), region='', exclude=(), limit=20):
+    """The best ``limit`` vendors of ``queryset`` covering ``categories``, as (vendor, covered categories)"""
+    ranked = index.match(categories, certifications, region, exclude)
+    limit = max(1, min(limit, MAX_LIMIT))
+    scoped = queryset.query.has_filters()
+    matches, start = [], 0
+    while len(matches) < limit and start < len(ranked):
+        # An unscoped queryset has every ranked vendor, so one page is enough
+        end = min(start + (VISIBLE_CHUNK_SIZE if scoped else limit - len(matches)), len(ranked))
+        rows = queryset.in_bulk([ranked.pk(position) for position in range(start, end)])
+        visible = [position for position in range(start, end) if ranked.pk(position) in rows][:limit - len(matches)]
+        matches.extend(
+            (rows[ranked.pk(position)], covered) for position, covered in zip(visible, ranked.covered(visible))
+        )
+        start = end
+    return matches
+
+
+@receiver(post_save, sender=Vendor)
+def _index_vendor(sender, instance, **kwargs):
+    index.update(instance)
+
+
+@receiver(post_delete, sender=Vendor)
+def _unindex_vendor(sender, instance, **kwargs):
+    index.remove(instance.pk)
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.4 on 2026-10-17 15:20
+
+import re
+
+from django.db import migrations, models
+
+TOKEN_PATTERN = re.compile(r'\w+')
+TEXT_FIELDS = ['company_name', 'contact_person', 'email', 'address']
+LIST_FIELDS = ['categories', 'certifications', 'office_locations', 'tags']
+
+# PostgreSQL only: trigram and full-text indexes on the search document, a
+# trigram index for the address__icontains location filter and GIN indexes
+# serving @> on the JSON list fields
+POSTGRES_INDEXES = [
+    ('vendors_search_trgm_idx', 'USING gin (search_document gin_trgm_ops)'),
+    ('vendors_search_fts_idx', "USING gin (to_tsvector('english'::regconfig, search_document))"),
+    ('vendors_address_trgm_idx', 'USING gin (UPPER(address) gin_trgm_ops)'),
+    ('vendors_categories_gin_idx', 'USING gin (categories jsonb_path_ops)'),
+    ('vendors_certifications_gin_idx', 'USING gin (certifications jsonb_path_ops)'),
+    ('vendors_office_locations_gin_idx', 'USING gin (office_locations jsonb_path_ops)'),
+]
+
+
+def backfill_search_documents(apps, schema_editor):
+    """Build the document of every existing vendor, as Vendor.build_search_document does"""
+    Vendor = apps.get_model('vendors', 'Vendor')
+    batch = []
+    for vendor in Vendor.objects.order_by().only('pk', *TEXT_FIELDS, *LIST_FIELDS).iterator(chunk_size=2000):
+        terms = []
+        for field in TEXT_FIELDS:
+            terms.extend(TOKEN_PATTERN.findall((getattr(vendor, field) or '').lower()))
+        for field in LIST_FIELDS:
+            for value in getattr(vendor, field) or []:
+                terms.extend(TOKEN_PATTERN.findall(str(value).lower()))
+        vendor.search_document = ' '.join(terms)
+        batch.append(vendor)
+        if len(batch) == 2000:
+            Vendor.objects.bulk_update(batch, ['search_document'])
+            batch = []
+    Vendor.objects.bulk_update(batch, ['search_document'])
+
+
+def create_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, definition in POSTGRES_INDEXES:
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON vendors {definition}')
+
+
+def drop_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in POSTGRES_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vendor',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_postgres_indexes, drop_postgres_indexes),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-17 15:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0002_vendor_search_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VendorScoreRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField()),
+                ('full', models.BooleanField(default=False)),
+                ('scored_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'vendor_score_runs',
+                'get_latest_by': 'started_at',
+            },
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.4 on 2026-10-17 16:30
+
+import re
+
+from django.db import migrations, models
+
+TAX_ID_NOISE_PATTERN = re.compile(r'[^0-9A-Z]')
+KEY_FIELDS = {'gst_key': 'gst_number', 'pan_key': 'pan_number', 'email_key': 'email'}
+
+
+def identity_key(field, value):
+    if not value:
+        return None
+    if field == 'email':
+        key = ''.join(value.split()).lower()
+    else:
+        key = TAX_ID_NOISE_PATTERN.sub('', value.upper())
+    return key or None
+
+
+def backfill_identity_keys(apps, schema_editor):
+    """Derive the keys of every existing vendor, as Vendor.save does"""
+    Vendor = apps.get_model('vendors', 'Vendor')
+    batch = []
+    for vendor in Vendor.objects.order_by().only('pk', *KEY_FIELDS.values()).iterator(chunk_size=2000):
+        for key_field, field in KEY_FIELDS.items():
+            setattr(vendor, key_field, identity_key(field, getattr(vendor, field)))
+        batch.append(vendor)
+        if len(batch) == 2000:
+            Vendor.objects.bulk_update(batch, list(KEY_FIELDS))
+            batch = []
+    Vendor.objects.bulk_update(batch, list(KEY_FIELDS))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0003_vendor_score_runs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vendor',
+            name='gst_key',
+            field=models.CharField(blank=True, editable=False, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='vendor',
+            name='pan_key',
+            field=models.CharField(blank=True, editable=False, max_length=50, null=True),
+        ),
+        migrations.AddField(
+            model_name='vendor',
+            name='email_key',
+            field=models.CharField(blank=True, editable=False, max_length=254, null=True),
+        ),
+        migrations.RunPython(backfill_identity_keys, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='vendor',
+            index=models.Index(fields=['gst_key'], name='vendors_gst_key_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vendor',
+            index=models.Index(fields=['pan_key'], name='vendors_pan_key_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vendor',
+            index=models.Index(fields=['email_key'], name='vendors_email_key_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-17 17:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0004_vendor_identity_keys'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vendor',
+            index=models.Index(fields=['company_name', 'id'], name='vendors_company_name_id_idx'),
+        ),
+    ]
@@ -1,7 +1,32 @@
 from django.db import models
+import re
 import uuid
 from procurement.apps.users.models import User
 
+SEARCH_TOKEN_PATTERN = re.compile(r'\w+')
+# Text and list fields folded into Vendor.search_document
+SEARCH_TEXT_FIELDS = ['company_name', 'contact_person', 'email', 'address']
+SEARCH_LIST_FIELDS = ['categories', 'certifications', 'office_locations', 'tags']
+TAX_ID_NOISE_PATTERN = re.compile(r'[^0-9A-Z]')
+# Normalised identity key -> the field it is derived from; vendors sharing any key are duplicates
+IDENTITY_KEY_FIELDS = {'gst_key': 'gst_number', 'pan_key': 'pan_number', 'email_key': 'email'}
+
+
+def search_terms(text):
+    """Lower-cased word tokens of ``text``, the unit both search backends match on"""
+    return SEARCH_TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+def identity_key(field, value):
+    """Normalised form of a GST number, PAN or email, or None when blank"""
+    if not value:
+        return None
+    if field == 'email':
+        key = ''.join(value.split()).lower()
+    else:
+        key = TAX_ID_NOISE_PATTERN.sub('', value.upper())
+    return key or None
+
 
 class Vendor(models.Model):
     """Vendor model for managing supplier information"""
@@ -34,9 +59,60 @@ class Vendor(models.Model):
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='created_vendors')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Tokens of the searchable fields, indexed by procurement.apps.vendors.search
+    search_document = models.TextField(blank=True, default='', editable=False)
+    # Normalised gst_number, pan_number and email, looked up by procurement.apps.vendors.dedup
+    gst_key = models.CharField(max_length=50, blank=True, null=True, editable=False)
+    pan_key = models.CharField(max_length=50, blank=True, null=True, editable=False)
+    email_key = models.CharField(max_length=254, blank=True, null=True, editable=False)
     
     class Meta:
         db_table = 'vendors'
+        indexes = [
+            models.Index(fields=['gst_key'], name='vendors_gst_key_idx'),
+            models.Index(fields=['pan_key'], name='vendors_pan_key_idx'),
+            models.Index(fields=['email_key'], name='vendors_email_key_idx'),
+            # Serves keyset pages of searches ordered by name
+            models.Index(fields=['company_name', 'id'], name='vendors_company_name_id_idx'),
+        ]
+    
+    def build_search_document(self):
+        terms = []
+        for field in SEARCH_TEXT_FIELDS:
+            terms.extend(search_terms(getattr(self, field)))
+        for field in SEARCH_LIST_FIELDS:
+            for value in getattr(self, field) or []:
+                terms.extend(search_terms(str(value)))
+        return ' '.join(terms)
+    
+    def save(self, *args, **kwargs):
+        self.search_document = self.build_search_document()
+        for key_field, field in IDENTITY_KEY_FIELDS.items():
+            setattr(self, key_field, identity_key(field, getattr(self, field)))
+        update_fields = kwargs.get('update_fields')
+        if update_fields:
+            kwargs['update_fields'] = {*update_fields, 'search_document', *IDENTITY_KEY_FIELDS}
+        super().save(*args, **kwargs)
+    
+    def __str__(self):
+        return self.company_name
+
+
+class VendorScoreRun(models.Model):
+    """A completed performance scoring run; the latest one's start is the next run's watermark"""
+    
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+    full = models.BooleanField(default=False)
+    scored_count = models.IntegerField(default=0)
+    
+    class Meta:
+        db_table = 'vendor_score_runs'
+        get_latest_by = 'started_at'
+    
+    @property
+    def duration(self):
+        return (self.finished_at - self.started_at).total_seconds()
     
     def __str__(self):
-        return self.company_name
\ No newline at end of file
+        return f"{'Full' if self.full else 'Incremental'} run at {self.started_at} ({self.scored_count} vendors)"
@@ -0,0 +1,188 @@
+"""Batch vendor performance scoring.
+
+Every vendor's ``performance_score`` (0-100) is the weighted mean of four
+components, each in 0..1:
+
+* on-time delivery: share of purchase order lines past their delivery date
+  that are delivered (by line status or by the purchase order's status);
+  lines carry no delivery timestamp, so late deliveries count as delivered.
+* response rate: share of RFx invitations answered with a response or
+  marked responded.
+* lead time: ``1 - average quoted lead time / MAX_LEAD_TIME_DAYS``, clipped.
+* auction win rate: share of completed auctions joined that the vendor won
+  outright or won a lot of.
+
+Each component is one grouped SQL query over all vendors (or a chunked set
+of vendor ids). The counts are laid out as NumPy columns and weighted in a
+few array operations. Vendors without data for a component are weighted over
+the components they have; vendors with no activity at all get no score.
+
+``run()`` is incremental. It rescores only vendors with activity since the
+previous run started, found through indexed timestamps: purchase orders and
+lines updated, lines falling due, invitations sent or answered, responses
+submitted and auctions updated. Deleted activity and invitation status edits
+carry no timestamp, so the periodic ``full`` run picks those up.
+"""
+from decimal import Decimal
+
+import numpy as np
+from django.db import connections, transaction
+from django.db.models import Avg, Count, Exists, F, OuterRef, Q
+from django.utils import timezone
+
+from procurement.apps.auctions.models import Auction, AuctionLot, AuctionParticipant
+from procurement.apps.purchase_orders.models import POLineItem, PurchaseOrder
+from procurement.apps.rfx.models import RFxInvitation, RFxResponse
+
+from .models import Vendor, VendorScoreRun
+
+WEIGHTS = {'on_time': 0.4, 'response_rate': 0.25, 'lead_time': 0.2, 'win_rate': 0.15}
+COMPONENTS = list(WEIGHTS)
+MAX_LEAD_TIME_DAYS = 90
+DELIVERED_PO_STATUSES = ('delivered', 'invoiced', 'paid')
+# Vendor ids per IN list; above CHUNKED_LIMIT ids the aggregates run over every vendor instead
+CHUNK_SIZE = 900
+CHUNKED_LIMIT = 10 * CHUNK_SIZE
+WRITE_BATCH_SIZE = 1000
+
+
+def _grouped(queryset, vendor_field, vendor_ids):
+    """Rows of a vendor-grouped aggregate, restricted to ``vendor_ids`` unless None"""
+    if vendor_ids is None:
+        yield from queryset
+        return
+    if len(vendor_ids) > CHUNKED_LIMIT:
+        yield from (row for row in queryset if row['vendor_id'] in vendor_ids)
+        return
+    ordered = sorted(vendor_ids)
+    for start in range(0, len(ordered), CHUNK_SIZE):
+        yield from queryset.filter(**{f'{vendor_field}__in': ordered[start:start + CHUNK_SIZE]})
+
+
+def _aggregates(now, vendor_ids):
+    """vendor_id -> {component: (numerator, denominator)}, with the average days for lead_time"""
+    data = {}
+
+    def put(vendor_id, component, value):
+        data.setdefault(vendor_id, {})[component] = value
+
+    lines = POLineItem.objects.filter(delivery_date__lt=now).exclude(purchase_order__status='cancelled').order_by()
+    for row in _grouped(lines.values(vendor_id=F('purchase_order__vendor_id')).annotate(
+        due=Count('id'),
+        delivered=Count('id', filter=Q(status='delivered') | Q(purchase_order__status__in=DELIVERED_PO_STATUSES)),
+    ), 'purchase_order__vendor_id', vendor_ids):
+        put(row['vendor_id'], 'on_time', (row['delivered'], row['due']))
+
+    answered = RFxResponse.objects.filter(rfx=OuterRef('rfx'), vendor=OuterRef('vendor'))
+    for row in _grouped(RFxInvitation.objects.order_by().values('vendor_id').annotate(
+        invited=Count('id'),
+        responded=Count('id', filter=Q(status='responded') | Q(Exists(answered))),
+    ), 'vendor_id', vendor_ids):
+        put(row['vendor_id'], 'response_rate', (row['responded'], row['invited']))
+
+    for row in _grouped(RFxResponse.objects.filter(lead_time__isnull=False).order_by().values('vendor_id').annotate(
+        lead_time=Avg('lead_time'),
+    ), 'vendor_id', vendor_ids):
+        put(row['vendor_id'], 'lead_time', row['lead_time'])
+
+    won_lot = AuctionLot.objects.filter(auction=OuterRef('auction'), winner=OuterRef('vendor'))
+    for row in _grouped(AuctionParticipant.objects.filter(auction__status='completed').order_by().values(
+        'vendor_id'
+    ).annotate(
+        joined=Count('id'),
+        won=Count('id', filter=Q(auction__winner=F('vendor')) | Q(Exists(won_lot))),
+    ), 'vendor_id', vendor_ids):
+        put(row['vendor_id'], 'win_rate', (row['won'], row['joined']))
+    return data
+
+
+def compute(vendor_ids=None, now=None):
+    """Scores 0..100 of ``vendor_ids`` (every vendor with activity when None); vendors without activity are left out"""
+    now = now or timezone.now()
+    data = _aggregates(now, vendor_ids)
+    ids = list(data)
+    if not ids:
+        return {}
+
+    numerators = np.full((len(ids), len(COMPONENTS)), np.nan)
+    denominators = np.ones_like(numerators)
+    for row, vendor_id in enumerate(ids):
+        for column, component in enumerate(COMPONENTS):
+            value = data[vendor_id].get(component)
+            if value is None:
+                continue
+            if component == 'lead_time':
+                numerators[row, column] = value
+            else:
+                numerators[row, column], denominators[row, column] = value
+
+    ratios = numerators / np.where(denominators > 0, denominators, np.nan)
+    lead = COMPONENTS.index('lead_time')
+    ratios[:, lead] = np.clip(1 - numerators[:, lead] / MAX_LEAD_TIME_DAYS, 0, 1)
+    present = ~np.isnan(ratios)
+    weights = np.array([WEIGHTS[component] for component in COMPONENTS])
+    weight_sums = present @ weights
+    scores = np.where(present, ratios, 0) @ weights / np.where(weight_sums > 0, weight_sums, np.nan) * 100
+    return {
+        vendor_id: None if np.isnan(score) else round(float(score), 2)
+        for vendor_id, score in zip(ids, scores)
+    }
+
+
+def changed_vendors(since, now):
+    """Ids of vendors with scoring activity in [since, now)"""
+    sources = [
+        PurchaseOrder.objects.filter(updated_at__gte=since).values_list('vendor_id'),
+        POLineItem.objects.filter(
+            Q(updated_at__gte=since) | Q(delivery_date__gte=since, delivery_date__lt=now)
+        ).values_list('purchase_order__vendor_id'),
+        RFxInvitation.objects.filter(Q(invited_at__gte=since) | Q(responded_at__gte=since)).values_list('vendor_id'),
+        RFxResponse.objects.filter(submitted_at__gte=since).values_list('vendor_id'),
+        AuctionParticipant.objects.filter(
+            Q(registered_at__gte=since) | Q(auction__updated_at__gte=since)
+        ).values_list('vendor_id'),
+        Auction.objects.filter(updated_at__gte=since, winner__isnull=False).values_list('winner_id'),
+    ]
+    union = sources[0].order_by().union(*(source.order_by() for source in sources[1:]))
+    return {vendor_id for (vendor_id,) in union}
+
+
+def _write(scores, cleared):
+    """Store ``scores`` and null the score of every vendor in ``cleared``"""
+    rows = [(vendor_id, None if score is None else Decimal(f'{score:.2f}')) for vendor_id, score in scores.items()]
+    rows += [(vendor_id, None) for vendor_id in cleared if vendor_id not in scores]
+    # One CASE UPDATE per batch; bulk_update resolves an ORM expression per row, which dominates at 100k vendors
+    pk, score_field = Vendor._meta.pk, Vendor._meta.get_field('performance_score')
+    # The wrapper itself rather than the thread-local proxy, which costs a lookup per parameter
+    connection = connections[Vendor.objects.db]
+    quote = connection.ops.quote_name
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        for start in range(0, len(rows), WRITE_BATCH_SIZE):
+            batch = rows[start:start + WRITE_BATCH_SIZE]
+            params = []
+            for vendor_id, score in batch:
+                params += [pk.get_db_prep_value(vendor_id, connection), score_field.get_db_prep_save(score, connection)]
+            params += [pk.get_db_prep_value(vendor_id, connection) for vendor_id, _ in batch]
+            cursor.execute(
+                f'UPDATE {quote(Vendor._meta.db_table)} SET {quote(score_field.column)} = CAST(CASE {quote(pk.column)} '
+                f'{" ".join(["WHEN %s THEN %s"] * len(batch))} END AS {score_field.cast_db_type(connection)}) '
+                f'WHERE {quote(pk.column)} IN ({", ".join(["%s"] * len(batch))})',
+                params,
+            )
+    return len(rows)
+
+
+def run(full=False):
+    """Rescore vendors with activity since the last run, or every vendor when ``full``; returns the VendorScoreRun"""
+    started_at = timezone.now()
+    last = VendorScoreRun.objects.order_by('-started_at').first()
+    if full or last is None:
+        scores = compute(now=started_at)
+        cleared = set(Vendor.objects.filter(performance_score__isnull=False).values_list('pk', flat=True))
+    else:
+        cleared = changed_vendors(last.started_at, started_at)
+        scores = compute(cleared, now=started_at) if cleared else {}
+    scored = _write(scores, cleared)
+    return VendorScoreRun.objects.create(
+        started_at=started_at, finished_at=timezone.now(), full=full or last is None, scored_count=scored
+    )
@@ -0,0 +1,294 @@
+"""Ranked vendor search.
+
+Every vendor carries ``search_document``, the lower-cased word tokens of its
+name, contact, email, address and list fields, rebuilt on save. A query is
+split into the same tokens and a vendor matches when each token occurs in its
+document; results come back best match first.
+
+On PostgreSQL the document is matched with LIKE, served by a pg_trgm GIN
+index, or with full-text search on an English ``to_tsvector`` expression
+index, which adds stemmed matches ("bearings" finds "bearing"). Ranking is
+``ts_rank`` plus the trigram word similarity of the query to the company
+name, and the list-field filters are ``@>`` lookups on jsonb_path_ops GIN
+indexes (migration 0002).
+
+Other databases, SQLite in development and tests, get ``MemoryIndex``: an
+in-process inverted index of the same tokens plus the list-field values,
+loaded on first use and kept current by the Vendor save/delete signals.
+Writes that skip signals (bulk_create, QuerySet.update) must call
+``reset_index()``. Its ranking favours exact over prefix over substring
+token matches and matches in the company name; it does not stem. A page of
+results is the best few keys past the cursor, taken off a heap, so a broad
+query never sorts or loads every match.
+"""
+import bisect
+import heapq
+import threading
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import BooleanField, F, FloatField, Func, Q, TextField, Value
+from django.db.models.functions import Cast, Lower
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Vendor, search_terms
+
+TEXT_SEARCH_CONFIG = 'english'
+EXACT_WEIGHT = 1.0
+PREFIX_WEIGHT = 0.75
+SUBSTRING_WEIGHT = 0.5
+NAME_WEIGHT = 0.5
+# Rebuild the memory index once this share of its slots belong to deleted or re-saved vendors
+COMPACT_RATIO = 0.25
+
+
+def search_vendors(queryset, query='', location='', category='', certifications=()):
+    """Vendors in ``queryset`` matching the query and filters, best match first
+
+    Returns a queryset ordered by a unique key, or an ``IndexResults`` on
+    the memory index; both page with procurement.pagination.KeysetPagination.
+    """
+    terms = search_terms(query)
+    certifications = [cert for cert in certifications if cert]
+    if connections[queryset.db].vendor == 'postgresql':
+        return _database_search(queryset, query, terms, location, category, certifications)
+    if not (terms or location or category or certifications):
+        return queryset.order_by('company_name', 'pk')
+    return IndexResults(queryset, terms, location, category, certifications)
+
+
+def _search_vector(expression):
+    return Func(expression, template=f"to_tsvector('{TEXT_SEARCH_CONFIG}'::regconfig, %(expressions)s)")
+
+
+def _search_query(text):
+    return Func(
+        Value(text, output_field=TextField()),
+        template=f"plainto_tsquery('{TEXT_SEARCH_CONFIG}'::regconfig, %(expressions)s)",
+    )
+
+
+def _database_search(queryset, query, terms, location, category, certifications):
+    if location:
+        queryset = queryset.filter(Q(office_locations__contains=[location]) | Q(address__icontains=location))
+    if category:
+        queryset = queryset.filter(categories__contains=[category])
+    if certifications:
+        queryset = queryset.filter(certifications__contains=certifications)
+    if not terms:
+        return queryset.order_by('company_name', 'pk')
+
+    vector = _search_vector(F('search_document'))
+    text_query = _search_query(query)
+    contains_all = Q()
+    for term in terms:
+        contains_all &= Q(search_document__contains=term)
+    full_text = Func(vector, text_query, template='%(expressions)s', arg_joiner=' @@ ', output_field=BooleanField())
+    # ts_rank and word_similarity are float4; in double precision the rank survives the cursor's JSON round trip
+    # exactly, so the keyset comparison neither skips nor repeats rows at a page boundary
+    rank = Cast(Func(vector, text_query, function='ts_rank', output_field=FloatField()) + Func(
+        Value(' '.join(terms), output_field=TextField()), Lower('company_name'),
+        function='word_similarity', output_field=FloatField(),
+    ), FloatField())
+    return queryset.filter(contains_all | full_text).annotate(search_rank=rank).order_by(
+        '-search_rank', 'company_name', 'pk'
+    )
+
+
+class IndexResults:
+    """Memory index matches of a search, loaded from ``queryset`` one keyset page at a time"""
+
+    def __init__(self, queryset, terms, location, category, certifications):
+        self.queryset = queryset
+        self.search = (terms, location, category, certifications)
+
+    def keyset_page(self, after, size):
+        """Rows of the ``size`` best matches past the key ``after`` and, if more follow, the last one's key"""
+        if after is not None:
+            try:
+                score, name, pk = after
+                after = (float(score), str(name), Vendor._meta.pk.to_python(pk))
+            except (TypeError, ValueError, ValidationError):
+                raise ValueError('Invalid search cursor')
+        # A scoped queryset (a vendor's own profiles) is filtered inside the index, before the page is cut
+        allowed = set(self.queryset.order_by().values_list('pk', flat=True)) if self.queryset.query.has_filters() else None
+        keyed = index.search(*self.search, after=after, limit=size + 1, allowed=allowed)
+        rows = self.queryset.in_bulk([pk for _, pk in keyed])
+        page = [(key, rows[pk]) for key, pk in keyed[:size] if pk in rows]
+        return [row for _, row in page], list(keyed[size - 1][0]) if len(keyed) > size else None
+
+
+class MemoryIndex:
+    """In-process inverted index of vendor search tokens and list-field values
+
+    Vendors occupy append-only integer slots; postings are lists of slots in
+    insertion order. Re-saving a vendor gives it a new slot and leaves the old
+    one dead, and the index is rebuilt once dead slots pass COMPACT_RATIO.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.loaded = False
+
+    def _clear(self):
+        self.pks = []
+        self.names = []
+        self.slots = {}
+        self.terms = defaultdict(list)
+        self.name_terms = defaultdict(list)
+        self.values = defaultdict(list)
+        self.vocabularies = {}
+        self.dead = 0
+
+    def load(self):
+        with self.lock:
+            self._clear()
+            rows = Vendor.objects.order_by().values_list(
+                'pk', 'company_name', 'search_document', 'address', 'categories', 'certifications', 'office_locations'
+            )
+            for row in rows.iterator(chunk_size=5000):
+                self._add(*row)
+            self.loaded = True
+
+    def reset(self):
+        with self.lock:
+            self.loaded = False
+            self._clear()
+
+    def _add(self, pk, company_name, document, address, categories, certifications, office_locations):
+        slot = len(self.pks)
+        self.pks.append(pk)
+        self.names.append((company_name or '').lower())
+        self.slots[pk] = slot
+        for kind, terms in (('terms', document.split()), ('name_terms', search_terms(company_name))):
+            postings = getattr(self, kind)
+            for term in set(terms):
+                if term not in postings:
+                    self.vocabularies.pop(kind, None)
+                postings[term].append(slot)
+        for term in set(search_terms(address)):
+            self.values['address', term].append(slot)
+        for field, values in (
+            ('categories', categories), ('certifications', certifications), ('office_locations', office_locations),
+        ):
+            for value in set(map(str, values or [])):
+                self.values[field, value].append(slot)
+
+    def _remove(self, pk):
+        slot = self.slots.pop(pk, None)
+        if slot is not None:
+            self.pks[slot] = None
+            self.dead += 1
+
+    def update(self, vendor):
+        with self.lock:
+            if not self.loaded:
+                return
+            self._remove(vendor.pk)
+            self._add(
+                vendor.pk, vendor.company_name, vendor.search_document, vendor.address,
+                vendor.categories, vendor.certifications, vendor.office_locations,
+            )
+
+    def remove(self, pk):
+        with self.lock:
+            if self.loaded:
+                self._remove(pk)
+
+    def _vocabulary(self, kind):
+        """Newline-joined tokens of ``kind`` with their offsets, for substring scans in C"""
+        vocabulary = self.vocabularies.get(kind)
+        if vocabulary is None:
+            words = list(getattr(self, kind))
+            starts, offset = [], 1
+            for word in words:
+                starts.append(offset)
+                offset += len(word) + 1
+            vocabulary = self.vocabularies[kind] = ('\n' + '\n'.join(words) + '\n', words, starts)
+        return vocabulary
+
+    def _expand(self, kind, term):
+        """Slots whose tokens equal, start with and otherwise contain ``term``"""
+        postings = getattr(self, kind)
+        text, words, starts = self._vocabulary(kind)
+        exact = set(postings.get(term, ()))
+        prefix, substring = set(), set()
+        position = text.find(term)
+        while position != -1:
+            index = bisect.bisect_right(starts, position) - 1
+            word = words[index]
+            if word != term:
+                (prefix if starts[index] == position else substring).update(postings[word])
+            # Continue after this word, so a word is expanded once however often it contains the term
+            position = text.find(term, starts[index] + len(word))
+        return exact, prefix, substring
+
+    def search(self, terms, location='', category='', certifications=(), after=None, limit=None, allowed=None):
+        """(key, vendor id) of vendors matching every term and filter, best match first
+
+        Keys are (-score, lower-cased name, id). Only keys past ``after`` and
+        ids in ``allowed`` are considered, and with ``limit`` the best ones
+        are picked off a heap instead of sorting every match.
+        """
+        with self.lock:
+            if not self.loaded or self.dead > COMPACT_RATIO * max(len(self.pks), 1):
+                self.load()
+            candidates = None
+            for key in [('categories', category)] * bool(category) + [('certifications', cert) for cert in certifications]:
+                candidates = self._narrow(candidates, self.values.get(key, ()))
+            if location:
+                in_address = None
+                for term in search_terms(location) or ['']:
+                    in_address = self._narrow(in_address, self.values.get(('address', term), ()))
+                candidates = self._narrow(
+                    candidates, in_address | set(self.values.get(('office_locations', location), ()))
+                )
+            scores = defaultdict(float)
+            for term in terms:
+                exact, prefix, substring = self._expand('terms', term)
+                candidates = self._narrow(candidates, exact | prefix | substring)
+                name_exact, name_prefix, name_substring = self._expand('name_terms', term)
+                in_name = name_exact | name_prefix | name_substring
+                for slot in candidates:
+                    if slot in exact:
+                        scores[slot] += EXACT_WEIGHT
+                    elif slot in prefix:
+                        scores[slot] += PREFIX_WEIGHT
+                    else:
+                        scores[slot] += SUBSTRING_WEIGHT
+                    if slot in in_name:
+                        scores[slot] += NAME_WEIGHT
+            pks, names = self.pks, self.names
+            keyed = (
+                (-scores[slot], names[slot], pks[slot]) for slot in candidates or ()
+                if pks[slot] is not None and (allowed is None or pks[slot] in allowed)
+            )
+            if after is not None:
+                keyed = (key for key in keyed if key > after)
+            ranked = sorted(keyed) if limit is None else heapq.nsmallest(limit, keyed)
+            return [(key, key[2]) for key in ranked]
+
+    @staticmethod
+    def _narrow(candidates, slots):
+        slots = slots if isinstance(slots, set) else set(slots)
+        return slots if candidates is None else candidates & slots
+
+
+index = MemoryIndex()
+
+
+def reset_index():
+    """Drop the in-process index; the next search reloads it"""
+    index.reset()
+
+
+@receiver(post_save, sender=Vendor)
+def _index_vendor(sender, instance, **kwargs):
+    index.update(instance)
+
+
+@receiver(post_delete, sender=Vendor)
+def _unindex_vendor(sender, instance, **kwargs):
+    index.remove(instance.pk)
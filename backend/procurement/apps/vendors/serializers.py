@@ -1,8 +1,9 @@
 from rest_framework import serializers
+from procurement.projection import FieldProjectionMixin
 from .models import Vendor
 
 
-class VendorSerializer(serializers.ModelSerializer):
+class VendorSerializer(FieldProjectionMixin, serializers.ModelSerializer):
     class Meta:
         model = Vendor
         fields = [
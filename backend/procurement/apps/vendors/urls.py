@@ -1,10 +1,11 @@
-from django.urls import path, include
+from django.urls import path, include, re_path
 from rest_framework.routers import DefaultRouter
-from .views import VendorViewSet
+from .views import VendorViewSet, discover_vendors
 
 router = DefaultRouter()
 router.register(r'', VendorViewSet)
 
 urlpatterns = [
+    re_path(r'^discover/?$', discover_vendors, name='vendor-discover'),
     path('', include(router.urls)),
-]
\ No newline at end of file
+]
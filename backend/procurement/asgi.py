@@ -1,5 +1,10 @@
 """
 ASGI config for procurement project.
+
+Serve the project through this application (e.g. ``uvicorn procurement.asgi:application``)
+for the live auction event stream at ``/api/auctions/<id>/stream/`` and vendor discovery
+at ``/api/vendors/discover``; under WSGI each open stream or pending discovery would
+hold a worker thread.
 """
 
 import os
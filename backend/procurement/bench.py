@@ -0,0 +1,56 @@
+"""Shared fixture handling for the benchmark management commands.
+
+Benchmarks seed throwaway rows owned by a ``bench-`` user and delete them
+when they finish, and some time whole-table jobs, so they refuse to run
+unless the default database is set aside for them: its name contains
+"bench" or "test", or the BENCH_DATABASE setting is on.
+"""
+import uuid
+from contextlib import contextmanager
+from pathlib import PurePath
+
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.db import connection
+
+from procurement.apps.users.models import User
+
+BENCH_DATABASE_MARKERS = ('bench', 'test')
+
+
+def require_bench_database():
+    """Raise CommandError unless the default database is a dedicated bench or test database"""
+    name = PurePath(str(connection.settings_dict['NAME'])).name
+    if settings.BENCH_DATABASE or any(marker in name.lower() for marker in BENCH_DATABASE_MARKERS):
+        return
+    raise CommandError(
+        f'Refusing to benchmark against database {name!r}: benchmarks write and delete rows. '
+        'Use a database whose name contains "bench" or "test", or set BENCH_DATABASE=true.'
+    )
+
+
+def create_owner(prefix='bench', **fields):
+    """A throwaway user owning a benchmark's fixtures; helper users get ids starting with its id and '-'"""
+    require_bench_database()
+    tag = uuid.uuid4().hex[:8]
+    return User.objects.create(
+        id=f'{prefix}-{tag}', email=f'{prefix}-{tag}@example.com', first_name='Bench', last_name=tag, **fields
+    )
+
+
+def delete_owned(owner, owned=()):
+    """Delete the rows of each model in ``owned`` created by ``owner``, in order, then its helper users and itself"""
+    for model in owned:
+        model.objects.filter(created_by=owner).delete()
+    User.objects.filter(id__startswith=f'{owner.id}-').delete()
+    owner.delete()
+
+
+@contextmanager
+def bench_owner(*owned, prefix='bench', **fields):
+    """``create_owner`` for the duration of a ``with`` block, cleaned up by ``delete_owned`` however it exits"""
+    owner = create_owner(prefix, **fields)
+    try:
+        yield owner
+    finally:
+        delete_owned(owner, owned)
@@ -0,0 +1,40 @@
+"""``expand=`` opt-in for the nested collections of list endpoints.
+
+A serializer names the collections a list may leave out in
+``EXPANDABLE_FIELDS``. ``ExpandViewMixin`` reads ``?expand=lots,bids`` (or
+``expand=all``) on list actions and passes the names on through the
+``expand`` context entry, and ``ExpandSerializerMixin`` drops the
+collections that were not asked for.
+"""
+
+
+class ExpandSerializerMixin:
+    """Builds only the EXPANDABLE_FIELDS named by the ``expand`` context entry, when there is one"""
+
+    EXPANDABLE_FIELDS = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        expand = self.context.get('expand')
+        if expand is not None:
+            for field_name in self.EXPANDABLE_FIELDS:
+                if field_name not in expand:
+                    self.fields.pop(field_name)
+
+
+class ExpandViewMixin:
+    """Hands the collections a list request expands to its serializer; detail actions keep them all"""
+
+    def get_expand(self):
+        """EXPANDABLE_FIELDS of the view's serializer_class requested with ?expand= (every one for expand=all)"""
+        expandable = set(self.serializer_class.EXPANDABLE_FIELDS)
+        expand = {name.strip() for name in self.request.query_params.get('expand', '').split(',') if name.strip()}
+        if 'all' in expand:
+            return expandable
+        return expand & expandable
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == 'list':
+            context['expand'] = self.get_expand()
+        return context
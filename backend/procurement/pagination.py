@@ -0,0 +1,122 @@
+"""Keyset (cursor) pagination for search endpoints.
+
+A page is the first ``page_size`` rows after the sort key of the previous
+page's last row, so reading page N costs the same as page 1 and nothing is
+counted. The opaque ``cursor`` parameter carries that sort key.
+
+Querysets are paged on their ``order_by`` fields, which must be plain field
+or annotation names ending in a unique one (``pk``). The next page's filter
+is ``(a, b, pk) > (x, y, z)`` written out as
+``a >= x AND (a > x OR (a = x AND (b > y OR ...)))`` so the leading
+comparison can seek an index on the ordering. Other sources page themselves
+by providing ``keyset_page(after, size)``, returning the rows and the key of
+the last one (or None on the last page) and raising ValueError for a key
+they cannot use.
+"""
+import base64
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(key, default=str).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except ValueError:
+        raise NotFound('Invalid cursor')
+    if not isinstance(key, list):
+        raise NotFound('Invalid cursor')
+    return key
+
+
+def _after(ordering, key):
+    """Q for rows sorting after ``key`` under ``ordering`` ([(name, descending)])"""
+    condition = None
+    for (name, descending), value in reversed(list(zip(ordering, key))):
+        beyond = Q(**{f'{name}__{"lt" if descending else "gt"}': value})
+        condition = beyond if condition is None else beyond | (Q(**{name: value}) & condition)
+    name, descending = ordering[0]
+    return Q(**{f'{name}__{"lte" if descending else "gte"}': key[0]}) & condition
+
+
+def keyset_page(queryset, after, size):
+    """The ``size`` rows of an ordered queryset after ``after``, and the key of the last one if more follow"""
+    ordering = [(name.lstrip('-'), name.startswith('-')) for name in queryset.query.order_by]
+    if not ordering or any(not isinstance(name, str) or '__' in name for name, _ in ordering):
+        raise ValueError('Keyset pagination needs a queryset ordered by plain field names')
+    names, defer = queryset.query.deferred_loading
+    if names and not defer:
+        # Restricted with .only(): the sort key is read from every row, so load it too
+        queryset = queryset.only(*names, *(name for name, _ in ordering if name not in queryset.query.annotations))
+    if after is not None:
+        if len(after) != len(ordering):
+            raise NotFound('Invalid cursor')
+        try:
+            queryset = queryset.filter(_after(ordering, after))
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound('Invalid cursor')
+    rows = list(queryset[:size + 1])
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    return rows, [getattr(rows[-1], name) for name, _ in ordering]
+
+
+class KeysetPagination(BasePagination):
+    """Pages of ``page_size`` rows (PAGE_SIZE, up to MAX_PAGE_SIZE) linked by a ``next`` cursor"""
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, settings.REST_FRAMEWORK['PAGE_SIZE']))
+        except ValueError:
+            size = settings.REST_FRAMEWORK['PAGE_SIZE']
+        return max(1, min(size, MAX_PAGE_SIZE))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        cursor = request.query_params.get(self.cursor_query_param)
+        after = decode_cursor(cursor) if cursor else None
+        size = self.get_page_size(request)
+        if hasattr(queryset, 'keyset_page'):
+            try:
+                rows, self.next_key = queryset.keyset_page(after, size)
+            except ValueError:
+                raise NotFound('Invalid cursor')
+        else:
+            rows, self.next_key = keyset_page(queryset, after, size)
+        return rows
+
+    def get_next_link(self):
+        if self.next_key is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, encode_cursor(self.next_key)
+        )
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,71 @@
+"""``fields=`` projections for read endpoints.
+
+A request may name the serializer fields it wants (``?fields=id,company_name``).
+``requested_fields`` validates the names, ``project`` narrows the queryset's
+SELECT to the columns behind them with ``.only()`` (joining the relations a
+dotted source reads) and ``FieldProjectionMixin`` leaves the other fields
+out of the serialized rows.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.exceptions import ValidationError
+
+
+class FieldProjectionMixin:
+    """Serializes only the fields named by the ``fields`` context entry, when there is one"""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        names = self.context.get('fields')
+        if names:
+            fields = {name: field for name, field in fields.items() if name in names}
+        return fields
+
+
+def requested_fields(request, serializer_class):
+    """Serializer field names listed in ?fields=, or None for every field"""
+    names = list(dict.fromkeys(
+        name.strip() for name in request.query_params.get('fields', '').split(',') if name.strip()
+    ))
+    if not names:
+        return None
+    unknown = [name for name in names if name not in serializer_class().fields]
+    if unknown:
+        raise ValidationError({'fields': f'Unknown fields: {", ".join(unknown)}'})
+    return names
+
+
+def _column_path(model, source):
+    """The ORM path of a dotted serializer source and the relations it crosses, or None if it is not a column"""
+    parts, relations = source.split('.'), []
+    for index, part in enumerate(parts):
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            return None
+        if index < len(parts) - 1:
+            if not field.is_relation or field.many_to_many or field.one_to_many:
+                return None
+            relations.append('__'.join(parts[:index + 1]))
+            model = field.related_model
+    return '__'.join(parts), relations
+
+
+def project(queryset, serializer_class, names):
+    """``queryset`` loading only the columns the named serializer fields read"""
+    if not names:
+        return queryset
+    fields = serializer_class().fields
+    paths, relations = {'pk'}, []
+    for name in names:
+        resolved = _column_path(queryset.model, fields[name].source)
+        if resolved is None:
+            # A method or property may read any column
+            return queryset
+        path, crossed = resolved
+        paths.add(path)
+        relations += crossed
+    # Joins the projection does not read would be deferred and traversed at once, which only() rejects
+    queryset = queryset.select_related(None)
+    if relations:
+        queryset = queryset.select_related(*dict.fromkeys(relations))
+    return queryset.only(*paths, *relations)
@@ -46,6 +46,7 @@ LOCAL_APPS = [
     'procurement.apps.approvals',
     'procurement.apps.notifications',
     'procurement.apps.direct_procurement',
+    'procurement.apps.attachments',
     'gst',
 ]
 
@@ -221,6 +222,62 @@ CORS_ALLOW_CREDENTIALS = True
 
 CORS_ALLOW_ALL_ORIGINS = config('CORS_ALLOW_ALL_ORIGINS', default=True, cast=bool)
 
+# Live auction events (SSE): LocalBackend for a single process,
+# PostgresBackend (LISTEN/NOTIFY) to share bids between workers
+AUCTION_EVENT_BACKEND = config(
+    'AUCTION_EVENT_BACKEND',
+    default='procurement.apps.auctions.events.LocalBackend'
+)
+
+# Per-vendor bid throttling: a token bucket of AUCTION_BID_BURST bids per
+# (vendor, auction), refilled at AUCTION_BID_RATE bids per second.
+# CacheRateLimiter shares buckets between workers through the Django cache.
+AUCTION_BID_RATE_LIMITER = config(
+    'AUCTION_BID_RATE_LIMITER',
+    default='procurement.apps.auctions.ratelimit.LocalRateLimiter'
+)
+AUCTION_BID_RATE = config('AUCTION_BID_RATE', default=2.0, cast=float)
+AUCTION_BID_BURST = config('AUCTION_BID_BURST', default=5, cast=int)
+
+# Snapshot a live auction's state once its bid ledger has grown by this many entries
+AUCTION_SNAPSHOT_INTERVAL = config('AUCTION_SNAPSHOT_INTERVAL', default=1000, cast=int)
+
+# Attachment store: content-addressed blobs under ATTACHMENT_ROOT. Set
+# ATTACHMENT_SENDFILE_HEADER (X-Accel-Redirect for nginx, X-Sendfile for Apache)
+# to let the front-end server stream downloads; with X-Accel-Redirect,
+# ATTACHMENT_SENDFILE_PREFIX is the internal location mapped to ATTACHMENT_ROOT.
+ATTACHMENT_ROOT = config('ATTACHMENT_ROOT', default=str(BASE_DIR / 'attachments'))
+ATTACHMENT_MAX_SIZE = config('ATTACHMENT_MAX_SIZE', default=512 * 1024 * 1024, cast=int)
+ATTACHMENT_SENDFILE_HEADER = config('ATTACHMENT_SENDFILE_HEADER', default='')
+ATTACHMENT_SENDFILE_PREFIX = config('ATTACHMENT_SENDFILE_PREFIX', default='')
+
+# Vendor discovery: VENDOR_DISCOVERY_PROVIDER answers queries (StubProvider
+# needs no network access) and parsed answers are cached in the default cache
+# for VENDOR_DISCOVERY_CACHE_TIMEOUT seconds; point CACHES at Redis or
+# Memcached to share them between workers.
+VENDOR_DISCOVERY_PROVIDER = config(
+    'VENDOR_DISCOVERY_PROVIDER',
+    default='procurement.apps.vendors.discovery.PerplexityProvider'
+)
+VENDOR_DISCOVERY_CACHE_TIMEOUT = config('VENDOR_DISCOVERY_CACHE_TIMEOUT', default=6 * 60 * 60, cast=int)
+VENDOR_DISCOVERY_TIMEOUT = config('VENDOR_DISCOVERY_TIMEOUT', default=10.0, cast=float)
+
+# Vendor matching: each worker's category index follows its own saves and is
+# reloaded after VENDOR_MATCH_INDEX_TTL seconds to pick up other workers'
+# writes and the score_vendors bulk updates.
+VENDOR_MATCH_INDEX_TTL = config('VENDOR_MATCH_INDEX_TTL', default=300, cast=int)
+
+# Vendor-scoped access: the vendor profile ids linked to a user are cached for
+# VENDOR_IDS_CACHE_TIMEOUT seconds and dropped when a profile is saved or
+# deleted. The default cache is per process, so other workers only see a
+# re-link once their copy expires; point CACHES at Redis or Memcached to
+# share the invalidation.
+VENDOR_IDS_CACHE_TIMEOUT = config('VENDOR_IDS_CACHE_TIMEOUT', default=30, cast=int)
+
+# Benchmark commands seed and delete rows, so they only run against a database
+# whose name contains "bench" or "test", or one flagged with BENCH_DATABASE.
+BENCH_DATABASE = config('BENCH_DATABASE', default=False, cast=bool)
+
 # We're using a custom User model that doesn't extend AbstractUser
 # AUTH_USER_MODEL = 'users.User'
 
@@ -37,5 +37,6 @@ urlpatterns = [
     path('api/approvals/', include('procurement.apps.approvals.urls')),
     path('api/notifications/', include('procurement.apps.notifications.urls')),
     path('api/direct-procurement/', include('procurement.apps.direct_procurement.urls')),
+    path('api/attachments/', include('procurement.apps.attachments.urls')),
     path('api/', include('gst.urls')),
 ]
\ No newline at end of file
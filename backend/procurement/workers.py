@@ -0,0 +1,31 @@
+"""Sleep loop shared by the long-lived background workers.
+
+A worker ticks, asks when its next piece of work falls due and sleeps until
+then instead of polling on a fixed interval. ``max_sleep`` caps the wait so
+rows created or edited after the tick with an earlier boundary are still
+picked up promptly.
+"""
+import threading
+from datetime import timedelta
+
+from django.utils import timezone
+
+
+def run_until_stopped(tick, next_boundary, max_sleep=60, stop_event=None, on_tick=None):
+    """Call ``tick(now)`` until ``stop_event`` is set, sleeping until ``next_boundary(now)`` in between.
+
+    ``next_boundary`` returns the next time there is work, or None when
+    nothing is pending. ``on_tick(now, result, boundary)``, when given, sees
+    each tick's result and the boundary the loop sleeps towards.
+    """
+    stop_event = stop_event or threading.Event()
+    while not stop_event.is_set():
+        now = timezone.now()
+        result = tick(now)
+        boundary = next_boundary(now)
+        if on_tick:
+            on_tick(now, result, boundary)
+        wait_until = now + timedelta(seconds=max_sleep)
+        if boundary is not None and boundary < wait_until:
+            wait_until = boundary
+        stop_event.wait(max((wait_until - timezone.now()).total_seconds(), 0))